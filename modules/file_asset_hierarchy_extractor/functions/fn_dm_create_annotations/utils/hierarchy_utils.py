@@ -6,6 +6,7 @@ Note: This module uses a simplified version of hierarchy generation.
 For full hierarchy generation, see fn_dm_create_asset_hierarchy.
 """
 
+import sys
 from collections import defaultdict
 from typing import Any, Dict, List, Optional
 
@@ -51,7 +52,49 @@ except ImportError:
         return asset
 
 
-from .location_utils import match_file_to_system
+from .location_utils import match_files_to_systems
+
+# Characters replaced with "_" when building external IDs from names and tag text
+_SAFE_NAME_TRANS = str.maketrans({" ": "_", "-": "_", "/": "_", "&": "_"})
+
+# Tag fields copied to asset_tag node properties, in property order
+_TAG_PROPERTY_KEYS = (
+    "confidence",
+    "category",
+    "resourceSubType",
+    "resourceType",
+    "standard",
+)
+
+
+def _create_tag_instance(
+    external_id: str,
+    description: Optional[str],
+    parent_external_id: Optional[str],
+    space: str,
+    tag_data: Dict[str, Any],
+    source_files_str: str,
+) -> Dict[str, Any]:
+    """Create an asset_tag node asset.
+
+    Produces the same asset as create_asset_instance with level="asset_tag"
+    and the tag fields as extra properties, without building keyword arguments
+    for every tag.
+    """
+    properties = {"name": tag_data["text"]}
+    if description:
+        properties["description"] = description
+    if parent_external_id:
+        properties["parent"] = {"space": space, "externalId": parent_external_id}
+    properties["tags"] = ["asset_tag"]
+    for key in _TAG_PROPERTY_KEYS:
+        value = tag_data.get(key)
+        if value is not None and value != "":
+            properties[key] = value
+    if source_files_str:
+        properties["sourceFile"] = source_files_str
+        properties["sourceContext"] = source_files_str
+    return {"externalId": external_id, "space": space, "properties": properties}
 
 
 def generate_hierarchy(
@@ -65,14 +108,27 @@ def generate_hierarchy(
     assets = []
     created_assets = set()  # Track created external_ids to avoid duplicates
 
+    # Formatted resourceSubType prefix of tag descriptions, per resourceSubType value
+    subtype_prefixes = {}
+
+    def format_resource_sub_type(tag_data: Dict[str, Any]) -> str:
+        """Format "{resourceSubType} {text}", or only the text without a valid resourceSubType."""
+        resource_sub_type = tag_data.get("resourceSubType", "")
+        prefix = subtype_prefixes.get(resource_sub_type)
+        if prefix is None:
+            if resource_sub_type and resource_sub_type != "Unclassified":
+                # Convert from snake_case/underscore to camel case with spaces
+                # e.g., "Level_Monitor" -> "Level Monitor"
+                prefix = f"{resource_sub_type.replace('_', ' ')} "
+            else:
+                prefix = ""
+            subtype_prefixes[resource_sub_type] = prefix
+        return prefix + tag_data["text"]
+
     # Track which files belong to which system
-    file_to_location = {}
-    for tag in tags:
-        file_name = tag.get("file_name", "")
-        if file_name and file_name not in file_to_location:
-            location = match_file_to_system(file_name, locations)
-            if location:
-                file_to_location[file_name] = location
+    file_to_location = match_files_to_systems(
+        (tag.get("file_name", "") for tag in tags), locations
+    )
 
     # Group tags by file_name and system
     tags_by_file_and_system = defaultdict(lambda: defaultdict(list))
@@ -205,13 +261,23 @@ def generate_hierarchy(
         # Get tags for this system using the system key
         system_key = (site_code, plant_code, area_code, system_code)
         system_file_tags = tags_by_file_and_system.get(system_key, {})
+        if not system_file_tags:
+            continue
+
+        # The location part of tag descriptions is shared by all tags in this system
+        tag_description_suffix = (
+            f" for {base_descriptions_by_external_id.get(system_external_id, system_code)}"
+            f" in {base_descriptions_by_external_id.get(area_external_id, area_code)}"
+            f" of {base_descriptions_by_external_id.get(plant_external_id, plant_code)}"
+            f" at {base_descriptions_by_external_id.get(site_external_id, site_code)}"
+        )
 
         if include_resource_type and include_resource_subtype:
             # Hierarchy: system -> resource_type -> resource_subtype -> asset_tag
             # Group tags by resourceType first, then resourceSubType, then by text (across all files)
             tags_by_resource_type = defaultdict(
                 lambda: defaultdict(
-                    lambda: defaultdict(lambda: {"files": set(), "tag_data": None})
+                    lambda: defaultdict(lambda: {"files": None, "tag_data": None})
                 )
             )
             for file_name, file_tags in system_file_tags.items():
@@ -235,7 +301,7 @@ def generate_hierarchy(
                         tags_by_resource_type[resource_type][resource_sub_type][
                             text
                         ] = {
-                            "files": set(),
+                            "files": None,
                             "tag_data": {
                                 "text": text,
                                 "confidence": tag.get("confidence"),
@@ -245,23 +311,29 @@ def generate_hierarchy(
                                 "standard": tag.get("standard"),
                             },
                         }
-                    tags_by_resource_type[resource_type][resource_sub_type][text][
-                        "files"
-                    ].add(file_name)
+                    # Tags are visited file by file, so a repeated file is always the last one
+                    # A single file is kept as a string; a list is only built for a second one
+                    entry = tags_by_resource_type[resource_type][resource_sub_type][
+                        text
+                    ]
+                    files = entry["files"]
+                    if files is None:
+                        entry["files"] = file_name
+                    elif isinstance(files, str):
+                        if files != file_name:
+                            entry["files"] = [files, file_name]
+                    elif files[-1] != file_name:
+                        files.append(file_name)
 
             # Create resourceType nodes, then resourceSubType nodes, then asset_tag nodes
             for resource_type, subtypes_dict in tags_by_resource_type.items():
                 # Create resourceType node
-                safe_resource_type = (
-                    resource_type.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
+                safe_resource_type = resource_type.translate(_SAFE_NAME_TRANS)
                 resource_type_external_id = f"resource_type_{system_external_id.replace('system_', '')}_{safe_resource_type}"
 
                 if resource_type_external_id not in created_assets:
-                    resource_type_formatted = (
+                    # Interned: the same value names a node in many systems
+                    resource_type_formatted = sys.intern(
                         resource_type.replace("_", " ")
                         if resource_type != "Unclassified"
                         else "Unclassified"
@@ -294,16 +366,14 @@ def generate_hierarchy(
                 # Process resourceSubType nodes under this resourceType
                 for resource_sub_type, tags_by_text_dict in subtypes_dict.items():
                     # Create resourceSubType node
-                    safe_resource_sub_type = (
-                        resource_sub_type.replace(" ", "_")
-                        .replace("-", "_")
-                        .replace("/", "_")
-                        .replace("&", "_")
+                    safe_resource_sub_type = resource_sub_type.translate(
+                        _SAFE_NAME_TRANS
                     )
-                    resource_subtype_external_id = f"resource_subtype_{resource_type_external_id.replace('resource_type_', '')}_{safe_resource_sub_type}"
+                    resource_subtype_external_id = f"resource_subtype_{resource_type_external_id.removeprefix('resource_type_')}_{safe_resource_sub_type}"
 
                     if resource_subtype_external_id not in created_assets:
-                        resource_sub_type_formatted = (
+                        # Interned: the same value names a node in many systems
+                        resource_sub_type_formatted = sys.intern(
                             resource_sub_type.replace("_", " ")
                             if resource_sub_type != "Unclassified"
                             else "Unclassified"
@@ -333,71 +403,39 @@ def generate_hierarchy(
                         )
                         created_assets.add(resource_subtype_external_id)
 
+                    # External_id prefix shared by all asset_tags under this parent
+                    tag_id_prefix = f"asset_tag_{resource_subtype_external_id.removeprefix('resource_subtype_')}_"
+
                     # Process tags across all files for this resourceSubType
                     for text, tag_info in tags_by_text_dict.items():
                         tag_data = tag_info["tag_data"]
-                        source_files = sorted(tag_info["files"])  # Sort for consistency
-                        source_files_str = ", ".join(
-                            source_files
-                        )  # Comma-separated list of all files
-
-                        safe_text = (
-                            text.replace(" ", "_")
-                            .replace("-", "_")
-                            .replace("/", "_")
-                            .replace("&", "_")
-                        )
-                        tag_external_id = f"asset_tag_{resource_subtype_external_id.replace('resource_subtype_', '')}_{safe_text}"
+                        safe_text = text.translate(_SAFE_NAME_TRANS)
+                        tag_external_id = tag_id_prefix + safe_text
 
                         if tag_external_id not in created_assets:
-                            resource_sub_type_formatted = tag_data.get(
-                                "resourceSubType", ""
-                            )
-                            if (
-                                resource_sub_type_formatted
-                                and resource_sub_type_formatted != "Unclassified"
-                            ):
-                                resource_sub_type_formatted = f"{resource_sub_type_formatted.replace('_', ' ')} {tag_data['text']}"
+                            # Comma-separated list of all files, sorted for consistency
+                            # Most tags appear in a single file, which needs neither sort nor join
+                            files = tag_info["files"]
+                            if isinstance(files, str):
+                                source_files_str = files
                             else:
-                                resource_sub_type_formatted = tag_data["text"]
+                                source_files_str = ", ".join(sorted(files))
 
-                            site_description_base = (
-                                base_descriptions_by_external_id.get(
-                                    site_external_id, site_code
-                                )
-                            )
-                            plant_description_base = (
-                                base_descriptions_by_external_id.get(
-                                    plant_external_id, plant_code
-                                )
-                            )
-                            area_description_base = (
-                                base_descriptions_by_external_id.get(
-                                    area_external_id, area_code
-                                )
-                            )
-                            system_description_base = (
-                                base_descriptions_by_external_id.get(
-                                    system_external_id, system_code
-                                )
+                            resource_sub_type_formatted = format_resource_sub_type(
+                                tag_data
                             )
 
-                            tag_description = f"{resource_sub_type_formatted} for {system_description_base} in {area_description_base} of {plant_description_base} at {site_description_base}"
+                            tag_description = (
+                                resource_sub_type_formatted + tag_description_suffix
+                            )
 
-                            asset = create_asset_instance(
-                                external_id=tag_external_id,
-                                name=tag_data["text"],
-                                description=tag_description,
-                                parent_external_id=resource_subtype_external_id,
-                                space=space,
-                                level="asset_tag",
-                                confidence=tag_data.get("confidence"),
-                                category=tag_data.get("category"),
-                                resourceSubType=tag_data.get("resourceSubType"),
-                                resourceType=tag_data.get("resourceType"),
-                                standard=tag_data.get("standard"),
-                                sourceFile=source_files_str,
-                                sourceContext=source_files_str,
+                            asset = _create_tag_instance(
+                                tag_external_id,
+                                tag_description,
+                                resource_subtype_external_id,
+                                space,
+                                tag_data,
+                                source_files_str,
                             )
                             assets.append(asset)
                             created_assets.add(tag_external_id)
@@ -406,7 +444,7 @@ def generate_hierarchy(
             # Hierarchy: system -> resource_type -> asset_tag
             # Group tags by resourceType first, then by text (across all files)
             tags_by_resource_type = defaultdict(
-                lambda: defaultdict(lambda: {"files": set(), "tag_data": None})
+                lambda: defaultdict(lambda: {"files": None, "tag_data": None})
             )
             for file_name, file_tags in system_file_tags.items():
                 for tag in file_tags:
@@ -423,7 +461,7 @@ def generate_hierarchy(
                     # Collect all files where this tag appears
                     if text not in tags_by_resource_type[resource_type]:
                         tags_by_resource_type[resource_type][text] = {
-                            "files": set(),
+                            "files": None,
                             "tag_data": {
                                 "text": text,
                                 "confidence": tag.get("confidence"),
@@ -433,21 +471,27 @@ def generate_hierarchy(
                                 "standard": tag.get("standard"),
                             },
                         }
-                    tags_by_resource_type[resource_type][text]["files"].add(file_name)
+                    # Tags are visited file by file, so a repeated file is always the last one
+                    # A single file is kept as a string; a list is only built for a second one
+                    entry = tags_by_resource_type[resource_type][text]
+                    files = entry["files"]
+                    if files is None:
+                        entry["files"] = file_name
+                    elif isinstance(files, str):
+                        if files != file_name:
+                            entry["files"] = [files, file_name]
+                    elif files[-1] != file_name:
+                        files.append(file_name)
 
             # Create resourceType nodes and asset_tag nodes under them
             for resource_type, file_tags_dict in tags_by_resource_type.items():
                 # Create resourceType node
-                safe_resource_type = (
-                    resource_type.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
+                safe_resource_type = resource_type.translate(_SAFE_NAME_TRANS)
                 resource_type_external_id = f"resource_type_{system_external_id.replace('system_', '')}_{safe_resource_type}"
 
                 if resource_type_external_id not in created_assets:
-                    resource_type_formatted = (
+                    # Interned: the same value names a node in many systems
+                    resource_type_formatted = sys.intern(
                         resource_type.replace("_", " ")
                         if resource_type != "Unclassified"
                         else "Unclassified"
@@ -477,58 +521,37 @@ def generate_hierarchy(
                     )
                     created_assets.add(resource_type_external_id)
 
+                # External_id prefix shared by all asset_tags under this parent
+                tag_id_prefix = f"asset_tag_{resource_type_external_id.removeprefix('resource_type_')}_"
+
                 # Process tags across all files for this resourceType
                 for text, tag_info in file_tags_dict.items():
                     tag_data = tag_info["tag_data"]
-                    source_files = sorted(tag_info["files"])  # Sort for consistency
-                    source_files_str = ", ".join(
-                        source_files
-                    )  # Comma-separated list of all files
-
-                    safe_text = (
-                        text.replace(" ", "_")
-                        .replace("-", "_")
-                        .replace("/", "_")
-                        .replace("&", "_")
-                    )
-                    tag_external_id = f"asset_tag_{resource_type_external_id.replace('resource_type_', '')}_{safe_text}"
+                    safe_text = text.translate(_SAFE_NAME_TRANS)
+                    tag_external_id = tag_id_prefix + safe_text
 
                     if tag_external_id not in created_assets:
-                        resource_sub_type = tag_data.get("resourceSubType", "")
-                        if resource_sub_type and resource_sub_type != "Unclassified":
-                            resource_sub_type_formatted = f"{resource_sub_type.replace('_', ' ')} {tag_data['text']}"
+                        # Comma-separated list of all files, sorted for consistency
+                        # Most tags appear in a single file, which needs neither sort nor join
+                        files = tag_info["files"]
+                        if isinstance(files, str):
+                            source_files_str = files
                         else:
-                            resource_sub_type_formatted = tag_data["text"]
+                            source_files_str = ", ".join(sorted(files))
 
-                        site_description_base = base_descriptions_by_external_id.get(
-                            site_external_id, site_code
-                        )
-                        plant_description_base = base_descriptions_by_external_id.get(
-                            plant_external_id, plant_code
-                        )
-                        area_description_base = base_descriptions_by_external_id.get(
-                            area_external_id, area_code
-                        )
-                        system_description_base = base_descriptions_by_external_id.get(
-                            system_external_id, system_code
-                        )
+                        resource_sub_type_formatted = format_resource_sub_type(tag_data)
 
-                        tag_description = f"{resource_sub_type_formatted} for {system_description_base} in {area_description_base} of {plant_description_base} at {site_description_base}"
+                        tag_description = (
+                            resource_sub_type_formatted + tag_description_suffix
+                        )
 
-                        asset = create_asset_instance(
-                            external_id=tag_external_id,
-                            name=tag_data["text"],
-                            description=tag_description,
-                            parent_external_id=resource_type_external_id,
-                            space=space,
-                            level="asset_tag",
-                            confidence=tag_data.get("confidence"),
-                            category=tag_data.get("category"),
-                            resourceSubType=tag_data.get("resourceSubType"),
-                            resourceType=tag_data.get("resourceType"),
-                            standard=tag_data.get("standard"),
-                            sourceFile=source_files_str,
-                            sourceContext=source_files_str,
+                        asset = _create_tag_instance(
+                            tag_external_id,
+                            tag_description,
+                            resource_type_external_id,
+                            space,
+                            tag_data,
+                            source_files_str,
                         )
                         assets.append(asset)
                         created_assets.add(tag_external_id)
@@ -536,7 +559,7 @@ def generate_hierarchy(
         elif include_resource_subtype:
             # Group tags by resourceSubType first, then by text (across all files)
             tags_by_resource_subtype = defaultdict(
-                lambda: defaultdict(lambda: {"files": set(), "tag_data": None})
+                lambda: defaultdict(lambda: {"files": None, "tag_data": None})
             )
             for file_name, file_tags in system_file_tags.items():
                 for tag in file_tags:
@@ -553,7 +576,7 @@ def generate_hierarchy(
                     # Collect all files where this tag appears
                     if text not in tags_by_resource_subtype[resource_sub_type]:
                         tags_by_resource_subtype[resource_sub_type][text] = {
-                            "files": set(),
+                            "files": None,
                             "tag_data": {
                                 "text": text,
                                 "confidence": tag.get("confidence"),
@@ -563,23 +586,27 @@ def generate_hierarchy(
                                 "standard": tag.get("standard"),
                             },
                         }
-                    tags_by_resource_subtype[resource_sub_type][text]["files"].add(
-                        file_name
-                    )
+                    # Tags are visited file by file, so a repeated file is always the last one
+                    # A single file is kept as a string; a list is only built for a second one
+                    entry = tags_by_resource_subtype[resource_sub_type][text]
+                    files = entry["files"]
+                    if files is None:
+                        entry["files"] = file_name
+                    elif isinstance(files, str):
+                        if files != file_name:
+                            entry["files"] = [files, file_name]
+                    elif files[-1] != file_name:
+                        files.append(file_name)
 
             # Create resourceSubType nodes and asset_tag nodes under them
             for resource_sub_type, file_tags_dict in tags_by_resource_subtype.items():
                 # Create resourceSubType node
-                safe_resource_sub_type = (
-                    resource_sub_type.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
+                safe_resource_sub_type = resource_sub_type.translate(_SAFE_NAME_TRANS)
                 resource_subtype_external_id = f"resource_subtype_{system_external_id.replace('system_', '')}_{safe_resource_sub_type}"
 
                 if resource_subtype_external_id not in created_assets:
-                    resource_sub_type_formatted = (
+                    # Interned: the same value names a node in many systems
+                    resource_sub_type_formatted = sys.intern(
                         resource_sub_type.replace("_", " ")
                         if resource_sub_type != "Unclassified"
                         else "Unclassified"
@@ -607,63 +634,37 @@ def generate_hierarchy(
                     )
                     created_assets.add(resource_subtype_external_id)
 
+                # External_id prefix shared by all asset_tags under this parent
+                tag_id_prefix = f"asset_tag_{resource_subtype_external_id.removeprefix('resource_subtype_')}_"
+
                 # Process tags across all files for this resourceSubType
                 for text, tag_info in file_tags_dict.items():
                     tag_data = tag_info["tag_data"]
-                    source_files = sorted(tag_info["files"])  # Sort for consistency
-                    source_files_str = ", ".join(
-                        source_files
-                    )  # Comma-separated list of all files
-
-                    safe_text = (
-                        text.replace(" ", "_")
-                        .replace("-", "_")
-                        .replace("/", "_")
-                        .replace("&", "_")
-                    )
-                    tag_external_id = f"asset_tag_{resource_subtype_external_id.replace('resource_subtype_', '')}_{safe_text}"
+                    safe_text = text.translate(_SAFE_NAME_TRANS)
+                    tag_external_id = tag_id_prefix + safe_text
 
                     if tag_external_id not in created_assets:
-                        resource_sub_type_formatted = tag_data.get(
-                            "resourceSubType", ""
-                        )
-                        if (
-                            resource_sub_type_formatted
-                            and resource_sub_type_formatted != "Unclassified"
-                        ):
-                            resource_sub_type_formatted = f"{resource_sub_type_formatted.replace('_', ' ')} {tag_data['text']}"
+                        # Comma-separated list of all files, sorted for consistency
+                        # Most tags appear in a single file, which needs neither sort nor join
+                        files = tag_info["files"]
+                        if isinstance(files, str):
+                            source_files_str = files
                         else:
-                            resource_sub_type_formatted = tag_data["text"]
+                            source_files_str = ", ".join(sorted(files))
 
-                        site_description_base = base_descriptions_by_external_id.get(
-                            site_external_id, site_code
-                        )
-                        plant_description_base = base_descriptions_by_external_id.get(
-                            plant_external_id, plant_code
-                        )
-                        area_description_base = base_descriptions_by_external_id.get(
-                            area_external_id, area_code
-                        )
-                        system_description_base = base_descriptions_by_external_id.get(
-                            system_external_id, system_code
-                        )
+                        resource_sub_type_formatted = format_resource_sub_type(tag_data)
 
-                        tag_description = f"{resource_sub_type_formatted} for {system_description_base} in {area_description_base} of {plant_description_base} at {site_description_base}"
+                        tag_description = (
+                            resource_sub_type_formatted + tag_description_suffix
+                        )
 
-                        asset = create_asset_instance(
-                            external_id=tag_external_id,
-                            name=tag_data["text"],
-                            description=tag_description,
-                            parent_external_id=resource_subtype_external_id,
-                            space=space,
-                            level="asset_tag",
-                            confidence=tag_data.get("confidence"),
-                            category=tag_data.get("category"),
-                            resourceSubType=tag_data.get("resourceSubType"),
-                            resourceType=tag_data.get("resourceType"),
-                            standard=tag_data.get("standard"),
-                            sourceFile=source_files_str,
-                            sourceContext=source_files_str,
+                        asset = _create_tag_instance(
+                            tag_external_id,
+                            tag_description,
+                            resource_subtype_external_id,
+                            space,
+                            tag_data,
+                            source_files_str,
                         )
                         assets.append(asset)
                         created_assets.add(tag_external_id)
@@ -684,7 +685,7 @@ def generate_hierarchy(
                     # Collect all files where this tag appears
                     if text not in tags_by_text:
                         tags_by_text[text] = {
-                            "files": set(),
+                            "files": None,
                             "tag_data": {
                                 "text": text,
                                 "confidence": tag.get("confidence"),
@@ -694,72 +695,54 @@ def generate_hierarchy(
                                 "standard": tag.get("standard"),
                             },
                         }
-                    tags_by_text[text]["files"].add(file_name)
+                    # Tags are visited file by file, so a repeated file is always the last one
+                    # A single file is kept as a string; a list is only built for a second one
+                    entry = tags_by_text[text]
+                    files = entry["files"]
+                    if files is None:
+                        entry["files"] = file_name
+                    elif isinstance(files, str):
+                        if files != file_name:
+                            entry["files"] = [files, file_name]
+                    elif files[-1] != file_name:
+                        files.append(file_name)
+
+            # External_id prefix shared by all asset_tags under this parent
+            tag_id_prefix = f"asset_tag_{system_external_id.replace('system_', '')}_"
 
             # Create assets for each unique tag
             for text, tag_info in tags_by_text.items():
                 tag_data = tag_info["tag_data"]
-                source_files = sorted(tag_info["files"])  # Sort for consistency
-                source_files_str = ", ".join(
-                    source_files
-                )  # Comma-separated list of all files
-
                 # Create a unique external ID for this tag under this system
                 # Sanitize text for use in external ID (replace special chars)
-                safe_text = (
-                    text.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
-                tag_external_id = (
-                    f"asset_tag_{system_external_id.replace('system_', '')}_{safe_text}"
-                )
+                safe_text = text.translate(_SAFE_NAME_TRANS)
+                tag_external_id = tag_id_prefix + safe_text
 
                 if tag_external_id not in created_assets:
-                    # Create description from resourceSubType in camel case with spaces
-                    resource_sub_type = tag_data.get("resourceSubType", "")
-                    if resource_sub_type and resource_sub_type != "Unclassified":
-                        # Convert from snake_case/underscore to camel case with spaces
-                        # e.g., "Level_Monitor" -> "Level Monitor"
-                        resource_sub_type_formatted = (
-                            f"{resource_sub_type.replace('_', ' ')} {tag_data['text']}"
-                        )
+                    # Comma-separated list of all files, sorted for consistency
+                    # Most tags appear in a single file, which needs neither sort nor join
+                    files = tag_info["files"]
+                    if isinstance(files, str):
+                        source_files_str = files
                     else:
-                        # Fallback to text if no valid resourceSubType
-                        resource_sub_type_formatted = tag_data["text"]
+                        source_files_str = ", ".join(sorted(files))
+
+                    # Create description from resourceSubType in camel case with spaces
+                    resource_sub_type_formatted = format_resource_sub_type(tag_data)
 
                     # Build description using format: "{resourceSubType} for {system} in {plant} {area} at {site}"
-                    site_description_base = base_descriptions_by_external_id.get(
-                        site_external_id, site_code
-                    )
-                    plant_description_base = base_descriptions_by_external_id.get(
-                        plant_external_id, plant_code
-                    )
-                    area_description_base = base_descriptions_by_external_id.get(
-                        area_external_id, area_code
+                    tag_description = (
+                        resource_sub_type_formatted + tag_description_suffix
                     )
-                    system_description_base = base_descriptions_by_external_id.get(
-                        system_external_id, system_code
-                    )
-
-                    tag_description = f"{resource_sub_type_formatted} for {system_description_base} in {area_description_base} of {plant_description_base} at {site_description_base}"
 
                     # Set sourceFile and sourceContext to comma-separated list of all files where tag appears
-                    asset = create_asset_instance(
-                        external_id=tag_external_id,
-                        name=tag_data["text"],
-                        description=tag_description,
-                        parent_external_id=system_external_id,
-                        space=space,
-                        level="asset_tag",
-                        confidence=tag_data.get("confidence"),
-                        category=tag_data.get("category"),
-                        resourceSubType=tag_data.get("resourceSubType"),
-                        resourceType=tag_data.get("resourceType"),
-                        standard=tag_data.get("standard"),
-                        sourceFile=source_files_str,
-                        sourceContext=source_files_str,
+                    asset = _create_tag_instance(
+                        tag_external_id,
+                        tag_description,
+                        system_external_id,
+                        space,
+                        tag_data,
+                        source_files_str,
                     )
                     assets.append(asset)
                     created_assets.add(tag_external_id)
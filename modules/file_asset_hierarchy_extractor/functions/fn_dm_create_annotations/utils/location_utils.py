@@ -5,20 +5,62 @@ This module provides utilities for loading and working with location files.
 """
 
 import csv
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 
+# Use libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Timestamp suffixes of CDF file names, stripped in this order from the end:
+# _YYYYMMDD_HHMMSS (e.g. _20251110_234713), a 13 digit _timestamp
+# (e.g. _1762840033548), then any trailing _digits
+_TIMESTAMP_SUFFIX_RE = re.compile(r"(?:_\d+)?(?:_\d{13})?(?:_\d{8}_\d{6})?$")
+
+# Runs of dashes collapsed to a single dash when normalizing file names
+_MULTI_DASH_RE = re.compile(r"-{2,}")
+
+
+def _read_csv_rows(f, delimiter: str = ",") -> List[Dict[str, Any]]:
+    """Read CSV rows as dictionaries keyed by the header row.
+
+    Gives the same rows as csv.DictReader, but builds each dictionary with a
+    single dict(zip(...)) instead of going through DictReader per row.
+    """
+    reader = csv.reader(f, delimiter=delimiter)
+    fieldnames = next(reader, None)
+    if fieldnames is None:
+        return []
+
+    field_count = len(fieldnames)
+    rows = []
+    for row in reader:
+        # Blank rows are skipped, as csv.DictReader does
+        if not row:
+            continue
+        row_dict = dict(zip(fieldnames, row))
+        if len(row) != field_count:
+            # Ragged row: fill missing fields with None and keep extra values
+            # under the None key, as csv.DictReader does
+            if len(row) > field_count:
+                row_dict[None] = row[field_count:]
+            else:
+                for fieldname in fieldnames[len(row) :]:
+                    row_dict[fieldname] = None
+        rows.append(row_dict)
+    return rows
+
 
 def load_locations_csv(csv_file: Path) -> List[Dict[str, str]]:
     """Load locations CSV file."""
-    locations = []
     with open(csv_file, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f, delimiter=";")
-        for row in reader:
-            locations.append(row)
-    return locations
+        return _read_csv_rows(f, delimiter=";")
 
 
 def convert_locations_dict_to_flat_list(data: Dict[str, Any]) -> List[Dict[str, str]]:
@@ -66,90 +108,148 @@ def convert_locations_dict_to_flat_list(data: Dict[str, Any]) -> List[Dict[str,
 def load_locations_yaml(yaml_file: Path) -> List[Dict[str, str]]:
     """Load locations from YAML config file and convert to flat list format."""
     with open(yaml_file, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_YamlLoader)
 
     return convert_locations_dict_to_flat_list(data)
 
 
 def load_extracted_assets(csv_file: Path) -> List[Dict[str, Any]]:
     """Load extracted assets CSV file."""
-    tags = []
     with open(csv_file, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            tags.append(row)
-    return tags
+        return _read_csv_rows(f)
 
 
+@lru_cache(maxsize=65536)
 def normalize_file_name_for_matching(file_name: str) -> str:
-    """Normalize file name for matching by removing extensions, spaces, and special chars."""
-    from pathlib import Path
+    """Normalize file name for matching by removing extensions, spaces, and special chars.
 
+    Results are cached: the same file and location names are normalized repeatedly.
+    """
     # Remove extension
     base = Path(file_name).stem if "." in file_name else file_name
     # Normalize: replace ~ with -, replace spaces with dashes, lowercase
     normalized = base.replace("~", "-").replace(" ", "-").lower().strip()
     # Clean up multiple consecutive dashes
-    while "--" in normalized:
-        normalized = normalized.replace("--", "-")
+    normalized = _MULTI_DASH_RE.sub("-", normalized)
     return normalized
 
 
+# Prefix tries over the location file names: (raw trie, normalized trie)
+LocationIndex = Tuple[Dict[str, Any], Dict[str, Any]]
+
+
+def _insert_prefix(trie: Dict[str, Any], prefix: str, entry: tuple) -> None:
+    """Insert a prefix into a trie, keeping the first entry inserted for it."""
+    node = trie
+    for char in prefix:
+        node = node.setdefault(char, {})
+    # "" is never a single character, so it marks the end of a prefix
+    node.setdefault("", entry)
+
+
+def _first_prefix_entry(trie: Dict[str, Any], value: str) -> Optional[tuple]:
+    """Return the (order, location) entry with the lowest order among prefixes of value."""
+    node = trie
+    best = node.get("")
+    for char in value:
+        node = node.get(char)
+        if node is None:
+            break
+        entry = node.get("")
+        if entry is not None and (best is None or entry[0] < best[0]):
+            best = entry
+    return best
+
+
+def build_location_index(locations: List[Dict[str, str]]) -> LocationIndex:
+    """Build the prefix index used by match_file_to_system.
+
+    Build it once and pass it to match_file_to_system when matching many files
+    against the same locations.
+    """
+    raw_trie = {}
+    normalized_trie = {}
+    for order, location in enumerate(locations):
+        # Try both 'file_name' and 'P&ID' column names
+        file_names_str = location.get("file_name", "") or location.get("P&ID", "")
+        if not file_names_str:
+            continue
+
+        entry = (order, location)
+        # Split by comma and strip whitespace
+        for loc_file in file_names_str.split(","):
+            loc_file = loc_file.strip()
+            _insert_prefix(raw_trie, loc_file, entry)
+            _insert_prefix(
+                normalized_trie, normalize_file_name_for_matching(loc_file), entry
+            )
+
+    return raw_trie, normalized_trie
+
+
 def match_file_to_system(
-    file_name: str, locations: List[Dict[str, str]]
+    file_name: str,
+    locations: List[Dict[str, str]],
+    location_index: Optional[LocationIndex] = None,
 ) -> Optional[Dict[str, str]]:
     """Match a file name to a system in the locations CSV.
 
     Matching is done by checking if the file name starts with the value specified
     in the location config. This allows files like "E-208-M-001.dwg.pdf" to match
-    location config entries like "E-208-M-001".
+    location config entries like "E-208-M-001". The first matching location wins.
+
+    location_index is built from locations if not given (see build_location_index).
     """
-    import re
-    from pathlib import Path
+    if location_index is None:
+        location_index = build_location_index(locations)
+    raw_trie, normalized_trie = location_index
 
     # Handle cognitefile_ prefix and timestamp suffix
     # e.g., "cognitefile_E-208-M-001.dwg_20251110_234713" -> "E-208-M-001.dwg"
     file_name_cleaned = file_name
     if file_name.startswith("cognitefile_"):
-        # Remove prefix
-        file_name_cleaned = file_name.replace("cognitefile_", "", 1)
-        # Remove timestamp suffix (format: _YYYYMMDD_HHMMSS or _timestamp)
-        # Match pattern like _20251110_234713 or _1762840033548
-        file_name_cleaned = re.sub(
-            r"_\d{8}_\d{6}$", "", file_name_cleaned
-        )  # Remove _YYYYMMDD_HHMMSS
-        file_name_cleaned = re.sub(
-            r"_\d{13}$", "", file_name_cleaned
-        )  # Remove _timestamp (13 digits)
-        file_name_cleaned = re.sub(
-            r"_\d+$", "", file_name_cleaned
-        )  # Remove any trailing _digits
-
-    # Get base file name (without extension) for matching
-    file_base = (
-        Path(file_name_cleaned).stem if "." in file_name_cleaned else file_name_cleaned
-    )
-
-    for location in locations:
-        # Try both 'file_name' and 'P&ID' column names
-        file_names_str = location.get("file_name", "") or location.get("P&ID", "")
-        if not file_names_str:
+        # Remove prefix and timestamp suffix in one pass
+        file_name_cleaned = _TIMESTAMP_SUFFIX_RE.sub(
+            "", file_name.removeprefix("cognitefile_"), count=1
+        )
+
+    # Primary matching strategy: file name starts with location config value
+    # This handles cases like "E-208-M-001.dwg.pdf" matching "E-208-M-001"
+    # Also check normalized versions for flexibility
+    entries = [
+        _first_prefix_entry(raw_trie, file_name_cleaned),
+        _first_prefix_entry(
+            normalized_trie, normalize_file_name_for_matching(file_name_cleaned)
+        ),
+    ]
+    # Base file name (without extension) is only worth its own lookup when the
+    # name has a directory part; otherwise it is a prefix of the cleaned name
+    # and its matches are already among the cleaned name's
+    if "/" in file_name_cleaned and "." in file_name_cleaned:
+        entries.append(_first_prefix_entry(raw_trie, Path(file_name_cleaned).stem))
+    matches = [entry for entry in entries if entry is not None]
+    if not matches:
+        return None
+    return min(matches, key=lambda entry: entry[0])[1]
+
+
+def match_files_to_systems(
+    file_names: Iterable[str], locations: List[Dict[str, str]]
+) -> Dict[str, Dict[str, str]]:
+    """Match many file names to systems, building the location index once.
+
+    Each distinct file name is matched once. Empty and unmatched file names
+    are left out of the result.
+
+    Returns:
+        Dictionary mapping matched file names to their location
+    """
+    location_index = build_location_index(locations)
+    file_to_location = {}
+    for file_name in dict.fromkeys(file_names):
+        if not file_name:
             continue
-
-        # Split by comma and strip whitespace
-        file_list = [f.strip() for f in file_names_str.split(",")]
-
-        # Check if file_name starts with any file in the list
-        for loc_file in file_list:
-            # Primary matching strategy: file name starts with location config value
-            # This handles cases like "E-208-M-001.dwg.pdf" matching "E-208-M-001"
-            if file_name_cleaned.startswith(loc_file) or file_base.startswith(loc_file):
-                return location
-
-            # Also check normalized versions for flexibility
-            file_normalized = normalize_file_name_for_matching(file_name_cleaned)
-            loc_normalized = normalize_file_name_for_matching(loc_file)
-            if file_normalized.startswith(loc_normalized):
-                return location
-
-    return None
+        location = match_file_to_system(file_name, locations, location_index)
+        if location:
+            file_to_location[file_name] = location
+    return file_to_location
@@ -29,6 +29,10 @@ class Parameters(BaseModel):
     raw_table_assets: str = Field(
         ..., description="ID of the assets table in RAW for storing generated hierarchy"
     )
+    raw_table_metadata: Optional[str] = Field(
+        None,
+        description="Optional RAW table storing a hash of the last run's inputs. If set, the run is skipped when the state table and hierarchy settings are unchanged (unless overwrite is true).",
+    )
     output_file: Optional[str] = Field(
         None,
         description="Output file path for asset hierarchy YAML (only used when running locally)",
@@ -5,49 +5,69 @@ This module provides the main pipeline function that creates asset hierarchy
 from locations and extracted tags.
 """
 
+from __future__ import annotations
+
+import hashlib
+import importlib.util
 import json
+import re
+import sys
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import yaml
 
-try:
+# cognite-sdk is imported lazily where it is used to keep function cold starts fast
+if TYPE_CHECKING:
     from cognite.client import CogniteClient
-    from cognite.client.data_classes import Row
-
-    CDF_AVAILABLE = True
-except ImportError:
-    CDF_AVAILABLE = False
-    CogniteClient = None
-    Row = None
 
 from .logger import CogniteFunctionLogger
 from .utils.location_utils import load_extracted_assets
 
-# Import asset tag classifier
-try:
-    import sys
-    from pathlib import Path
-
-    # Add module root to path to import asset_tag_classifier
-    # Path structure: .../file_asset_hierarchy_extractor/functions/fn_dm_create_asset_hierarchy/pipeline.py
-    # We need: .../file_asset_hierarchy_extractor/ (3 levels up)
-    module_root = Path(__file__).parent.parent.parent
-    if str(module_root) not in sys.path:
-        sys.path.insert(0, str(module_root))
-    from asset_tag_classifier import AssetTagClassifier
-
-    CLASSIFIER_AVAILABLE = True
-    _classifier_import_error = None
-except ImportError as e:
-    CLASSIFIER_AVAILABLE = False
-    AssetTagClassifier = None
-    # Store error for debugging
-    _classifier_import_error = str(e)
+# Module root: .../file_asset_hierarchy_extractor/ (3 levels up from this file)
+_MODULE_ROOT = Path(__file__).parent.parent.parent
+
+
+@lru_cache(maxsize=1)
+def _load_classifier_cls() -> Tuple[Optional[type], Optional[str]]:
+    """
+    Load AssetTagClassifier from asset_tag_classifier.py in the module root.
+
+    The module is loaded from its file location once per process, without
+    adding the module root to sys.path.
+
+    Returns:
+        Tuple of (AssetTagClassifier class or None, import error message or None)
+    """
+    module = sys.modules.get("asset_tag_classifier")
+    if module is None:
+        classifier_path = _MODULE_ROOT / "asset_tag_classifier.py"
+        spec = importlib.util.spec_from_file_location(
+            "asset_tag_classifier", classifier_path
+        )
+        if spec is None or spec.loader is None or not classifier_path.exists():
+            return None, f"asset_tag_classifier not found at {classifier_path}"
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except ImportError as e:
+            return None, str(e)
+        sys.modules["asset_tag_classifier"] = module
+    return module.AssetTagClassifier, None
+
 
 logger = None  # Use CogniteFunctionLogger directly
 
+# Row key of the single metadata row holding the input hash of the last run
+_METADATA_ROW_KEY = "create_asset_hierarchy"
+
+# Assets generated per input hash, reused across invocations of a warm function
+_ASSETS_CACHE_SIZE = 4
+_assets_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+
 
 def _load_results_from_state_table(
     client: CogniteClient,
@@ -151,12 +171,21 @@ def _load_results_from_state_table(
                         and isinstance(results_data, dict)
                         and results_data.get("items")
                     ):
+                        # When this file's results were last produced; the state's
+                        # processed_at is renewed every time the file is processed
+                        processed_at = state_data.get("processed_at")
+                        if not processed_at:
+                            updated_at = row.get("updated_at")
+                            processed_at = (
+                                updated_at if isinstance(updated_at, str) else ""
+                            )
+
                         # Store results with file info
                         results_store[file_id] = {
                             "file_id": file_id,
                             "file_name": file_name,
                             "results": results_data,
-                            "processed_at": state_data.get("updated_at", ""),
+                            "processed_at": processed_at,
                         }
                         total_loaded += 1
                         batch_count += 1
@@ -302,6 +331,25 @@ def get_asset_list(
         batch_size=batch_size,
     )
 
+    return _build_asset_list_from_results(results_store, log)
+
+
+def _build_asset_list_from_results(
+    results_store: Dict[int, Dict[str, Any]],
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build the unique asset list from results loaded from the state table.
+
+    Args:
+        results_store: Dictionary mapping file_id to results data
+        logger: Logger instance
+
+    Returns:
+        List of unique asset dictionaries
+    """
+    log = logger or CogniteFunctionLogger()
+
     if not results_store:
         log.warning("No results found in state table")
         return []
@@ -348,8 +396,14 @@ def _save_assets_to_raw(
     raw_table_assets: str,
     assets: List[Dict[str, Any]],
     logger: Optional[CogniteFunctionLogger] = None,
+    input_hash: Optional[str] = None,
 ) -> None:
-    """Save assets to RAW table."""
+    """Save assets to RAW table.
+
+    Each row records the input hash of the run that wrote it and the asset's
+    position in the list, so _load_assets_from_raw can reload this exact list.
+    """
+    from cognite.client.data_classes import Row
     from cognite.client.exceptions import CogniteAPIError
 
     log = logger or CogniteFunctionLogger()
@@ -366,7 +420,7 @@ def _save_assets_to_raw(
 
     # Save each asset as a row (using externalId as key)
     rows = []
-    for asset in assets:
+    for position, asset in enumerate(assets):
         try:
             external_id = asset.get("externalId", "")
             if not external_id:
@@ -378,6 +432,8 @@ def _save_assets_to_raw(
                 "space": asset.get("space", ""),
                 "name": asset.get("properties", {}).get("name", ""),
                 "created_at": datetime.now(timezone.utc).isoformat(),
+                "input_hash": input_hash or "",
+                "position": position,
             }
             row = Row(key=external_id, columns=columns)
             rows.append(row)
@@ -405,6 +461,259 @@ def _save_assets_to_raw(
     log.info(f"Saved {len(rows)} asset(s) to RAW table {raw_db}.{raw_table_assets}")
 
 
+def _load_assets_from_raw(
+    client: CogniteClient,
+    raw_db: str,
+    raw_table_assets: str,
+    input_hash: str,
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> List[Dict[str, Any]]:
+    """Load the assets a previous run with input_hash saved to RAW, in their original order.
+
+    Rows written by runs with other inputs are left out. Returns an empty list if
+    the table can't be read.
+    """
+    log = logger or CogniteFunctionLogger()
+
+    try:
+        rows = client.raw.rows.list(raw_db, raw_table_assets, limit=-1)
+    except Exception as e:
+        log.warning(f"Error loading assets from RAW: {e}")
+        return []
+
+    positioned = []
+    for row in rows:
+        columns = row.columns or {}
+        if columns.get("input_hash") != input_hash:
+            continue
+        try:
+            positioned.append(
+                (int(columns["position"]), json.loads(columns["asset_data"]))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            log.warning(f"Error parsing asset row {row.key}: {e}")
+    positioned.sort(key=lambda item: item[0])
+    return [asset for _, asset in positioned]
+
+
+def _resolve_pattern_path(pattern_config_path: str) -> Path:
+    """Resolve the classifier pattern config path.
+
+    Relative paths are looked up from the module root first, then from the
+    project root (one level up). The module root path is returned if neither
+    exists, for the error message.
+    """
+    pattern_path = Path(pattern_config_path)
+    if pattern_path.is_absolute():
+        return pattern_path
+    pattern_path_module = _MODULE_ROOT / pattern_config_path
+    if pattern_path_module.exists():
+        return pattern_path_module
+    pattern_path_project = _MODULE_ROOT.parent / pattern_config_path
+    if pattern_path_project.exists():
+        return pattern_path_project
+    return pattern_path_module
+
+
+def _pattern_files_digest(pattern_config_path: Optional[str]) -> Optional[str]:
+    """Hash the contents of the classifier pattern files.
+
+    Editing the patterns in place then changes the input hash. Covers the
+    pattern config and the document_patterns.yaml next to it, which the
+    classifier also reads. Missing files hash as empty.
+    """
+    if not pattern_config_path:
+        return None
+    pattern_path = _resolve_pattern_path(pattern_config_path)
+    digest = hashlib.sha256()
+    for path in (pattern_path, pattern_path.parent / "document_patterns.yaml"):
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _config_parameter(data: Dict[str, Any], name: str) -> Any:
+    """Return a setting from data, falling back to the CDF config parameters when it is None."""
+    value = data.get(name)
+    if value is None:
+        cdf_config = data.get("_cdf_config")
+        if cdf_config is not None:
+            value = getattr(cdf_config.parameters, name, None)
+    return value
+
+
+def _compute_input_hash(
+    results_store: Dict[int, Dict[str, Any]], settings: Dict[str, Any]
+) -> str:
+    """
+    Compute a content hash over the state table results and hierarchy settings.
+
+    Only the per-file ``processed_at`` timestamps are hashed (not the full results).
+    The extraction pipeline sets a new ``processed_at`` in a file's state every time
+    it stores results for the file, including after a re-upload reset.
+
+    Args:
+        results_store: Dictionary mapping file_id to results data
+        settings: Pipeline inputs that affect the generated hierarchy
+
+    Returns:
+        Hex digest identifying this set of inputs
+    """
+    digest = hashlib.sha256()
+    for file_id in sorted(results_store):
+        processed_at = results_store[file_id].get("processed_at", "")
+        digest.update(f"{file_id}:{processed_at}\n".encode())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _load_previous_run(
+    client: CogniteClient,
+    raw_db: str,
+    raw_table_metadata: str,
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> Dict[str, Any]:
+    """Load the metadata (input_hash, asset_count) stored by the previous run, if any."""
+    log = logger or CogniteFunctionLogger()
+
+    try:
+        row = client.raw.rows.retrieve(raw_db, raw_table_metadata, _METADATA_ROW_KEY)
+    except Exception as e:
+        log.debug(f"No previous input hash available: {e}")
+        return {}
+
+    if row is None or not row.columns:
+        return {}
+    return row.columns
+
+
+def _save_input_hash(
+    client: CogniteClient,
+    raw_db: str,
+    raw_table_metadata: str,
+    input_hash: str,
+    asset_count: int,
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> None:
+    """Store the input hash of this run so the next run can detect unchanged inputs."""
+    from cognite.client.data_classes import Row
+
+    log = logger or CogniteFunctionLogger()
+
+    try:
+        client.raw.rows.insert(
+            db_name=raw_db,
+            table_name=raw_table_metadata,
+            row=Row(
+                key=_METADATA_ROW_KEY,
+                columns={
+                    "input_hash": input_hash,
+                    "asset_count": asset_count,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                },
+            ),
+            ensure_parent=True,
+        )
+    except Exception as e:
+        log.warning(f"Error saving input hash to RAW: {e}")
+
+
+def _remember_assets(input_hash: str, assets: List[Dict[str, Any]]) -> None:
+    """Keep generated assets in the in-process cache, evicting the oldest entry."""
+    _assets_cache[input_hash] = assets
+    _assets_cache.move_to_end(input_hash)
+    while len(_assets_cache) > _ASSETS_CACHE_SIZE:
+        _assets_cache.popitem(last=False)
+
+
+def _write_outputs(
+    client: Optional[CogniteClient],
+    logger: Any,
+    data: Dict[str, Any],
+    assets: List[Dict[str, Any]],
+    input_hash: Optional[str] = None,
+    raw_table_metadata: Optional[str] = None,
+    save_to_raw: bool = True,
+) -> None:
+    """
+    Store generated assets in data, RAW and (in local mode) the output YAML file.
+
+    Args:
+        save_to_raw: False when the assets table already holds the assets for
+            input_hash, so only the other outputs are written
+    """
+    if input_hash:
+        _remember_assets(input_hash, assets)
+
+    # Store results in data
+    data["assets"] = assets
+
+    # Always save to RAW table (both CDF and local mode)
+    cdf_config = data.get("_cdf_config")
+    is_local_mode = data.get("_local_mode", False)  # Flag to indicate local execution
+    output_file = data.get("output_file")
+
+    # Get RAW table info from config or data
+    if cdf_config is not None:
+        raw_db = cdf_config.parameters.raw_db
+        raw_table_assets = cdf_config.parameters.raw_table_assets
+    else:
+        # Fallback to data if no config (shouldn't happen in normal flow)
+        raw_db = data.get("raw_db")
+        raw_table_assets = data.get("raw_table_assets")
+
+    if not save_to_raw:
+        logger.info("Assets in RAW already match these inputs. Skipping the RAW write.")
+    elif client and raw_db and raw_table_assets:
+        # Always save to RAW table
+        logger.info(
+            f"Saving {len(assets)} asset(s) to RAW table {raw_db}.{raw_table_assets}"
+        )
+        _save_assets_to_raw(
+            client, raw_db, raw_table_assets, assets, logger, input_hash=input_hash
+        )
+        logger.info(f"Assets saved to RAW table")
+
+        if input_hash:
+            _save_input_hash(
+                client, raw_db, raw_table_metadata, input_hash, len(assets), logger
+            )
+    else:
+        logger.warning(
+            "Cannot save to RAW: missing client, raw_db, or raw_table_assets"
+        )
+
+    # Additionally write YAML file when running locally (for ease of review)
+    if is_local_mode and output_file:
+        output_path = Path(output_file)
+        # Ensure output directory exists
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Create YAML structure for CDF data modeling
+        output_data = {"items": assets}
+
+        # Write to YAML file
+        with open(output_path, "w", encoding="utf-8") as f:
+            yaml.dump(
+                output_data,
+                f,
+                default_flow_style=False,
+                sort_keys=False,
+                allow_unicode=True,
+            )
+
+        logger.info(f"Asset hierarchy also saved to YAML for review: {output_file}")
+
+    logger.info(f"Total assets: {len(assets)}")
+
+    # Print summary
+    site_count = sum(1 for a in assets if "parent" not in a.get("properties", {}))
+    logger.info(f"Root assets (sites): {site_count}")
+
+
 def create_asset_hierarchy(
     client: Optional[CogniteClient],
     logger: Any,
@@ -441,6 +750,10 @@ def create_asset_hierarchy(
                 "locations must be provided in data (either directly or via ExtractionPipelineExtId config)"
             )
 
+        # Hash of the pipeline inputs, set when unchanged-input detection is enabled
+        input_hash = None
+        raw_table_metadata = None
+
         # Load tags/assets if not provided
         if tags is None:
             # Check if we should load from RAW results table
@@ -465,7 +778,7 @@ def create_asset_hierarchy(
                 logger.info(
                     f"Loading assets from state table {raw_db}.{raw_table_state} (results_field: {results_field}, limit: {limit if limit > 0 else 'unlimited'}, batch_size: {batch_size or 'none'})"
                 )
-                tags = get_asset_list(
+                results_store = _load_results_from_state_table(
                     client,
                     raw_db,
                     raw_table_state,
@@ -474,6 +787,76 @@ def create_asset_hierarchy(
                     limit=limit,
                     batch_size=batch_size,
                 )
+
+                # Skip the run if neither the state table nor the settings changed
+                raw_table_metadata = getattr(
+                    cdf_config.parameters, "raw_table_metadata", None
+                )
+                overwrite = getattr(cdf_config.parameters, "overwrite", False)
+                if raw_table_metadata and results_store:
+                    input_hash = _compute_input_hash(
+                        results_store,
+                        {
+                            "locations": locations,
+                            "hierarchy_levels": hierarchy_levels,
+                            "space": space,
+                            "include_resource_type": include_resource_type,
+                            "include_resource_subtype": include_resource_subtype,
+                            "include_resource_subsubtype": include_resource_subsubtype,
+                            "include_resource_variant": include_resource_variant,
+                            "pattern_config_path": data.get("pattern_config_path"),
+                            "pattern_files": _pattern_files_digest(
+                                data.get("pattern_config_path")
+                            ),
+                            "tag_prefix_whitelist": _config_parameter(
+                                data, "tag_prefix_whitelist"
+                            ),
+                            "tag_blacklist": _config_parameter(data, "tag_blacklist"),
+                        },
+                    )
+                    # Only the hash stored with the assets table decides the skip; the
+                    # in-process cache may hold assets of an older run
+                    previous_run = (
+                        {}
+                        if overwrite
+                        else _load_previous_run(
+                            client, raw_db, raw_table_metadata, logger
+                        )
+                    )
+                    if previous_run.get("input_hash") == input_hash:
+                        logger.info(
+                            f"State table and settings unchanged since the last run (input hash: {input_hash[:12]})."
+                        )
+                        assets = _assets_cache.get(input_hash)
+                        if assets is None:
+                            # Cold start: reload the assets stored for these inputs
+                            # instead of generating them again
+                            assets = _load_assets_from_raw(
+                                client,
+                                raw_db,
+                                cdf_config.parameters.raw_table_assets,
+                                input_hash,
+                                logger,
+                            )
+                            if len(assets) != previous_run.get("asset_count"):
+                                logger.info(
+                                    f"RAW holds {len(assets)} of the {previous_run.get('asset_count')} asset(s) stored for these inputs. Generating them again."
+                                )
+                                assets = None
+                        if assets is not None:
+                            logger.info("Reusing the assets generated for these inputs")
+                            data["skipped_unchanged"] = True
+                            _write_outputs(
+                                client,
+                                logger,
+                                data,
+                                assets,
+                                input_hash=input_hash,
+                                save_to_raw=False,
+                            )
+                            return
+
+                tags = _build_asset_list_from_results(results_store, logger)
                 logger.info(f"Loaded {len(tags)} asset(s) from state table")
             elif tags_file:
                 # Fallback to CSV file
@@ -491,25 +874,12 @@ def create_asset_hierarchy(
 
         # Classify assets if classifier is available and pattern config is provided
         pattern_config_path = data.get("pattern_config_path")
-        if pattern_config_path and CLASSIFIER_AVAILABLE and tags:
+        AssetTagClassifier, classifier_import_error = (
+            _load_classifier_cls() if pattern_config_path else (None, None)
+        )
+        if pattern_config_path and AssetTagClassifier and tags:
             try:
-                pattern_path = Path(pattern_config_path)
-                if not pattern_path.is_absolute():
-                    # Config path is relative to module root, but we need to resolve it from project root
-                    # Try relative to module root first, then try from project root
-                    module_root = Path(__file__).parent.parent.parent
-                    pattern_path_module = module_root / pattern_config_path
-                    # Also try from project root (one level up from module_root)
-                    project_root = module_root.parent
-                    pattern_path_project = project_root / pattern_config_path
-
-                    if pattern_path_module.exists():
-                        pattern_path = pattern_path_module
-                    elif pattern_path_project.exists():
-                        pattern_path = pattern_path_project
-                    else:
-                        pattern_path = pattern_path_module  # Use module root path for error message
-
+                pattern_path = _resolve_pattern_path(pattern_config_path)
                 if pattern_path.exists():
                     logger.info(
                         f"Classifying {len(tags)} asset(s) using pattern config: {pattern_path}"
@@ -538,28 +908,23 @@ def create_asset_hierarchy(
                 logger.warning(
                     f"Error during asset classification: {e}. Continuing without classification."
                 )
-        elif pattern_config_path and not CLASSIFIER_AVAILABLE:
+        elif pattern_config_path and not AssetTagClassifier:
             logger.warning(
-                f"Asset tag classifier not available. Skipping classification. Error: {_classifier_import_error if '_classifier_import_error' in globals() else 'Unknown'}"
+                f"Asset tag classifier not available. Skipping classification. Error: {classifier_import_error or 'Unknown'}"
             )
         elif pattern_config_path and not tags:
             logger.warning("No tags to classify. Skipping classification.")
 
         # Apply tag prefix whitelist: if defined, set confidence to 0.0 for tags not matching any prefix
-        tag_prefix_whitelist = data.get("tag_prefix_whitelist")
-        if tag_prefix_whitelist is None:
-            cdf_config = data.get("_cdf_config")
-            if cdf_config is not None and hasattr(
-                cdf_config.parameters, "tag_prefix_whitelist"
-            ):
-                tag_prefix_whitelist = cdf_config.parameters.tag_prefix_whitelist
+        tag_prefix_whitelist = _config_parameter(data, "tag_prefix_whitelist")
         if tag_prefix_whitelist:
-            prefixes = [p for p in tag_prefix_whitelist if p]
+            # Tuple of prefixes lets str.startswith check all of them in one call
+            prefixes = tuple(p for p in tag_prefix_whitelist if p)
             if prefixes:
                 reduced = 0
                 for tag in tags:
                     text = (tag.get("text") or "").strip()
-                    if not any(text.startswith(prefix) for prefix in prefixes):
+                    if not text.startswith(prefixes):
                         tag["confidence"] = 0.0
                         reduced += 1
                 if reduced:
@@ -569,20 +934,18 @@ def create_asset_hierarchy(
                     )
 
         # Apply tag blacklist: if any blacklist value exists in the tag text, set confidence to 0.0
-        tag_blacklist = data.get("tag_blacklist")
-        if tag_blacklist is None:
-            cdf_config = data.get("_cdf_config")
-            if cdf_config is not None and hasattr(
-                cdf_config.parameters, "tag_blacklist"
-            ):
-                tag_blacklist = cdf_config.parameters.tag_blacklist
+        tag_blacklist = _config_parameter(data, "tag_blacklist")
         if tag_blacklist:
             blacklist_values = [b for b in tag_blacklist if b]
             if blacklist_values:
+                # Single alternation scans each text once instead of once per value
+                blacklist_pattern = re.compile(
+                    "|".join(re.escape(bl) for bl in blacklist_values)
+                )
                 reduced = 0
                 for tag in tags:
                     text = (tag.get("text") or "").strip()
-                    if any(bl in text for bl in blacklist_values):
+                    if blacklist_pattern.search(text):
                         tag["confidence"] = 0.0
                         reduced += 1
                 if reduced:
@@ -609,62 +972,14 @@ def create_asset_hierarchy(
         )
         logger.info(f"Generated {len(assets)} asset instance(s)")
 
-        # Store results in data
-        data["assets"] = assets
-
-        # Always save to RAW table (both CDF and local mode)
-        cdf_config = data.get("_cdf_config")
-        is_local_mode = data.get(
-            "_local_mode", False
-        )  # Flag to indicate local execution
-
-        # Get RAW table info from config or data
-        if cdf_config is not None:
-            raw_db = cdf_config.parameters.raw_db
-            raw_table_assets = cdf_config.parameters.raw_table_assets
-        else:
-            # Fallback to data if no config (shouldn't happen in normal flow)
-            raw_db = data.get("raw_db")
-            raw_table_assets = data.get("raw_table_assets")
-
-        if client and raw_db and raw_table_assets:
-            # Always save to RAW table
-            logger.info(
-                f"Saving {len(assets)} asset(s) to RAW table {raw_db}.{raw_table_assets}"
-            )
-            _save_assets_to_raw(client, raw_db, raw_table_assets, assets, logger)
-            logger.info(f"Assets saved to RAW table")
-        else:
-            logger.warning(
-                "Cannot save to RAW: missing client, raw_db, or raw_table_assets"
-            )
-
-        # Additionally write YAML file when running locally (for ease of review)
-        if is_local_mode and output_file:
-            output_path = Path(output_file)
-            # Ensure output directory exists
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Create YAML structure for CDF data modeling
-            output_data = {"items": assets}
-
-            # Write to YAML file
-            with open(output_path, "w", encoding="utf-8") as f:
-                yaml.dump(
-                    output_data,
-                    f,
-                    default_flow_style=False,
-                    sort_keys=False,
-                    allow_unicode=True,
-                )
-
-            logger.info(f"Asset hierarchy also saved to YAML for review: {output_file}")
-
-        logger.info(f"Total assets: {len(assets)}")
-
-        # Print summary
-        site_count = sum(1 for a in assets if "parent" not in a.get("properties", {}))
-        logger.info(f"Root assets (sites): {site_count}")
+        _write_outputs(
+            client,
+            logger,
+            data,
+            assets,
+            input_hash=input_hash,
+            raw_table_metadata=raw_table_metadata,
+        )
 
         logger.info("Create Asset Hierarchy Pipeline completed successfully")
 
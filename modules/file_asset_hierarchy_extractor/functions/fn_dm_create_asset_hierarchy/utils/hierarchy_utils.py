@@ -4,8 +4,8 @@ Hierarchy utility functions for create asset hierarchy.
 This module provides utilities for generating asset hierarchies.
 """
 
-from collections import defaultdict
-from typing import Any, Dict, List, Optional
+import sys
+from typing import Any, Dict, Iterator, List, Optional
 
 # Import shared utilities to avoid duplication
 try:
@@ -49,27 +49,56 @@ except ImportError:
         return asset
 
 
-from .location_utils import match_file_to_system
+from .location_utils import build_location_index, match_file_to_system
 
+# Characters replaced with "_" when building external IDs from names and tag text
+_SAFE_NAME_TRANS = str.maketrans({" ": "_", "-": "_", "/": "_", "&": "_"})
 
-def build_tag_description(
-    resource_sub_type_formatted: str,
+
+def _create_node_instance(
+    external_id: str,
+    name: str,
+    description: Optional[str],
+    parent_external_id: Optional[str],
+    space: str,
+    level: str,
+    confidence: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Create a hierarchy level or intermediate node asset.
+
+    Produces the same asset as create_asset_instance, but skips the generic
+    handling of extra properties, which these nodes do not have.
+    """
+    properties = {"name": name}
+    if description:
+        properties["description"] = description
+    if parent_external_id:
+        properties["parent"] = {"space": space, "externalId": parent_external_id}
+    properties["tags"] = [level]
+    if confidence is not None:
+        properties["confidence"] = confidence
+    return {"externalId": external_id, "space": space, "properties": properties}
+
+
+def build_tag_description_suffix(
     hierarchy_levels: List[str],
     level_external_ids: Dict[str, str],
     base_descriptions_by_external_id: Dict[str, str],
     level_codes: Dict[str, str],
 ) -> str:
-    """Build tag description using dynamic hierarchy levels.
+    """Build the location part of a tag description using dynamic hierarchy levels.
+
+    The suffix only depends on the location, so it can be computed once per
+    location and appended to each tag's formatted resource subtype.
 
     Args:
-        resource_sub_type_formatted: Formatted resource subtype and text
         hierarchy_levels: List of hierarchy level names in order
         level_external_ids: Dictionary mapping level names to external_ids
         base_descriptions_by_external_id: Dictionary mapping external_ids to base descriptions
         level_codes: Dictionary mapping level names to codes
 
     Returns:
-        Formatted tag description string
+        Description suffix, e.g. " for {last_level} in {second_to_last} at {first_level}"
     """
     # Build description parts in reverse order (from last level to first)
     description_parts = []
@@ -81,15 +110,107 @@ def build_tag_description(
             )
             description_parts.append(level_desc)
 
-    # Format: "{resource_sub_type} for {last_level} in {second_to_last} of {third_to_last} at {first_level}"
+    # Format: " for {last_level} in {second_to_last} of {third_to_last} at {first_level}"
     if len(description_parts) >= 4:
-        return f"{resource_sub_type_formatted} for {description_parts[0]} in {description_parts[1]} of {description_parts[2]} at {description_parts[3]}"
+        return f" for {description_parts[0]} in {description_parts[1]} of {description_parts[2]} at {description_parts[3]}"
     elif len(description_parts) == 3:
-        return f"{resource_sub_type_formatted} for {description_parts[0]} in {description_parts[1]} at {description_parts[2]}"
+        return f" for {description_parts[0]} in {description_parts[1]} at {description_parts[2]}"
     elif len(description_parts) == 2:
-        return f"{resource_sub_type_formatted} for {description_parts[0]} at {description_parts[1]}"
+        return f" for {description_parts[0]} at {description_parts[1]}"
     else:
-        return f"{resource_sub_type_formatted} for {description_parts[0] if description_parts else 'unknown'}"
+        return f" for {description_parts[0] if description_parts else 'unknown'}"
+
+
+def build_tag_description(
+    resource_sub_type_formatted: str,
+    hierarchy_levels: List[str],
+    level_external_ids: Dict[str, str],
+    base_descriptions_by_external_id: Dict[str, str],
+    level_codes: Dict[str, str],
+) -> str:
+    """Build tag description using dynamic hierarchy levels.
+
+    Args:
+        resource_sub_type_formatted: Formatted resource subtype and text
+        hierarchy_levels: List of hierarchy level names in order
+        level_external_ids: Dictionary mapping level names to external_ids
+        base_descriptions_by_external_id: Dictionary mapping external_ids to base descriptions
+        level_codes: Dictionary mapping level names to codes
+
+    Returns:
+        Formatted tag description string
+    """
+    return resource_sub_type_formatted + build_tag_description_suffix(
+        hierarchy_levels,
+        level_external_ids,
+        base_descriptions_by_external_id,
+        level_codes,
+    )
+
+
+def _group_tags(
+    file_tags_by_name: Dict[str, List[Dict[str, Any]]],
+    group_fields: List[str],
+    document_categories: Dict[str, bool],
+) -> Dict[tuple, Dict[str, Any]]:
+    """Group the tags of one location by intermediate level values and text.
+
+    Keys are (value of each group field..., text), or simply (text,) without
+    group fields. Each value holds the files the text appears in (a single file
+    name, or a list once a second file is seen) and the first tag seen with it.
+    Blank texts and documents are skipped.
+
+    Args:
+        file_tags_by_name: Dictionary mapping file names to their tags
+        group_fields: Tag fields of the included intermediate levels, in order
+        document_categories: Memo of whether a category value means "document"
+
+    Returns:
+        Dictionary mapping group keys to {"files": file name or [...], "tag": tag}
+    """
+    tags_by_group = {}
+    for file_name, file_tags in file_tags_by_name.items():
+        for tag in file_tags:
+            # Bind the lookup once; each tag is read several times below
+            tag_get = tag.get
+
+            # Skip blank tags first, they are usually more common than documents
+            text = tag_get("text", "")
+            if text:
+                text = text.strip()
+            if not text:
+                continue
+
+            # Skip documents (categories are few, so lower() runs once per distinct value)
+            category = tag_get("category", "")
+            is_document = document_categories.get(category)
+            if is_document is None:
+                is_document = category.lower() == "document"
+                document_categories[category] = is_document
+            if is_document:
+                continue
+
+            group_key = (
+                *[tag_get(field, "") or "Unclassified" for field in group_fields],
+                text,
+            )
+
+            # Collect all files where this tag appears
+            # Tags are visited file by file, so a repeated file is always the last one
+            # A single file is kept as a string; a list is only built for a second one
+            tag_info = tags_by_group.get(group_key)
+            if tag_info is None:
+                # First tag seen with this text; its fields describe the asset
+                tags_by_group[group_key] = {"files": file_name, "tag": tag}
+                continue
+            files = tag_info["files"]
+            if isinstance(files, str):
+                if files != file_name:
+                    tag_info["files"] = [files, file_name]
+            elif files[-1] != file_name:
+                files.append(file_name)
+
+    return tags_by_group
 
 
 def generate_hierarchy(
@@ -104,6 +225,49 @@ def generate_hierarchy(
 ) -> List[Dict[str, Any]]:
     """Generate the complete asset hierarchy.
 
+    Args:
+        locations: List of location dictionaries
+        tags: List of tag dictionaries
+        space: Instance space for assets
+        include_resource_subtype: Include resourceSubType (equipment_class_name) as intermediate level
+        include_resource_type: Include resourceType (tag_class_name) as intermediate level
+        include_resource_subsubtype: Include resourceSubSubType (equipment_subclass_name) as intermediate level
+        include_resource_variant: Include resourceVariant (equipment_variant_name) as intermediate level
+        hierarchy_levels: List of hierarchy level names in order (e.g., ['site', 'plant', 'area', 'system'])
+                         If None, defaults to ['site', 'plant', 'area', 'system'] for backward compatibility
+
+    Returns:
+        List of all assets, see generate_hierarchy_iter for the order
+    """
+    return list(
+        generate_hierarchy_iter(
+            locations,
+            tags,
+            space=space,
+            include_resource_subtype=include_resource_subtype,
+            include_resource_type=include_resource_type,
+            include_resource_subsubtype=include_resource_subsubtype,
+            include_resource_variant=include_resource_variant,
+            hierarchy_levels=hierarchy_levels,
+        )
+    )
+
+
+def generate_hierarchy_iter(
+    locations: List[Dict[str, str]],
+    tags: List[Dict[str, Any]],
+    space: str = "sp_enterprise_schema",
+    include_resource_subtype: bool = False,
+    include_resource_type: bool = False,
+    include_resource_subsubtype: bool = False,
+    include_resource_variant: bool = False,
+    hierarchy_levels: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate the asset hierarchy, yielding assets location by location.
+
+    Assets are yielded in the order generate_hierarchy returns them, parents
+    before children, so only the assets of one location are held at a time.
+
     Args:
         locations: List of location dictionaries
         tags: List of tag dictionaries
@@ -120,42 +284,218 @@ def generate_hierarchy(
         hierarchy_levels = ["site", "plant", "area", "system"]
 
     if not hierarchy_levels:
-        return []
+        return
 
-    assets = []
-    created_assets = set()  # Track created external_ids to avoid duplicates
+    # Level names are used as node tags and in every level external_id
+    hierarchy_levels = [sys.intern(level) for level in hierarchy_levels]
 
-    # Track which files belong to which system
-    file_to_location = {}
-    for tag in tags:
-        file_name = tag.get("file_name", "")
-        if file_name and file_name not in file_to_location:
-            location = match_file_to_system(file_name, locations)
-            if location:
-                file_to_location[file_name] = location
+    assets = []
+    # Track created asset_tag external_ids to avoid duplicates
+    # (level and intermediate nodes are tracked by descriptions_by_external_id)
+    created_tag_ids = set()
 
     # Build system key from all hierarchy levels
+    # Keys are memoized by id(): the location dicts stay alive in `locations` for the whole call
+    code_keys = [f"{level}_code" for level in hierarchy_levels]
+    location_keys_by_id = {}
+
+    # Per-level field names and prefixes, built once instead of inside the loops
+    capitalized_levels = {level: level.capitalize() for level in hierarchy_levels}
+    level_prefixes = {level: f"{level}_" for level in hierarchy_levels}
+
     def get_location_key(location: Dict[str, str]) -> tuple:
         """Get a tuple key from location using all hierarchy levels."""
-        return tuple(location.get(f"{level}_code", "") for level in hierarchy_levels)
-
-    # Group tags by file_name and location key
-    tags_by_file_and_location = defaultdict(lambda: defaultdict(list))
+        location_id = id(location)
+        location_key = location_keys_by_id.get(location_id)
+        if location_key is None:
+            location_key = tuple(location.get(code_key, "") for code_key in code_keys)
+            location_keys_by_id[location_id] = location_key
+        return location_key
+
+    # Group tags by file_name and location key, matching each file to its system once
+    file_to_location = {}
+    unmatched_files = set()  # Files already known not to match any location
+    location_index = build_location_index(locations)
+    tags_by_file_and_location = {}
     for tag in tags:
         file_name = tag.get("file_name", "")
-        if file_name and file_name in file_to_location:
-            location = file_to_location[file_name]
-            location_key = get_location_key(location)
-            tags_by_file_and_location[location_key][file_name].append(tag)
+        if not file_name or file_name in unmatched_files:
+            continue
+        location = file_to_location.get(file_name)
+        if location is None:
+            location = match_file_to_system(file_name, locations, location_index)
+            if not location:
+                unmatched_files.add(file_name)
+                continue
+            file_to_location[file_name] = location
+        location_key = get_location_key(location)
+        tags_by_file_and_location.setdefault(location_key, {}).setdefault(
+            file_name, []
+        ).append(tag)
+
+    # Intermediate levels between the deepest location level and the asset tags:
+    # (tag field to group by, level name used as tag, external_id prefix)
+    intermediate_levels = [
+        (field, level, f"{level}_")
+        for field, level, include in (
+            ("resourceType", "resource_type", include_resource_type),
+            ("resourceSubType", "resource_subtype", include_resource_subtype),
+            ("resourceSubSubType", "resource_subsubtype", include_resource_subsubtype),
+            ("resourceVariant", "resource_variant", include_resource_variant),
+        )
+        if include
+    ]
+
+    def create_intermediate_assets(
+        path: tuple,
+        group_parents: Dict[tuple, tuple],
+        deepest_level_code: str,
+    ) -> tuple:
+        """Create the intermediate level nodes along a path of level values.
+
+        group_parents maps each already created path prefix to its
+        (external_id, external_id without level prefix), with () mapping to
+        the deepest location level. Missing prefixes are created and added.
+        """
+        for depth in range(1, len(path) + 1):
+            if path[:depth] in group_parents:
+                continue
+
+            _, level, level_prefix = intermediate_levels[depth - 1]
+            parent_external_id, parent_id_suffix = group_parents[path[: depth - 1]]
+            value = path[depth - 1]
+            safe_value = value.translate(_SAFE_NAME_TRANS)
+            # External_id without the level prefix, used to build child external_ids
+            id_suffix = f"{parent_id_suffix}_{safe_value}"
+            external_id = level_prefix + id_suffix
+
+            if external_id not in descriptions_by_external_id:
+                # Interned: the same value names a node in many locations
+                value_formatted = sys.intern(
+                    value.replace("_", " ") if value != "Unclassified" else value
+                )
+                parent_description = descriptions_by_external_id.get(
+                    parent_external_id,
+                    path[depth - 2] if depth > 1 else deepest_level_code,
+                )
+                description = f"{parent_description} > {value_formatted}"
+                descriptions_by_external_id[external_id] = description
+                base_descriptions_by_external_id[external_id] = value_formatted
+
+                assets.append(
+                    _create_node_instance(
+                        external_id,
+                        value_formatted,
+                        description,
+                        parent_external_id,
+                        space,
+                        level,
+                    )
+                )
+
+            group_parents[path[:depth]] = (external_id, id_suffix)
+
+        return group_parents[path]
+
+    # Formatted resourceSubType prefix of tag descriptions, per resourceSubType value
+    subtype_prefixes = {}
+
+    def create_group_assets(
+        tags_by_group: Dict[tuple, Dict[str, Any]],
+        deepest_external_id: str,
+        deepest_id_suffix: str,
+        deepest_level_code: str,
+        tag_description_suffix: str,
+    ) -> None:
+        """Create intermediate level nodes and the asset_tag nodes under them.
+
+        tags_by_group maps (intermediate level values..., tag text) to the tag info.
+        """
+        group_parents = {(): (deepest_external_id, deepest_id_suffix)}
+
+        # Create all intermediate level nodes first, once per distinct path
+        if intermediate_levels:
+            for path in dict.fromkeys(group_key[:-1] for group_key in tags_by_group):
+                create_intermediate_assets(path, group_parents, deepest_level_code)
+
+        # Process tags across all files for each group
+        for group_key, tag_info in tags_by_group.items():
+            parent_external_id, parent_id_suffix = group_parents[group_key[:-1]]
+            text = group_key[-1]
+
+            tag_data_get = tag_info["tag"].get
+            # Sanitize text for use in external ID (replace special chars)
+            safe_text = text.translate(_SAFE_NAME_TRANS)
+            tag_external_id = f"asset_tag_{parent_id_suffix}_{safe_text}"
+
+            if tag_external_id not in created_tag_ids:
+                # Comma-separated list of all files, sorted for consistency
+                # Most tags appear in a single file, which needs neither sort nor join
+                files = tag_info["files"]
+                if isinstance(files, str):
+                    source_files_str = files
+                else:
+                    source_files_str = ", ".join(sorted(files))
+
+                # Create description from resourceSubType in camel case with spaces
+                resource_sub_type = tag_data_get("resourceSubType", "")
+                subtype_prefix = subtype_prefixes.get(resource_sub_type)
+                if subtype_prefix is None:
+                    if resource_sub_type and resource_sub_type != "Unclassified":
+                        # Convert from snake_case/underscore to camel case with spaces
+                        # e.g., "Level_Monitor" -> "Level Monitor"
+                        subtype_prefix = f"{resource_sub_type.replace('_', ' ')} "
+                    else:
+                        # Fallback to text if no valid resourceSubType
+                        subtype_prefix = ""
+                    subtype_prefixes[resource_sub_type] = subtype_prefix
+                resource_sub_type_formatted = subtype_prefix + text
+
+                # Description format: "{resourceSubType} for {system} in {plant} {area} at {site}"
+                tag_description = resource_sub_type_formatted + tag_description_suffix
+
+                # Set sourceFile and sourceContext to comma-separated list of all files where tag appears
+                asset = create_asset_instance(
+                    external_id=tag_external_id,
+                    name=text,
+                    description=tag_description,
+                    parent_external_id=parent_external_id,
+                    space=space,
+                    level="asset_tag",
+                    confidence=tag_data_get("confidence"),
+                    category=tag_data_get("category"),
+                    resourceSubType=tag_data_get("resourceSubType"),
+                    resourceType=tag_data_get("resourceType"),
+                    standard=tag_data_get("standard"),
+                    sourceFile=source_files_str,
+                    sourceContext=source_files_str,
+                )
+                assets.append(asset)
+                created_tag_ids.add(tag_external_id)
+
+    # Whether a tag category value means "document", memoized per category value
+    document_categories = {}
+    # Tag fields holding the value of each intermediate level
+    group_fields = [field for field, _, _ in intermediate_levels]
 
     # Create hierarchy for each unique location
     processed_locations = set()
     # Track cumulative descriptions by external_id for all hierarchy levels
+    # (also serves as the set of created level and intermediate nodes)
     descriptions_by_external_id = {}
     # Track base descriptions (non-cumulative) for use in asset_tag descriptions
     base_descriptions_by_external_id = {}
 
+    # Location key and level external_ids of the previously processed location
+    previous_loc_key = ()
+    previous_level_ids = []
+
     for location in locations:
+        # Hand over the assets of the previous location
+        if assets:
+            yield from assets
+            assets.clear()
+
         # Create unique key for location
         loc_key = get_location_key(location)
 
@@ -178,18 +518,23 @@ def generate_hierarchy(
 
         # Build hierarchy levels dynamically
         level_external_ids = {}  # Track external_id for each level
-        level_codes = {}  # Track code for each level
-
-        # Extract codes and names for each level
-        for level in hierarchy_levels:
-            level_codes[level] = location.get(f"{level}_code", "")
-            # Handle case where 'System' might be capitalized in location dict
-            level_name = location.get(
-                level, location.get(level.capitalize(), level_codes[level])
-            )
+
+        # Extract codes for each level (the location key holds them in level order)
+        level_codes = dict(zip(hierarchy_levels, loc_key))
+
+        # Levels whose codes match the previously processed location resolve to the
+        # same nodes. Locations are listed depth-first, so neighbours share prefixes.
+        shared_levels = 0
+        for code, previous_code in zip(loc_key, previous_loc_key):
+            if code != previous_code:
+                break
+            shared_levels += 1
+        shared_levels = min(shared_levels, len(previous_level_ids))
 
         # Create assets for each hierarchy level up to the deepest non-empty level
         parent_external_id = None
+        parent_codes = []  # Codes of the levels created so far, in order
+        level_ids = []  # External_id per level index (None for levels without code)
         for level_index, level in enumerate(hierarchy_levels):
             level_code = level_codes[level]
 
@@ -199,60 +544,67 @@ def generate_hierarchy(
 
             # Skip creating asset if this level has no code (shouldn't happen due to deepest_level_index, but safety check)
             if not level_code:
+                level_ids.append(None)
                 continue
 
-            level_name = location.get(
-                level, location.get(level.capitalize(), level_code)
-            )
+            if level_index < shared_levels:
+                # Same codes up to this level as the previous location: same node
+                level_external_id = previous_level_ids[level_index]
+            else:
+                # Handle case where 'System' might be capitalized in location dict
+                level_name = location.get(
+                    level, location.get(capitalized_levels[level], level_code)
+                )
 
-            # Build external_id from all parent levels
-            external_id_parts = [level]
-            for prev_level in hierarchy_levels[:level_index]:
-                prev_code = level_codes[prev_level]
-                if prev_code:  # Only include non-empty parent codes
-                    external_id_parts.append(prev_code)
-            external_id_parts.append(level_code)
-            level_external_id = "_".join(external_id_parts)
-
-            if level_external_id not in created_assets:
-                if level_index == 0:
-                    # Root level
-                    description = level_name
-                    descriptions_by_external_id[level_external_id] = description
-                    base_descriptions_by_external_id[level_external_id] = description
-                    assets.append(
-                        create_asset_instance(
-                            external_id=level_external_id,
-                            name=level_code,
-                            description=description,
-                            space=space,
-                            level=level,
-                            confidence=1.0,
+                # Build external_id from all (non-empty) parent level codes
+                level_external_id = "_".join([level, *parent_codes, level_code])
+
+                if level_external_id not in descriptions_by_external_id:
+                    if level_index == 0:
+                        # Root level
+                        description = level_name
+                        descriptions_by_external_id[level_external_id] = description
+                        base_descriptions_by_external_id[
+                            level_external_id
+                        ] = description
+                        assets.append(
+                            _create_node_instance(
+                                level_external_id,
+                                level_code,
+                                description,
+                                None,
+                                space,
+                                level,
+                                confidence=1.0,
+                            )
                         )
-                    )
-                else:
-                    # Child level
-                    parent_description = descriptions_by_external_id.get(
-                        parent_external_id, ""
-                    )
-                    description = f"{parent_description} > {level_name}"
-                    descriptions_by_external_id[level_external_id] = description
-                    base_descriptions_by_external_id[level_external_id] = level_name
-                    assets.append(
-                        create_asset_instance(
-                            external_id=level_external_id,
-                            name=level_code,
-                            description=description,
-                            parent_external_id=parent_external_id,
-                            space=space,
-                            level=level,
-                            confidence=1.0,
+                    else:
+                        # Child level
+                        parent_description = descriptions_by_external_id.get(
+                            parent_external_id, ""
+                        )
+                        description = f"{parent_description} > {level_name}"
+                        descriptions_by_external_id[level_external_id] = description
+                        base_descriptions_by_external_id[level_external_id] = level_name
+                        assets.append(
+                            _create_node_instance(
+                                level_external_id,
+                                level_code,
+                                description,
+                                parent_external_id,
+                                space,
+                                level,
+                                confidence=1.0,
+                            )
                         )
-                    )
-                created_assets.add(level_external_id)
 
+            level_ids.append(level_external_id)
             level_external_ids[level] = level_external_id
             parent_external_id = level_external_id
+            parent_codes.append(level_code)
+
+        previous_loc_key = loc_key
+        previous_level_ids = level_ids
 
         # Get the deepest level's external_id for tag processing (may not be the last level if files are at intermediate levels)
         deepest_level = hierarchy_levels[deepest_level_index]
@@ -265,538 +617,34 @@ def generate_hierarchy(
         system_file_tags = tags_by_file_and_location.get(location_key, {})
 
         # Only process tags if we have a valid external_id for the deepest level
-        if not deepest_external_id:
+        # (and there are tags; the description suffix is only built when needed)
+        if not deepest_external_id or not system_file_tags:
             continue
 
+        # The location part of tag descriptions is shared by all tags in this location
+        tag_description_suffix = build_tag_description_suffix(
+            hierarchy_levels,
+            level_external_ids,
+            base_descriptions_by_external_id,
+            level_codes,
+        )
+
         # Build prefix to remove from deepest_external_id when creating child external_ids
         # This removes the hierarchy level prefix (e.g., "system_", "plant_", etc.) based on config
-        deepest_level_prefix = f"{deepest_level}_"
-        deepest_external_id_without_prefix = (
-            deepest_external_id.replace(deepest_level_prefix, "", 1)
-            if deepest_external_id.startswith(deepest_level_prefix)
-            else deepest_external_id
+        deepest_level_prefix = level_prefixes[deepest_level]
+        deepest_external_id_without_prefix = deepest_external_id.removeprefix(
+            deepest_level_prefix
         )
 
-        if include_resource_type and include_resource_subtype:
-            # Hierarchy: system -> resource_type -> resource_subtype -> asset_tag
-            # Group tags by resourceType first, then resourceSubType, then by text (across all files)
-            tags_by_resource_type = defaultdict(
-                lambda: defaultdict(
-                    lambda: defaultdict(lambda: {"files": set(), "tag_data": None})
-                )
-            )
-            for file_name, file_tags in system_file_tags.items():
-                for tag in file_tags:
-                    # Skip documents
-                    if tag.get("category", "").lower() == "document":
-                        continue
-
-                    text = tag.get("text", "").strip()
-                    if not text:
-                        continue
-
-                    resource_type = tag.get("resourceType", "") or "Unclassified"
-                    resource_sub_type = tag.get("resourceSubType", "") or "Unclassified"
-
-                    # Collect all files where this tag appears
-                    if (
-                        text
-                        not in tags_by_resource_type[resource_type][resource_sub_type]
-                    ):
-                        tags_by_resource_type[resource_type][resource_sub_type][
-                            text
-                        ] = {
-                            "files": set(),
-                            "tag_data": {
-                                "text": text,
-                                "confidence": tag.get("confidence"),
-                                "category": tag.get("category"),
-                                "resourceSubType": tag.get("resourceSubType"),
-                                "resourceType": tag.get("resourceType"),
-                                "standard": tag.get("standard"),
-                            },
-                        }
-                    tags_by_resource_type[resource_type][resource_sub_type][text][
-                        "files"
-                    ].add(file_name)
-
-            # Create resourceType nodes, then resourceSubType nodes, then asset_tag nodes
-            for resource_type, subtypes_dict in tags_by_resource_type.items():
-                # Create resourceType node
-                safe_resource_type = (
-                    resource_type.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
-                resource_type_external_id = f"resource_type_{deepest_external_id_without_prefix}_{safe_resource_type}"
-
-                if resource_type_external_id not in created_assets:
-                    resource_type_formatted = (
-                        resource_type.replace("_", " ")
-                        if resource_type != "Unclassified"
-                        else "Unclassified"
-                    )
-                    system_description_cumulative = descriptions_by_external_id.get(
-                        deepest_external_id, deepest_level_code
-                    )
-                    resource_type_description = (
-                        f"{system_description_cumulative} > {resource_type_formatted}"
-                    )
-                    descriptions_by_external_id[
-                        resource_type_external_id
-                    ] = resource_type_description
-                    base_descriptions_by_external_id[
-                        resource_type_external_id
-                    ] = resource_type_formatted
-
-                    assets.append(
-                        create_asset_instance(
-                            external_id=resource_type_external_id,
-                            name=resource_type_formatted,
-                            description=resource_type_description,
-                            parent_external_id=deepest_external_id,
-                            space=space,
-                            level="resource_type",
-                        )
-                    )
-                    created_assets.add(resource_type_external_id)
-
-                # Process resourceSubType nodes under this resourceType
-                for resource_sub_type, tags_by_text_dict in subtypes_dict.items():
-                    # Create resourceSubType node
-                    safe_resource_sub_type = (
-                        resource_sub_type.replace(" ", "_")
-                        .replace("-", "_")
-                        .replace("/", "_")
-                        .replace("&", "_")
-                    )
-                    resource_subtype_external_id = f"resource_subtype_{resource_type_external_id.replace('resource_type_', '')}_{safe_resource_sub_type}"
-
-                    if resource_subtype_external_id not in created_assets:
-                        resource_sub_type_formatted = (
-                            resource_sub_type.replace("_", " ")
-                            if resource_sub_type != "Unclassified"
-                            else "Unclassified"
-                        )
-                        resource_type_description_cumulative = (
-                            descriptions_by_external_id.get(
-                                resource_type_external_id, resource_type
-                            )
-                        )
-                        resource_subtype_description = f"{resource_type_description_cumulative} > {resource_sub_type_formatted}"
-                        descriptions_by_external_id[
-                            resource_subtype_external_id
-                        ] = resource_subtype_description
-                        base_descriptions_by_external_id[
-                            resource_subtype_external_id
-                        ] = resource_sub_type_formatted
-
-                        assets.append(
-                            create_asset_instance(
-                                external_id=resource_subtype_external_id,
-                                name=resource_sub_type_formatted,
-                                description=resource_subtype_description,
-                                parent_external_id=resource_type_external_id,
-                                space=space,
-                                level="resource_subtype",
-                            )
-                        )
-                        created_assets.add(resource_subtype_external_id)
-
-                    # Process tags across all files for this resourceSubType
-                    for text, tag_info in tags_by_text_dict.items():
-                        tag_data = tag_info["tag_data"]
-                        source_files = sorted(tag_info["files"])  # Sort for consistency
-                        source_files_str = ", ".join(
-                            source_files
-                        )  # Comma-separated list of all files
-
-                        safe_text = (
-                            text.replace(" ", "_")
-                            .replace("-", "_")
-                            .replace("/", "_")
-                            .replace("&", "_")
-                        )
-                        tag_external_id = f"asset_tag_{resource_subtype_external_id.replace('resource_subtype_', '')}_{safe_text}"
-
-                        if tag_external_id not in created_assets:
-                            resource_sub_type_formatted = tag_data.get(
-                                "resourceSubType", ""
-                            )
-                            if (
-                                resource_sub_type_formatted
-                                and resource_sub_type_formatted != "Unclassified"
-                            ):
-                                resource_sub_type_formatted = f"{resource_sub_type_formatted.replace('_', ' ')} {tag_data['text']}"
-                            else:
-                                resource_sub_type_formatted = tag_data["text"]
-
-                            tag_description = build_tag_description(
-                                resource_sub_type_formatted,
-                                hierarchy_levels,
-                                level_external_ids,
-                                base_descriptions_by_external_id,
-                                level_codes,
-                            )
-
-                            asset = create_asset_instance(
-                                external_id=tag_external_id,
-                                name=tag_data["text"],
-                                description=tag_description,
-                                parent_external_id=resource_subtype_external_id,
-                                space=space,
-                                level="asset_tag",
-                                confidence=tag_data.get("confidence"),
-                                category=tag_data.get("category"),
-                                resourceSubType=tag_data.get("resourceSubType"),
-                                resourceType=tag_data.get("resourceType"),
-                                standard=tag_data.get("standard"),
-                                sourceFile=source_files_str,
-                                sourceContext=source_files_str,
-                            )
-                            assets.append(asset)
-                            created_assets.add(tag_external_id)
-
-        elif include_resource_type:
-            # Hierarchy: system -> resource_type -> asset_tag
-            # Group tags by resourceType first, then by text (across all files)
-            tags_by_resource_type = defaultdict(
-                lambda: defaultdict(lambda: {"files": set(), "tag_data": None})
-            )
-            for file_name, file_tags in system_file_tags.items():
-                for tag in file_tags:
-                    # Skip documents
-                    if tag.get("category", "").lower() == "document":
-                        continue
-
-                    text = tag.get("text", "").strip()
-                    if not text:
-                        continue
-
-                    resource_type = tag.get("resourceType", "") or "Unclassified"
-
-                    # Collect all files where this tag appears
-                    if text not in tags_by_resource_type[resource_type]:
-                        tags_by_resource_type[resource_type][text] = {
-                            "files": set(),
-                            "tag_data": {
-                                "text": text,
-                                "confidence": tag.get("confidence"),
-                                "category": tag.get("category"),
-                                "resourceSubType": tag.get("resourceSubType"),
-                                "resourceType": tag.get("resourceType"),
-                                "standard": tag.get("standard"),
-                            },
-                        }
-                    tags_by_resource_type[resource_type][text]["files"].add(file_name)
-
-            # Create resourceType nodes and asset_tag nodes under them
-            for resource_type, file_tags_dict in tags_by_resource_type.items():
-                # Create resourceType node
-                safe_resource_type = (
-                    resource_type.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
-                resource_type_external_id = f"resource_type_{deepest_external_id_without_prefix}_{safe_resource_type}"
-
-                if resource_type_external_id not in created_assets:
-                    resource_type_formatted = (
-                        resource_type.replace("_", " ")
-                        if resource_type != "Unclassified"
-                        else "Unclassified"
-                    )
-                    system_description_cumulative = descriptions_by_external_id.get(
-                        deepest_external_id, deepest_level_code
-                    )
-                    resource_type_description = (
-                        f"{system_description_cumulative} > {resource_type_formatted}"
-                    )
-                    descriptions_by_external_id[
-                        resource_type_external_id
-                    ] = resource_type_description
-                    base_descriptions_by_external_id[
-                        resource_type_external_id
-                    ] = resource_type_formatted
-
-                    assets.append(
-                        create_asset_instance(
-                            external_id=resource_type_external_id,
-                            name=resource_type_formatted,
-                            description=resource_type_description,
-                            parent_external_id=deepest_external_id,
-                            space=space,
-                            level="resource_type",
-                        )
-                    )
-                    created_assets.add(resource_type_external_id)
-
-                # Process tags across all files for this resourceType
-                for text, tag_info in file_tags_dict.items():
-                    tag_data = tag_info["tag_data"]
-                    source_files = sorted(tag_info["files"])  # Sort for consistency
-                    source_files_str = ", ".join(
-                        source_files
-                    )  # Comma-separated list of all files
-
-                    safe_text = (
-                        text.replace(" ", "_")
-                        .replace("-", "_")
-                        .replace("/", "_")
-                        .replace("&", "_")
-                    )
-                    tag_external_id = f"asset_tag_{resource_type_external_id.replace('resource_type_', '')}_{safe_text}"
-
-                    if tag_external_id not in created_assets:
-                        resource_sub_type = tag_data.get("resourceSubType", "")
-                        if resource_sub_type and resource_sub_type != "Unclassified":
-                            resource_sub_type_formatted = f"{resource_sub_type.replace('_', ' ')} {tag_data['text']}"
-                        else:
-                            resource_sub_type_formatted = tag_data["text"]
-
-                        tag_description = build_tag_description(
-                            resource_sub_type_formatted,
-                            hierarchy_levels,
-                            level_external_ids,
-                            base_descriptions_by_external_id,
-                            level_codes,
-                        )
-
-                        asset = create_asset_instance(
-                            external_id=tag_external_id,
-                            name=tag_data["text"],
-                            description=tag_description,
-                            parent_external_id=resource_type_external_id,
-                            space=space,
-                            level="asset_tag",
-                            confidence=tag_data.get("confidence"),
-                            category=tag_data.get("category"),
-                            resourceSubType=tag_data.get("resourceSubType"),
-                            resourceType=tag_data.get("resourceType"),
-                            standard=tag_data.get("standard"),
-                            sourceFile=source_files_str,
-                            sourceContext=source_files_str,
-                        )
-                        assets.append(asset)
-                        created_assets.add(tag_external_id)
-
-        elif include_resource_subtype:
-            # Group tags by resourceSubType first, then by text (across all files)
-            tags_by_resource_subtype = defaultdict(
-                lambda: defaultdict(lambda: {"files": set(), "tag_data": None})
-            )
-            for file_name, file_tags in system_file_tags.items():
-                for tag in file_tags:
-                    # Skip documents
-                    if tag.get("category", "").lower() == "document":
-                        continue
-
-                    text = tag.get("text", "").strip()
-                    if not text:
-                        continue
-
-                    resource_sub_type = tag.get("resourceSubType", "") or "Unclassified"
-
-                    # Collect all files where this tag appears
-                    if text not in tags_by_resource_subtype[resource_sub_type]:
-                        tags_by_resource_subtype[resource_sub_type][text] = {
-                            "files": set(),
-                            "tag_data": {
-                                "text": text,
-                                "confidence": tag.get("confidence"),
-                                "category": tag.get("category"),
-                                "resourceSubType": tag.get("resourceSubType"),
-                                "resourceType": tag.get("resourceType"),
-                                "standard": tag.get("standard"),
-                            },
-                        }
-                    tags_by_resource_subtype[resource_sub_type][text]["files"].add(
-                        file_name
-                    )
-
-            # Create resourceSubType nodes and asset_tag nodes under them
-            for resource_sub_type, file_tags_dict in tags_by_resource_subtype.items():
-                # Create resourceSubType node
-                safe_resource_sub_type = (
-                    resource_sub_type.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
-                resource_subtype_external_id = f"resource_subtype_{deepest_external_id_without_prefix}_{safe_resource_sub_type}"
-
-                if resource_subtype_external_id not in created_assets:
-                    resource_sub_type_formatted = (
-                        resource_sub_type.replace("_", " ")
-                        if resource_sub_type != "Unclassified"
-                        else "Unclassified"
-                    )
-                    system_description_cumulative = descriptions_by_external_id.get(
-                        deepest_external_id, deepest_level_code
-                    )
-                    resource_subtype_description = f"{system_description_cumulative} > {resource_sub_type_formatted}"
-                    descriptions_by_external_id[
-                        resource_subtype_external_id
-                    ] = resource_subtype_description
-                    base_descriptions_by_external_id[
-                        resource_subtype_external_id
-                    ] = resource_sub_type_formatted
-
-                    assets.append(
-                        create_asset_instance(
-                            external_id=resource_subtype_external_id,
-                            name=resource_sub_type_formatted,
-                            description=resource_subtype_description,
-                            parent_external_id=deepest_external_id,
-                            space=space,
-                            level="resource_subtype",
-                        )
-                    )
-                    created_assets.add(resource_subtype_external_id)
-
-                # Process tags across all files for this resourceSubType
-                for text, tag_info in file_tags_dict.items():
-                    tag_data = tag_info["tag_data"]
-                    source_files = sorted(tag_info["files"])  # Sort for consistency
-                    source_files_str = ", ".join(
-                        source_files
-                    )  # Comma-separated list of all files
-
-                    safe_text = (
-                        text.replace(" ", "_")
-                        .replace("-", "_")
-                        .replace("/", "_")
-                        .replace("&", "_")
-                    )
-                    tag_external_id = f"asset_tag_{resource_subtype_external_id.replace('resource_subtype_', '')}_{safe_text}"
-
-                    if tag_external_id not in created_assets:
-                        resource_sub_type_formatted = tag_data.get(
-                            "resourceSubType", ""
-                        )
-                        if (
-                            resource_sub_type_formatted
-                            and resource_sub_type_formatted != "Unclassified"
-                        ):
-                            resource_sub_type_formatted = f"{resource_sub_type_formatted.replace('_', ' ')} {tag_data['text']}"
-                        else:
-                            resource_sub_type_formatted = tag_data["text"]
-
-                        tag_description = build_tag_description(
-                            resource_sub_type_formatted,
-                            hierarchy_levels,
-                            level_external_ids,
-                            base_descriptions_by_external_id,
-                            level_codes,
-                        )
+        # Group tags by the value of each intermediate level and text (across all files)
+        tags_by_group = _group_tags(system_file_tags, group_fields, document_categories)
 
-                        asset = create_asset_instance(
-                            external_id=tag_external_id,
-                            name=tag_data["text"],
-                            description=tag_description,
-                            parent_external_id=resource_subtype_external_id,
-                            space=space,
-                            level="asset_tag",
-                            confidence=tag_data.get("confidence"),
-                            category=tag_data.get("category"),
-                            resourceSubType=tag_data.get("resourceSubType"),
-                            resourceType=tag_data.get("resourceType"),
-                            standard=tag_data.get("standard"),
-                            sourceFile=source_files_str,
-                            sourceContext=source_files_str,
-                        )
-                        assets.append(asset)
-                        created_assets.add(tag_external_id)
-        else:
-            # Original behavior: asset_tag nodes directly under system
-            # Group tags by text across all files in this system
-            tags_by_text = {}
-            for file_name, file_tags in system_file_tags.items():
-                for tag in file_tags:
-                    # Skip documents
-                    if tag.get("category", "").lower() == "document":
-                        continue
-
-                    text = tag.get("text", "").strip()
-                    if not text:
-                        continue
-
-                    # Collect all files where this tag appears
-                    if text not in tags_by_text:
-                        tags_by_text[text] = {
-                            "files": set(),
-                            "tag_data": {
-                                "text": text,
-                                "confidence": tag.get("confidence"),
-                                "category": tag.get("category"),
-                                "resourceSubType": tag.get("resourceSubType"),
-                                "resourceType": tag.get("resourceType"),
-                                "standard": tag.get("standard"),
-                            },
-                        }
-                    tags_by_text[text]["files"].add(file_name)
-
-            # Create assets for each unique tag
-            for text, tag_info in tags_by_text.items():
-                tag_data = tag_info["tag_data"]
-                source_files = sorted(tag_info["files"])  # Sort for consistency
-                source_files_str = ", ".join(
-                    source_files
-                )  # Comma-separated list of all files
-
-                # Create a unique external ID for this tag under the deepest level
-                # Sanitize text for use in external ID (replace special chars)
-                safe_text = (
-                    text.replace(" ", "_")
-                    .replace("-", "_")
-                    .replace("/", "_")
-                    .replace("&", "_")
-                )
-                tag_external_id = (
-                    f"asset_tag_{deepest_external_id_without_prefix}_{safe_text}"
-                )
-
-                if tag_external_id not in created_assets:
-                    # Create description from resourceSubType in camel case with spaces
-                    resource_sub_type = tag_data.get("resourceSubType", "")
-                    if resource_sub_type and resource_sub_type != "Unclassified":
-                        # Convert from snake_case/underscore to camel case with spaces
-                        # e.g., "Level_Monitor" -> "Level Monitor"
-                        resource_sub_type_formatted = (
-                            f"{resource_sub_type.replace('_', ' ')} {tag_data['text']}"
-                        )
-                    else:
-                        # Fallback to text if no valid resourceSubType
-                        resource_sub_type_formatted = tag_data["text"]
-
-                    # Build description using format: "{resourceSubType} for {system} in {plant} {area} at {site}"
-                    tag_description = build_tag_description(
-                        resource_sub_type_formatted,
-                        hierarchy_levels,
-                        level_external_ids,
-                        base_descriptions_by_external_id,
-                        level_codes,
-                    )
-
-                    # Set sourceFile and sourceContext to comma-separated list of all files where tag appears
-                    asset = create_asset_instance(
-                        external_id=tag_external_id,
-                        name=tag_data["text"],
-                        description=tag_description,
-                        parent_external_id=deepest_external_id,
-                        space=space,
-                        level="asset_tag",
-                        confidence=tag_data.get("confidence"),
-                        category=tag_data.get("category"),
-                        resourceSubType=tag_data.get("resourceSubType"),
-                        resourceType=tag_data.get("resourceType"),
-                        standard=tag_data.get("standard"),
-                        sourceFile=source_files_str,
-                        sourceContext=source_files_str,
-                    )
-                    assets.append(asset)
-                    created_assets.add(tag_external_id)
+        create_group_assets(
+            tags_by_group,
+            deepest_external_id,
+            deepest_external_id_without_prefix,
+            deepest_level_code,
+            tag_description_suffix,
+        )
 
-    return assets
+    yield from assets
@@ -12,6 +12,12 @@ from cognite.client import CogniteClient
 from cognite.client.exceptions import CogniteAPIError
 from pydantic import BaseModel, Field
 
+# Use libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class Parameters(BaseModel):
     """Parameters for extract annotation tags pipeline."""
@@ -73,6 +79,6 @@ def load_config_parameters(
             f"Not able to retrieve pipeline config for extraction pipeline: {pipeline_ext_id!r}"
         )
 
-    config_dict = yaml.safe_load(raw_config.config)
+    config_dict = yaml.load(raw_config.config, Loader=_YamlLoader)
     config_dict["externalId"] = pipeline_ext_id
     return Config.model_validate(config_dict)
@@ -1,6 +1,7 @@
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Tuple
 
 from cognite.client import ClientConfig, CogniteClient
 from cognite.client.credentials import OAuthClientCredentials
@@ -31,7 +32,12 @@ except ImportError:
         client_secret: str
 
 
+@lru_cache(maxsize=1)
 def get_env_variables() -> EnvConfig:
+    """Load the CDF connection settings from .env and the environment.
+
+    The result is cached, so .env is only read on the first call in a process.
+    """
     print("Loading environment variables from .env...")
 
     project_path = (Path(__file__).parent / ".env").resolve()
@@ -60,24 +66,27 @@ def get_env_variables() -> EnvConfig:
     )
 
 
+@lru_cache(maxsize=32)
+def _build_urls(cluster: str, tenant_id: str) -> Tuple[Tuple[str, ...], str, str]:
+    """Return the (scopes, token URL, default base URL) for a cluster and tenant."""
+    cluster_url = f"https://{cluster}.cognitedata.com"
+    token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+    return (f"{cluster_url}/.default",), token_url, cluster_url
+
+
 def create_client(env_config: EnvConfig, debug: bool = False):
-    SCOPES = [f"https://{env_config.cdf_cluster}.cognitedata.com/.default"]
-    TOKEN_URL = (
-        f"https://login.microsoftonline.com/{env_config.tenant_id}/oauth2/v2.0/token"
+    scopes, token_url, cluster_url = _build_urls(
+        env_config.cdf_cluster, env_config.tenant_id
     )
     creds = OAuthClientCredentials(
-        token_url=TOKEN_URL,
+        token_url=token_url,
         client_id=env_config.client_id,
         client_secret=env_config.client_secret,
-        scopes=SCOPES,
+        scopes=list(scopes),
     )
 
     # Try plink format first, fallback to standard format if connection fails
-    import os
-
-    base_url = (
-        os.getenv("CDF_BASE_URL") or f"https://{env_config.cdf_cluster}.cognitedata.com"
-    )
+    base_url = os.getenv("CDF_BASE_URL") or cluster_url
 
     cnf = ClientConfig(
         client_name="ExtractAssetsByPattern_Client",
@@ -90,7 +99,13 @@ def create_client(env_config: EnvConfig, debug: bool = False):
     return client
 
 
+@lru_cache(maxsize=8)
 def create_logger_service(log_level):
+    """Return the function logger for a log level.
+
+    Loggers hold no state besides their level, so one instance per level is
+    shared by every caller in a process.
+    """
     if log_level not in ["DEBUG", "INFO", "WARNING", "ERROR"]:
         return CogniteFunctionLogger("INFO", True)
     else:
@@ -6,29 +6,184 @@ CDF Functions or called directly, maintaining compatibility with the CDF
 workflow format.
 """
 
-from typing import Any, Dict
+from __future__ import annotations
 
-try:
+import importlib.util
+import os
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+# cognite-sdk is imported lazily where it is used to keep function cold starts fast
+if TYPE_CHECKING:
     from cognite.client import CogniteClient
 
-    CDF_AVAILABLE = True
-except ImportError:
-    CDF_AVAILABLE = False
 
-# Try to import CDF config loader
-try:
-    from .config import Config, load_config_parameters
+def _module_available(name: str) -> bool:
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        # Parent package is missing
+        return False
+
 
-    CDF_CONFIG_AVAILABLE = True
+CDF_AVAILABLE = _module_available("cognite.client")
+
+# Use libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
 except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Keys copied from the extraction pipeline config data into the handler data
+_CONFIG_KEYS = (
+    "patterns",
+    "limit",
+    "mime_type",
+    "instance_space",
+    "partial_match",
+    "min_tokens",
+    "batch_size",
+    "max_attempts",
+    "max_pages_per_chunk",
+    "max_parallel_batches",
+    "diagram_detect_config",
+)
+
+# Seconds a loaded extraction pipeline config is reused by warm invocations
+# (0 disables the cache)
+_CDF_CONFIG_TTL_SEC = int(os.getenv("CDF_CONFIG_TTL_SEC", "300"))
+
+# Loaded extraction pipeline configs by (project, base URL, pipeline external ID),
+# with the TTL window each was loaded in
+_pipeline_config_cache: Dict[Tuple[str, str, str], Tuple[int, Any]] = {}
+
+# Marks a key missing from the config data (None is a valid config value)
+_MISSING = object()
+
+# Keys only used inside the function run, left out of the returned data
+_INTERNAL_KEYS = ("_cdf_config",)
+
+# Keys run_locally takes from the config file data, and their local defaults
+_LOCAL_KEYS = (
+    "patterns",
+    "limit",
+    "mime_type",
+    "instance_space",
+    "partial_match",
+    "min_tokens",
+    "batch_size",
+    "max_attempts",
+    "max_pages_per_chunk",
+    "max_parallel_batches",
+)
+_LOCAL_DEFAULTS = {
+    "partial_match": True,
+    "min_tokens": 2,
+    "batch_size": 5,
+    "max_attempts": 3,
+    "max_pages_per_chunk": 50,
+    "max_parallel_batches": 1,
+}
+
+
+@lru_cache(maxsize=1)
+def _get_create_logger_service():
+    """Import create_logger_service on first use and reuse it afterwards."""
+    try:
+        from .dependencies import create_logger_service
+    except ImportError:
+        from dependencies import create_logger_service
+    return create_logger_service
+
+
+@lru_cache(maxsize=1)
+def _get_load_config_parameters() -> Optional[Callable[..., Any]]:
+    """Import the CDF config loader on first use; None if it is not available."""
     try:
-        from config import Config, load_config_parameters
+        from .config import load_config_parameters
+    except ImportError:
+        try:
+            from config import load_config_parameters
+        except ImportError:
+            return None
+    return load_config_parameters
 
-        CDF_CONFIG_AVAILABLE = True
+
+@lru_cache(maxsize=1)
+def _get_extract_assets_by_pattern():
+    """Import the pipeline on first use and reuse it afterwards."""
+    try:
+        from .pipeline import extract_assets_by_pattern
     except ImportError:
-        CDF_CONFIG_AVAILABLE = False
-        load_config_parameters = None
-        Config = None
+        from pipeline import extract_assets_by_pattern
+    return extract_assets_by_pattern
+
+
+def _load_pipeline_config_cached(
+    client: CogniteClient, pipeline_ext_id: str, ttl_bucket: int
+) -> Any:
+    """Load an extraction pipeline config, reusing it within one TTL window.
+
+    Entries are keyed by CDF project, base URL and pipeline, not by the client:
+    each function call gets a new client, and keeping clients as keys would also
+    keep them alive. A config loaded in another ttl_bucket is loaded again.
+    """
+    key = (client.config.project, client.config.base_url, pipeline_ext_id)
+    cached = _pipeline_config_cache.get(key)
+    if cached is not None and cached[0] == ttl_bucket:
+        return cached[1]
+    cdf_config = _get_load_config_parameters()(
+        client, {"ExtractionPipelineExtId": pipeline_ext_id}
+    )
+    _pipeline_config_cache[key] = (ttl_bucket, cdf_config)
+    return cdf_config
+
+
+def _public_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return data without internal keys, so the handler result stays JSON-serializable."""
+    return {k: v for k, v in data.items() if k not in _INTERNAL_KEYS}
+
+
+def _load_cdf_config(data: Dict[str, Any], client: CogniteClient, logger) -> Any:
+    """Load configuration from CDF extraction pipeline (or use provided mock config)."""
+    if "_cdf_config" in data:
+        # Use provided mock config (for local testing)
+        logger.info("Using provided config (local mode)")
+        return data["_cdf_config"]
+    load_config_parameters = _get_load_config_parameters()
+    if load_config_parameters and client and "ExtractionPipelineExtId" in data:
+        pipeline_ext_id = data["ExtractionPipelineExtId"]
+        logger.info("Loading config from extraction pipeline: %s", pipeline_ext_id)
+
+        if _CDF_CONFIG_TTL_SEC > 0:
+            cdf_config = _load_pipeline_config_cached(
+                client, pipeline_ext_id, int(time.monotonic() // _CDF_CONFIG_TTL_SEC)
+            )
+        else:
+            cdf_config = load_config_parameters(client, data)
+        logger.debug("Loaded CDF config: %s", cdf_config)
+        return cdf_config
+    return None
+
+
+def _merge_cdf_config(data: Dict[str, Any], cdf_config: Any) -> None:
+    """Extract parameters from CDF config and merge them into data."""
+    config_data = cdf_config.data
+    # Config values fill in whatever was not passed in data;
+    # patterns must be provided directly in config
+    for key in _CONFIG_KEYS:
+        if key not in data:
+            value = config_data.get(key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+    if "logLevel" not in data:
+        data["logLevel"] = "DEBUG" if cdf_config.parameters.debug else "INFO"
+
+    # Store CDF config for use in pipeline
+    data["_cdf_config"] = cdf_config
 
 
 def handle(data: Dict[str, Any], client: CogniteClient = None) -> Dict[str, Any]:
@@ -49,6 +204,7 @@ def handle(data: Dict[str, Any], client: CogniteClient = None) -> Dict[str, Any]
             - partial_match: Whether to enable partial matching (default: True)
             - min_tokens: Minimum number of tokens required (default: 2)
             - batch_size: Number of files to process in each batch (default: 20)
+            - max_parallel_batches: Number of batches to process at once (default: 1)
             - state_store: Optional state store dictionary to update with results
             - logLevel: Optional log level (DEBUG, INFO, WARNING, ERROR)
         client: CogniteClient instance (required if using CDF config loading or querying files from CDF)
@@ -63,79 +219,22 @@ def handle(data: Dict[str, Any], client: CogniteClient = None) -> Dict[str, Any]
         loglevel = data.get("logLevel", "INFO")
 
         # Use logger from dependencies
-        try:
-            from .dependencies import create_logger_service
-        except ImportError:
-            from dependencies import create_logger_service
-
-        logger = create_logger_service(loglevel)
+        logger = _get_create_logger_service()(loglevel)
 
-        logger.info(f"Starting extract assets by pattern with loglevel = {loglevel}")
-
-        # Load configuration from CDF extraction pipeline (or use provided mock config)
-        cdf_config = None
-        if "_cdf_config" in data:
-            # Use provided mock config (for local testing)
-            cdf_config = data["_cdf_config"]
-            logger.info("Using provided config (local mode)")
-        elif CDF_CONFIG_AVAILABLE and client and "ExtractionPipelineExtId" in data:
-            pipeline_ext_id = data["ExtractionPipelineExtId"]
-            logger.info(f"Loading config from extraction pipeline: {pipeline_ext_id}")
-
-            cdf_config = load_config_parameters(client, data)
-            logger.debug(f"Loaded CDF config: {cdf_config}")
+        logger.info("Starting extract assets by pattern with loglevel = %s", loglevel)
 
+        cdf_config = _load_cdf_config(data, client, logger)
         if cdf_config:
-            # Extract parameters from CDF config and merge into data
-            config_data = cdf_config.data
-            # Handle patterns - must be provided directly in config
-            if "patterns" not in data and "patterns" in config_data:
-                data["patterns"] = config_data["patterns"]
-            if "limit" not in data and "limit" in config_data:
-                data["limit"] = config_data["limit"]
-            if "mime_type" not in data and "mime_type" in config_data:
-                data["mime_type"] = config_data["mime_type"]
-            if "instance_space" not in data and "instance_space" in config_data:
-                data["instance_space"] = config_data["instance_space"]
-            if "partial_match" not in data and "partial_match" in config_data:
-                data["partial_match"] = config_data["partial_match"]
-            if "min_tokens" not in data and "min_tokens" in config_data:
-                data["min_tokens"] = config_data["min_tokens"]
-            if "batch_size" not in data and "batch_size" in config_data:
-                data["batch_size"] = config_data["batch_size"]
-            if "max_attempts" not in data and "max_attempts" in config_data:
-                data["max_attempts"] = config_data.get("max_attempts", 3)
-            if (
-                "max_pages_per_chunk" not in data
-                and "max_pages_per_chunk" in config_data
-            ):
-                data["max_pages_per_chunk"] = config_data.get("max_pages_per_chunk", 50)
-            if (
-                "diagram_detect_config" not in data
-                and "diagram_detect_config" in config_data
-            ):
-                data["diagram_detect_config"] = config_data.get(
-                    "diagram_detect_config", {}
-                )
-            if "logLevel" not in data:
-                data["logLevel"] = "DEBUG" if cdf_config.parameters.debug else "INFO"
-
-            # Store CDF config for use in pipeline
-            data["_cdf_config"] = cdf_config
+            _merge_cdf_config(data, cdf_config)
 
         # Call pipeline function
-        try:
-            from .pipeline import extract_assets_by_pattern
-        except ImportError:
-            from pipeline import extract_assets_by_pattern
-
-        extract_assets_by_pattern(
+        _get_extract_assets_by_pattern()(
             client=client,
             logger=logger,
             data=data,
         )
 
-        return {"status": "succeeded", "data": data}
+        return {"status": "succeeded", "data": _public_data(data)}
 
     except Exception as e:
         message = f"Extract assets by pattern pipeline failed: {e!s}"
@@ -148,10 +247,123 @@ def handle(data: Dict[str, Any], client: CogniteClient = None) -> Dict[str, Any]
         return {"status": "failure", "message": message}
 
 
+def handle_batch(
+    items: List[Dict[str, Any]], client: CogniteClient = None
+) -> List[Dict[str, Any]]:
+    """
+    Run the extract assets by pattern pipeline for several data payloads.
+
+    The logger is set up once, from the first item. Each item runs with the
+    config of its own ExtractionPipelineExtId (or its own _cdf_config), and each
+    extraction pipeline's config is loaded once for the whole batch. Items are
+    run one after another since they read and write the same state table.
+
+    Args:
+        items: List of data dictionaries, each as accepted by handle()
+        client: CogniteClient instance (required if using CDF config loading or querying files from CDF)
+
+    Returns:
+        List of handle()-style results, one per item and in the same order
+    """
+    if not items:
+        return []
+
+    logger = None
+    try:
+        loglevel = items[0].get("logLevel", "INFO")
+        logger = _get_create_logger_service()(loglevel)
+        logger.info(
+            "Starting extract assets by pattern for %s payloads with loglevel = %s",
+            len(items),
+            loglevel,
+        )
+    except Exception as e:
+        message = f"Extract assets by pattern pipeline failed: {e!s}"
+
+        if logger:
+            logger.error(message)
+        else:
+            print(f"[ERROR] {message}")
+
+        return [{"status": "failure", "message": message} for _ in items]
+
+    extract_assets_by_pattern = _get_extract_assets_by_pattern()
+    # Loaded configs by extraction pipeline external ID
+    cdf_configs: Dict[Optional[str], Any] = {}
+    results = []
+    for data in items:
+        try:
+            if "_cdf_config" in data:
+                cdf_config = _load_cdf_config(data, client, logger)
+            else:
+                pipeline_ext_id = data.get("ExtractionPipelineExtId")
+                if pipeline_ext_id not in cdf_configs:
+                    cdf_configs[pipeline_ext_id] = _load_cdf_config(
+                        data, client, logger
+                    )
+                cdf_config = cdf_configs[pipeline_ext_id]
+            if cdf_config:
+                _merge_cdf_config(data, cdf_config)
+
+            extract_assets_by_pattern(
+                client=client,
+                logger=logger,
+                data=data,
+            )
+
+            results.append({"status": "succeeded", "data": _public_data(data)})
+
+        except Exception as e:
+            message = f"Extract assets by pattern pipeline failed: {e!s}"
+            logger.error(message)
+            results.append({"status": "failure", "message": message})
+
+    return results
+
+
+@lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a YAML config file, reusing the result until the file changes.
+
+    mtime is only used as part of the cache key, so editing the file makes the
+    next call parse it again. The returned dict is shared and must not be mutated.
+
+    A JSON copy of the parsed config is kept next to the YAML file (as
+    <name>.cache.json, which is gitignored) together with the mtime of the YAML
+    it was made from. It is read instead of the YAML while that mtime matches,
+    since JSON parses much faster. The YAML file stays the source of truth.
+    """
+    import json
+    from pathlib import Path
+
+    import yaml
+
+    yaml_path = Path(path)
+    json_path = yaml_path.with_name(f"{yaml_path.name}.cache.json")
+    try:
+        cached = json.loads(json_path.read_bytes())
+        if cached["yaml_mtime"] == mtime:
+            return cached["config"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # Parsing the whole file from bytes skips the text stream decoding and
+    # buffering; libyaml detects the encoding itself
+    config = yaml.load(yaml_path.read_bytes(), Loader=_YamlLoader)
+
+    # Only keep the JSON copy if it reads back identical (e.g. no dates or
+    # non-string keys); writing it is best effort
+    try:
+        config_json = json.dumps({"yaml_mtime": mtime, "config": config})
+        if json.loads(config_json)["config"] == config:
+            json_path.write_text(config_json)
+    except (OSError, TypeError, ValueError):
+        pass
+    return config
+
+
 def run_locally():
     """Run handler locally for testing (requires .env file)."""
-    import os
-
     from dotenv import load_dotenv
 
     load_dotenv()
@@ -173,8 +385,6 @@ def run_locally():
     # Test data - load full config from config file
     from pathlib import Path
 
-    import yaml
-
     # Get module root (3 levels up from handler.py: handler -> fn_dm_extract_assets_by_pattern -> functions -> file_asset_hierarchy_extractor)
     module_root = Path(__file__).parent.parent.parent
     config_file = (
@@ -183,42 +393,34 @@ def run_locally():
 
     # Load full config to respect all parameters including initialize_state
     if config_file.exists():
-        with open(config_file, "r") as f:
-            config = yaml.safe_load(f)
-            config_section = config.get("config", {})
-            parameters = config_section.get("parameters", {})
-            data_section = config_section.get("data", {})
-
-            # Create a mock CDF config structure for local testing
-            class MockCDFConfig:
-                def __init__(self):
-                    self.parameters = type("obj", (object,), parameters)()
-                    self.data = data_section
-
-            # Extract key values
-            patterns_data = data_section.get("patterns")
-            initialize_state = parameters.get("initialize_state", False)
-
-            print(
-                f"Loaded {len(patterns_data) if patterns_data else 0} pattern groups from config"
-            )
-            if initialize_state:
-                print("Running in initialize_state mode (will skip processing)")
-
-            data = {
-                "logLevel": parameters.get("logLevel", "DEBUG"),
-                "ExtractionPipelineExtId": "ctx_extract_assets_by_pattern_default",
-                "patterns": patterns_data,
-                "limit": data_section.get("limit"),  # Use limit from config
-                "mime_type": data_section.get("mime_type"),
-                "instance_space": data_section.get("instance_space"),
-                "partial_match": data_section.get("partial_match", True),
-                "min_tokens": data_section.get("min_tokens", 2),
-                "batch_size": data_section.get("batch_size", 5),
-                "max_attempts": data_section.get("max_attempts", 3),
-                "max_pages_per_chunk": data_section.get("max_pages_per_chunk", 50),
-                "_cdf_config": MockCDFConfig(),  # Mock config for local testing
-            }
+        config = _load_yaml_cached(str(config_file), config_file.stat().st_mtime)
+        config_section = config.get("config", {})
+        parameters = config_section.get("parameters", {})
+        data_section = config_section.get("data", {})
+
+        # Create a mock CDF config structure for local testing
+        mock_cdf_config = SimpleNamespace(
+            parameters=SimpleNamespace(**parameters), data=data_section
+        )
+
+        # Extract key values
+        patterns_data = data_section.get("patterns")
+        initialize_state = parameters.get("initialize_state", False)
+
+        print(
+            f"Loaded {len(patterns_data) if patterns_data else 0} pattern groups from config"
+        )
+        if initialize_state:
+            print("Running in initialize_state mode (will skip processing)")
+
+        data = {
+            "logLevel": parameters.get("logLevel", "DEBUG"),
+            "ExtractionPipelineExtId": "ctx_extract_assets_by_pattern_default",
+        }
+        # Use values (e.g. limit) from config, with local defaults
+        for key in _LOCAL_KEYS:
+            data[key] = data_section.get(key, _LOCAL_DEFAULTS.get(key))
+        data["_cdf_config"] = mock_cdf_config  # Mock config for local testing
     else:
         print(f"Config file not found: {config_file}")
         data = {
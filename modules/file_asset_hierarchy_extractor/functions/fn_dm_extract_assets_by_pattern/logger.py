@@ -2,13 +2,34 @@
 Logger module for extract annotation tags.
 
 Re-exports CogniteFunctionLogger from the common module in key_extraction_aliasing.
+Log calls in these functions pass logging-style "%s" args, so the logger always
+accepts them, whichever implementation is used.
 """
 
+import inspect
+from typing import Any
+
 # Import from key_extraction_aliasing common module
 try:
     from modules.contextualization.key_extraction_aliasing.functions.common.logger import (
-        CogniteFunctionLogger,
+        CogniteFunctionLogger as _CommonLogger,
     )
+
+    class CogniteFunctionLogger(_CommonLogger):
+        """Common logger that also takes logging-style "%s" args."""
+
+        def debug(self, message: str, *args) -> None:
+            super().debug(message % args if args else message)
+
+        def info(self, message: str, *args) -> None:
+            super().info(message % args if args else message)
+
+        def warning(self, message: str, *args) -> None:
+            super().warning(message % args if args else message)
+
+        def error(self, message: str, *args) -> None:
+            super().error(message % args if args else message)
+
 except ImportError:
     # Fallback: define a simple logger if common module not available
     from typing import Literal
@@ -32,20 +53,22 @@ except ImportError:
             for line in lines[1:]:
                 print(f"{' ' * prefix_len} {line}")
 
-        def debug(self, message: str) -> None:
+        # Like the logging module, "%s" style args are only formatted into the
+        # message when it is actually printed
+        def debug(self, message: str, *args) -> None:
             if self.log_level == "DEBUG":
-                self._print("[DEBUG]", message)
+                self._print("[DEBUG]", message % args if args else message)
 
-        def info(self, message: str) -> None:
+        def info(self, message: str, *args) -> None:
             if self.log_level in ("DEBUG", "INFO"):
-                self._print("[INFO]", message)
+                self._print("[INFO]", message % args if args else message)
 
-        def warning(self, message: str) -> None:
+        def warning(self, message: str, *args) -> None:
             if self.log_level in ("DEBUG", "INFO", "WARNING"):
-                self._print("[WARNING]", message)
+                self._print("[WARNING]", message % args if args else message)
 
-        def error(self, message: str) -> None:
-            self._print("[ERROR]", message)
+        def error(self, message: str, *args) -> None:
+            self._print("[ERROR]", message % args if args else message)
 
         def verbose(
             self, log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"], message: str
@@ -62,4 +85,37 @@ except ImportError:
                         self.error("[VERBOSE] " + message)
 
 
-__all__ = ["CogniteFunctionLogger"]
+class _ArgsLogger:
+    """Formats logging-style "%s" args for a logger whose methods take only a message."""
+
+    def __init__(self, logger: Any) -> None:
+        self._logger = logger
+
+    def debug(self, message: str, *args) -> None:
+        self._logger.debug(message % args if args else message)
+
+    def info(self, message: str, *args) -> None:
+        self._logger.info(message % args if args else message)
+
+    def warning(self, message: str, *args) -> None:
+        self._logger.warning(message % args if args else message)
+
+    def error(self, message: str, *args) -> None:
+        self._logger.error(message % args if args else message)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._logger, name)
+
+
+def ensure_args_logger(logger: Any) -> Any:
+    """Return logger if its methods take "%s" args, otherwise wrap it so they do."""
+    try:
+        parameters = inspect.signature(logger.info).parameters.values()
+    except (AttributeError, TypeError, ValueError):
+        return logger
+    if any(p.kind is inspect.Parameter.VAR_POSITIONAL for p in parameters):
+        return logger
+    return _ArgsLogger(logger)
+
+
+__all__ = ["CogniteFunctionLogger", "ensure_args_logger"]
@@ -7,8 +7,11 @@ and extracts annotation tags using pattern-based diagram detection.
 
 import json
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
 
 import requests
 from cognite.client import CogniteClient
@@ -30,14 +33,85 @@ except ImportError:
     RawUploadQueue = None
 
 try:
-    from .logger import CogniteFunctionLogger
+    from .logger import CogniteFunctionLogger, ensure_args_logger
     from .utils.file_utils import chunk_file_into_page_blocks, get_cognite_files
 except ImportError:
-    from logger import CogniteFunctionLogger
+    from logger import CogniteFunctionLogger, ensure_args_logger
     from utils.file_utils import chunk_file_into_page_blocks, get_cognite_files
 
 logger = None  # Use CogniteFunctionLogger directly
 
+# Same output as json.dumps(obj, default=str), without building a new encoder
+# for every call (json.dumps only reuses its encoder for default arguments)
+_encode_json = json.JSONEncoder(default=str).encode
+
+# Job polling starts fast so short jobs are picked up quickly, then backs off
+_POLL_INTERVAL_MIN_SEC = 0.5
+_POLL_INTERVAL_MAX_SEC = 10.0
+_POLL_BACKOFF_FACTOR = 1.5
+
+# Batch state queued in RawUploadQueue is uploaded at most this often; the rest
+# goes out with the final upload, so batches that finish close together share one
+_STATE_UPLOAD_INTERVAL_SEC = 30
+
+
+@lru_cache(maxsize=4096)
+def _normalize_uploaded_time_str(value: str) -> str:
+    """Normalize an uploadedTime string to a readable UTC ISO datetime string.
+
+    Cached, as the same uploadedTime strings come back on every state load and save.
+    """
+    # Check if it's already in ISO format (contains 'T' or 'Z' or has timezone)
+    if "T" in value or "Z" in value or "+" in value or value.count("-") >= 2:
+        # Try to parse and re-format to ensure UTC
+        try:
+            # Parse the string
+            if value.endswith("Z"):
+                # Remove Z and parse as UTC
+                dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            else:
+                dt = datetime.fromisoformat(value)
+            # Ensure UTC and return ISO format
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            else:
+                dt = dt.astimezone(timezone.utc)
+            return dt.isoformat()
+        except (ValueError, AttributeError):
+            # If parsing fails, check if it's a timestamp string
+            try:
+                # Try to parse as Unix timestamp (seconds or milliseconds)
+                timestamp = float(value)
+                if timestamp > 1e12:  # Likely milliseconds
+                    timestamp = timestamp / 1000
+                dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+                return dt.isoformat()
+            except (ValueError, OSError):
+                # If all parsing fails, return as-is (might already be readable)
+                return value
+    else:
+        # Might be a timestamp string, try to parse
+        try:
+            timestamp = float(value)
+            if timestamp > 1e12:  # Likely milliseconds
+                timestamp = timestamp / 1000
+            dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+            return dt.isoformat()
+        except (ValueError, OSError):
+            # Return as-is if not a number
+            return value
+
+
+@lru_cache(maxsize=4096)
+def _timestamp_to_iso(value: Union[int, float]) -> str:
+    """Convert an uploadedTime timestamp (seconds or milliseconds) to a UTC ISO string.
+
+    Cached, as files uploaded in bulk share the same timestamps.
+    """
+    if value > 1e12:  # Likely milliseconds
+        value = value / 1000
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+
 
 def _normalize_uploaded_time(uploaded_time: Any) -> Optional[str]:
     """Normalize uploadedTime to a readable UTC ISO datetime string.
@@ -59,57 +133,11 @@ def _normalize_uploaded_time(uploaded_time: Any) -> Optional[str]:
 
     # If it's a string, try to parse it
     if isinstance(uploaded_time, str):
-        # Check if it's already in ISO format (contains 'T' or 'Z' or has timezone)
-        if (
-            "T" in uploaded_time
-            or "Z" in uploaded_time
-            or "+" in uploaded_time
-            or uploaded_time.count("-") >= 2
-        ):
-            # Try to parse and re-format to ensure UTC
-            try:
-                # Parse the string
-                if uploaded_time.endswith("Z"):
-                    # Remove Z and parse as UTC
-                    dt = datetime.fromisoformat(uploaded_time.replace("Z", "+00:00"))
-                else:
-                    dt = datetime.fromisoformat(uploaded_time)
-                # Ensure UTC and return ISO format
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                else:
-                    dt = dt.astimezone(timezone.utc)
-                return dt.isoformat()
-            except (ValueError, AttributeError):
-                # If parsing fails, check if it's a timestamp string
-                try:
-                    # Try to parse as Unix timestamp (seconds or milliseconds)
-                    timestamp = float(uploaded_time)
-                    if timestamp > 1e12:  # Likely milliseconds
-                        timestamp = timestamp / 1000
-                    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                    return dt.isoformat()
-                except (ValueError, OSError):
-                    # If all parsing fails, return as-is (might already be readable)
-                    return uploaded_time
-        else:
-            # Might be a timestamp string, try to parse
-            try:
-                timestamp = float(uploaded_time)
-                if timestamp > 1e12:  # Likely milliseconds
-                    timestamp = timestamp / 1000
-                dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-                return dt.isoformat()
-            except (ValueError, OSError):
-                # Return as-is if not a number
-                return uploaded_time
+        return _normalize_uploaded_time_str(uploaded_time)
 
     # If it's a number (timestamp)
     if isinstance(uploaded_time, (int, float)):
-        if uploaded_time > 1e12:  # Likely milliseconds
-            uploaded_time = uploaded_time / 1000
-        dt = datetime.fromtimestamp(uploaded_time, tz=timezone.utc)
-        return dt.isoformat()
+        return _timestamp_to_iso(uploaded_time)
 
     # If it has isoformat method (other datetime-like objects)
     if hasattr(uploaded_time, "isoformat"):
@@ -132,27 +160,132 @@ def _normalize_uploaded_time(uploaded_time: Any) -> Optional[str]:
     return str(uploaded_time)
 
 
+def _uploaded_after(uploaded_time: Any, stored_uploaded_time: Any) -> bool:
+    """Check whether uploaded_time is later than stored_uploaded_time.
+
+    Strings of the same length (the usual case, both in the same ISO format) are
+    compared directly. Anything else is normalized to UTC ISO strings first, so
+    mixed formats and types still compare by time.
+    """
+    if (
+        type(uploaded_time) is str
+        and type(stored_uploaded_time) is str
+        and len(uploaded_time) == len(stored_uploaded_time)
+    ):
+        return uploaded_time > stored_uploaded_time
+
+    uploaded_iso = _normalize_uploaded_time(uploaded_time)
+    stored_iso = _normalize_uploaded_time(stored_uploaded_time)
+    if len(uploaded_iso) == len(stored_iso):
+        return uploaded_iso > stored_iso
+    return datetime.fromisoformat(uploaded_iso) > datetime.fromisoformat(stored_iso)
+
+
 def _create_table_if_not_exists(
     client: CogniteClient,
     raw_db: str,
     tbl: str,
     logger: Optional[CogniteFunctionLogger] = None,
-) -> None:
-    """Create RAW database and table if they don't exist."""
-    log = logger or CogniteFunctionLogger()
+) -> bool:
+    """Create RAW database and table if they don't exist.
+
+    Returns True if the table is known to exist afterwards.
+    """
+    log = ensure_args_logger(logger or CogniteFunctionLogger())
     try:
         if raw_db not in client.raw.databases.list(limit=-1).as_names():
             client.raw.databases.create(raw_db)
-            log.debug(f"Created RAW database: {raw_db}")
+            log.debug("Created RAW database: %s", raw_db)
     except Exception as e:
         log.warning(f"Error creating RAW database {raw_db}: {e}")
 
     try:
         if tbl not in client.raw.tables.list(raw_db, limit=-1).as_names():
             client.raw.tables.create(raw_db, tbl)
-            log.debug(f"Created RAW table: {raw_db}.{tbl}")
+            log.debug("Created RAW table: %s.%s", raw_db, tbl)
+        return True
     except Exception as e:
         log.warning(f"Error creating RAW table {raw_db}.{tbl}: {e}")
+        return False
+
+
+def _parse_state_row(
+    row: Dict[str, Any],
+    file_id: int,
+    results_field: str = "results",
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> Dict[str, Any]:
+    """Build a file's state from the columns of its RAW state row.
+
+    Top-level status, attempts, results and uploaded_time columns take
+    precedence over the copies in the state JSON.
+
+    Raises:
+        ValueError: If the state column is not valid JSON
+    """
+    log = logger or CogniteFunctionLogger()
+
+    # Parse state column (stored as JSON string)
+    state_json = row.get("state", "{}")
+    if isinstance(state_json, str):
+        state_data = json.loads(state_json)
+    else:
+        state_data = state_json if isinstance(state_json, dict) else {}
+
+    # Ensure file_info exists and has uploadedTime from RAW column if available
+    if "file_info" not in state_data:
+        state_data["file_info"] = {}
+
+    # Use uploaded_time from RAW column if state doesn't have it
+    uploaded_time = row.get("uploaded_time")
+    if uploaded_time and not state_data["file_info"].get("uploadedTime"):
+        state_data["file_info"]["uploadedTime"] = uploaded_time
+
+    # Use status from RAW column if available (prefer top-level over state JSON)
+    status = row.get("status")
+    if status:
+        state_data["status"] = status
+    elif "status" not in state_data:
+        # If no status in top-level column and not in state, set to pending
+        state_data["status"] = "pending"
+
+    # Use attempts from RAW column if available (prefer top-level over state JSON)
+    attempts = row.get("attempts")
+    if attempts is not None:
+        try:
+            state_data["attempts"] = int(attempts)
+        except (ValueError, TypeError):
+            state_data["attempts"] = 0
+    elif "attempts" not in state_data:
+        # If no attempts in top-level column and not in state, set to 0
+        state_data["attempts"] = 0
+
+    # Use results from RAW column if available (prefer top-level over state JSON)
+    # Results are now a first-class property
+    results_json = row.get("results")
+    if results_json:
+        try:
+            if isinstance(results_json, str):
+                results_data = json.loads(results_json)
+            else:
+                results_data = results_json if isinstance(results_json, dict) else {}
+            # Store results at top level in state_data
+            state_data[results_field] = results_data
+        except (ValueError, json.JSONDecodeError) as e:
+            log.warning(f"Error parsing results for file_id {file_id}: {e}")
+            # Fall back to results in state JSON if top-level parsing fails
+            if results_field not in state_data:
+                state_data[results_field] = None
+    elif results_field not in state_data:
+        # If no results in top-level column and not in state, set to None
+        state_data[results_field] = None
+
+    # Add metadata from other columns
+    state_data["file_id"] = file_id
+    if "updated_at" in row:
+        state_data["updated_at"] = row["updated_at"]
+
+    return state_data
 
 
 def _load_state_from_raw(
@@ -161,100 +294,41 @@ def _load_state_from_raw(
     raw_table_state: str,
     results_field: str = "results",
     logger: Optional[CogniteFunctionLogger] = None,
+    check_table: bool = True,
 ) -> Dict[int, Dict[str, Any]]:
-    """Load state from RAW table (includes results field with configurable name)."""
+    """Load state from RAW table (includes results field with configurable name).
+
+    Pass check_table=False when the caller already knows the table exists.
+    """
     log = logger or CogniteFunctionLogger()
     state_store = {}
 
     # Check if state table exists first
-    try:
-        tables = client.raw.tables.list(raw_db, limit=-1).as_names()
-        if raw_table_state not in tables:
+    if check_table:
+        try:
+            tables = client.raw.tables.list(raw_db, limit=-1).as_names()
+            if raw_table_state not in tables:
+                log.warning(
+                    f"State table '{raw_table_state}' does not exist in database '{raw_db}'. Starting with empty state."
+                )
+                return state_store
+        except Exception as e:
             log.warning(
-                f"State table '{raw_table_state}' does not exist in database '{raw_db}'. Starting with empty state."
+                f"Error checking if state table exists: {e}. Attempting to load anyway..."
             )
-            return state_store
-    except Exception as e:
-        log.warning(
-            f"Error checking if state table exists: {e}. Attempting to load anyway..."
-        )
 
     try:
         # Note: table name should be passed as string, not list
-        rows = client.raw.rows.list(raw_db, raw_table_state).to_pandas()
-        if not rows.empty:
-            for key, row in rows.iterrows():
+        # Rows are read as plain dicts; missing cells are simply absent
+        rows = client.raw.rows.list(raw_db, raw_table_state, limit=-1)
+        if rows:
+            for raw_row in rows:
+                key = raw_row.key
                 try:
                     file_id = int(key)
-                    # Parse state column (stored as JSON string)
-                    state_json = row.get("state", "{}")
-                    if isinstance(state_json, str):
-                        state_data = json.loads(state_json)
-                    else:
-                        state_data = state_json if isinstance(state_json, dict) else {}
-
-                    # Ensure file_info exists and has uploadedTime from RAW column if available
-                    if "file_info" not in state_data:
-                        state_data["file_info"] = {}
-
-                    # Use uploaded_time from RAW column if state doesn't have it
-                    uploaded_time = row.get("uploaded_time")
-                    if uploaded_time and not state_data["file_info"].get(
-                        "uploadedTime"
-                    ):
-                        state_data["file_info"]["uploadedTime"] = uploaded_time
-
-                    # Use status from RAW column if available (prefer top-level over state JSON)
-                    status = row.get("status")
-                    if status:
-                        state_data["status"] = status
-                    elif "status" not in state_data:
-                        # If no status in top-level column and not in state, set to pending
-                        state_data["status"] = "pending"
-
-                    # Use attempts from RAW column if available (prefer top-level over state JSON)
-                    attempts = row.get("attempts")
-                    if attempts is not None:
-                        try:
-                            state_data["attempts"] = int(attempts)
-                        except (ValueError, TypeError):
-                            state_data["attempts"] = 0
-                    elif "attempts" not in state_data:
-                        # If no attempts in top-level column and not in state, set to 0
-                        state_data["attempts"] = 0
-
-                    # Use results from RAW column if available (prefer top-level over state JSON)
-                    # Results are now a first-class property
-                    results_json = row.get("results")
-                    if results_json:
-                        try:
-                            if isinstance(results_json, str):
-                                results_data = json.loads(results_json)
-                            else:
-                                results_data = (
-                                    results_json
-                                    if isinstance(results_json, dict)
-                                    else {}
-                                )
-                            # Store results at top level in state_data
-                            state_data[results_field] = results_data
-                        except (ValueError, json.JSONDecodeError) as e:
-                            log.warning(
-                                f"Error parsing results for file_id {file_id}: {e}"
-                            )
-                            # Fall back to results in state JSON if top-level parsing fails
-                            if results_field not in state_data:
-                                state_data[results_field] = None
-                    elif results_field not in state_data:
-                        # If no results in top-level column and not in state, set to None
-                        state_data[results_field] = None
-
-                    # Add metadata from other columns
-                    state_data["file_id"] = file_id
-                    if "updated_at" in row:
-                        state_data["updated_at"] = row["updated_at"]
-
-                    state_store[file_id] = state_data
+                    state_store[file_id] = _parse_state_row(
+                        raw_row.columns or {}, file_id, results_field, log
+                    )
                 except (ValueError, json.JSONDecodeError) as e:
                     log.warning(f"Error parsing state for key {key}: {e}")
                     continue
@@ -272,6 +346,67 @@ def _load_state_from_raw(
     return state_store
 
 
+def _new_state_entry(
+    file_info: Dict[str, Any], results_field: str = "results"
+) -> Dict[str, Any]:
+    """Build the state for a file that has not been processed yet."""
+    return {
+        "file_info": file_info,
+        results_field: None,
+        "job_id": None,
+        "processed_at": None,
+        "status": "pending",  # Set to 'success' or 'failed' after processing
+        "attempts": 0,  # Number of failed processing attempts
+        "last_error": None,  # Last error if processing failed
+    }
+
+
+def _state_row(
+    file_id: int,
+    state_data: Dict[str, Any],
+    results_field: str = "results",
+    updated_at: Optional[str] = None,
+) -> Row:
+    """Build the RAW state row for a file.
+
+    updated_at can be passed in to share one timestamp across a batch of rows.
+    """
+    # Extract uploadedTime from file_info if available
+    file_info = state_data.get("file_info", {})
+    uploaded_time = file_info.get("uploadedTime")
+
+    # Normalize uploadedTime to readable UTC ISO string
+    uploaded_time_str = _normalize_uploaded_time(uploaded_time) or ""
+
+    # Extract status and attempts from state_data for top-level storage
+    status = state_data.get("status", "pending")
+    attempts = state_data.get("attempts", 0)
+
+    # Extract results from state_data for top-level storage (promoted to first-class property)
+    results = state_data.get(results_field)
+    results_json_str = ""
+    if results is not None:
+        try:
+            results_json_str = _encode_json(results)
+        except (TypeError, ValueError):
+            # Leave the results column empty if results can't be serialized
+            pass
+
+    # Convert state to JSON string for storage; results live only in their own
+    # column, which _parse_state_row reads back into the state
+    state_without_results = {k: v for k, v in state_data.items() if k != results_field}
+    columns = {
+        "state": _encode_json(state_without_results),
+        "file_id": str(file_id),
+        "status": str(status) if status else "",
+        "attempts": str(attempts) if attempts is not None else "0",
+        "results": results_json_str,  # Results as first-class property
+        "uploaded_time": uploaded_time_str,
+        "updated_at": updated_at or datetime.now(timezone.utc).isoformat(),
+    }
+    return Row(key=str(file_id), columns=columns)
+
+
 def _save_state_to_raw(
     raw_uploader: RawUploadQueue,
     raw_db: str,
@@ -279,41 +414,11 @@ def _save_state_to_raw(
     file_id: int,
     state_data: Dict[str, Any],
     results_field: str = "results",
+    updated_at: Optional[str] = None,
 ) -> None:
     """Save state for a file to RAW table."""
     try:
-        # Extract uploadedTime from file_info if available
-        file_info = state_data.get("file_info", {})
-        uploaded_time = file_info.get("uploadedTime")
-
-        # Normalize uploadedTime to readable UTC ISO string
-        uploaded_time_str = _normalize_uploaded_time(uploaded_time) or ""
-
-        # Extract status and attempts from state_data for top-level storage
-        status = state_data.get("status", "pending")
-        attempts = state_data.get("attempts", 0)
-
-        # Extract results from state_data for top-level storage (promoted to first-class property)
-        results = state_data.get(results_field)
-        results_json_str = ""
-        if results is not None:
-            try:
-                results_json_str = json.dumps(results, default=str)
-            except (TypeError, ValueError) as e:
-                # If results can't be serialized, log warning but continue
-                pass
-
-        # Convert state to JSON string for storage (results are also stored separately)
-        columns = {
-            "state": json.dumps(state_data, default=str),
-            "file_id": str(file_id),
-            "status": str(status) if status else "",
-            "attempts": str(attempts) if attempts is not None else "0",
-            "results": results_json_str,  # Results as first-class property
-            "uploaded_time": uploaded_time_str,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
-        row = Row(key=str(file_id), columns=columns)
+        row = _state_row(file_id, state_data, results_field, updated_at)
         raw_uploader.add_to_upload_queue(
             database=raw_db, table=raw_table_state, raw_row=row
         )
@@ -333,38 +438,7 @@ def _save_state_to_raw_direct(
 ) -> None:
     """Save state for a file to RAW table directly using client (no RawUploadQueue)."""
     try:
-        # Extract uploadedTime from file_info if available
-        file_info = state_data.get("file_info", {})
-        uploaded_time = file_info.get("uploadedTime")
-
-        # Normalize uploadedTime to readable UTC ISO string
-        uploaded_time_str = _normalize_uploaded_time(uploaded_time) or ""
-
-        # Extract status and attempts from state_data for top-level storage
-        status = state_data.get("status", "pending")
-        attempts = state_data.get("attempts", 0)
-
-        # Extract results from state_data for top-level storage (promoted to first-class property)
-        results = state_data.get(results_field)
-        results_json_str = ""
-        if results is not None:
-            try:
-                results_json_str = json.dumps(results, default=str)
-            except (TypeError, ValueError) as e:
-                # If results can't be serialized, log warning but continue
-                pass
-
-        # Convert state to JSON string for storage (results are also stored separately)
-        columns = {
-            "state": json.dumps(state_data, default=str),
-            "file_id": str(file_id),
-            "status": str(status) if status else "",
-            "attempts": str(attempts) if attempts is not None else "0",
-            "results": results_json_str,  # Results as first-class property
-            "uploaded_time": uploaded_time_str,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
-        row = Row(key=str(file_id), columns=columns)
+        row = _state_row(file_id, state_data, results_field)
         # Delete existing row first to ensure update works, then insert
         try:
             client.raw.rows.delete(
@@ -381,13 +455,52 @@ def _save_state_to_raw_direct(
         pass
 
 
+def _save_states_to_raw_direct(
+    client: CogniteClient,
+    raw_db: str,
+    raw_table_state: str,
+    file_ids: List[int],
+    state_store: Dict[int, Dict[str, Any]],
+    results_field: str = "results",
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> None:
+    """Save state for several files to RAW table with a single insert call.
+
+    RAW insert overwrites rows with the same key and every state row has the
+    same columns, so unlike _save_state_to_raw_direct no delete is needed first.
+    Falls back to saving file by file if the bulk insert fails.
+    """
+    file_ids = [file_id for file_id in file_ids if file_id in state_store]
+    updated_at = datetime.now(timezone.utc).isoformat()
+    try:
+        rows = [
+            _state_row(file_id, state_store[file_id], results_field, updated_at)
+            for file_id in file_ids
+        ]
+        if rows:
+            client.raw.rows.insert(db_name=raw_db, table_name=raw_table_state, row=rows)
+    except Exception as e:
+        if logger:
+            logger.warning(f"Error saving state in bulk, saving file by file: {e}")
+        for file_id in file_ids:
+            _save_state_to_raw_direct(
+                client,
+                raw_db,
+                raw_table_state,
+                file_id,
+                state_store[file_id],
+                results_field=results_field,
+                logger=logger,
+            )
+
+
 def run_pattern_diagram_detect(
     client: CogniteClient,
     file_refs: List[FileReference],
     patterns: List[Dict[str, Any]],
     partial_match: bool = True,
     min_tokens: int = 1,
-    diagram_detect_config: Optional[Dict[str, Any]] = None,
+    diagram_detect_config: Union[Dict[str, Any], DiagramDetectConfig, None] = None,
     logger: Optional[CogniteFunctionLogger] = None,
 ) -> int:
     """Run diagram detect in pattern mode for a batch of files."""
@@ -395,7 +508,9 @@ def run_pattern_diagram_detect(
     try:
         # Create DiagramDetectConfig from dictionary if provided, otherwise use API defaults
         detect_config = None
-        if diagram_detect_config:
+        if isinstance(diagram_detect_config, DiagramDetectConfig):
+            detect_config = diagram_detect_config
+        elif diagram_detect_config:
             detect_config = DiagramDetectConfig(**diagram_detect_config)
 
         detect_kwargs = {
@@ -430,11 +545,11 @@ def wait_for_job_completion(
     logger: Optional[CogniteFunctionLogger] = None,
 ) -> Dict[str, Any]:
     """Wait for diagram detect job to complete and return results."""
-    log = logger or CogniteFunctionLogger()
+    log = ensure_args_logger(logger or CogniteFunctionLogger())
     log.info(f"Waiting for job {job_id} to complete...")
 
     start_time = time.time()
-    poll_interval = 5  # seconds
+    poll_interval = _POLL_INTERVAL_MIN_SEC  # seconds, grows after each poll
 
     # Get project for API call
     project = client.config.project
@@ -464,13 +579,19 @@ def wait_for_job_completion(
                 else:
                     # Still processing
                     log.debug(
-                        f"Job {job_id} status: {status} (elapsed: {int(elapsed)}s)"
+                        "Job %s status: %s (elapsed: %ds)", job_id, status, elapsed
                     )
                     time.sleep(poll_interval)
+                    poll_interval = min(
+                        poll_interval * _POLL_BACKOFF_FACTOR, _POLL_INTERVAL_MAX_SEC
+                    )
             elif response.status_code == 404:
                 # Job might not be ready yet
-                log.debug(f"Job {job_id} not found yet, waiting...")
+                log.debug("Job %s not found yet, waiting...", job_id)
                 time.sleep(poll_interval)
+                poll_interval = min(
+                    poll_interval * _POLL_BACKOFF_FACTOR, _POLL_INTERVAL_MAX_SEC
+                )
             else:
                 raise Exception(
                     f"Unexpected status code {response.status_code}: {response.text}"
@@ -480,53 +601,47 @@ def wait_for_job_completion(
             # Handle connection errors
             log.warning(f"Connection error checking job {job_id}, retrying...")
             time.sleep(poll_interval)
+            poll_interval = min(
+                poll_interval * _POLL_BACKOFF_FACTOR, _POLL_INTERVAL_MAX_SEC
+            )
         except Exception as e:
             # Handle other exceptions
             if "404" in str(e) or "not found" in str(e).lower():
-                log.debug(f"Job {job_id} not found yet, waiting...")
+                log.debug("Job %s not found yet, waiting...", job_id)
                 time.sleep(poll_interval)
+                poll_interval = min(
+                    poll_interval * _POLL_BACKOFF_FACTOR, _POLL_INTERVAL_MAX_SEC
+                )
             else:
                 raise
 
 
-def process_batch(
+def _display_name(file_info: Dict[str, Any]) -> str:
+    """Name to show for a file in logs."""
+    return (
+        file_info.get("name")
+        or file_info.get("external_id")
+        or f"file_{file_info['id']}"
+    )
+
+
+def submit_batch(
     client: CogniteClient,
     file_batch: List[Dict[str, Any]],
     patterns: List[Dict[str, Any]],
     partial_match: bool = True,
     min_tokens: int = 1,
-    diagram_detect_config: Optional[Dict[str, Any]] = None,
-    state_store: Optional[Dict[int, Dict[str, Any]]] = None,
+    diagram_detect_config: Union[Dict[str, Any], DiagramDetectConfig, None] = None,
     file_refs: Optional[List[FileReference]] = None,
     max_pages_per_chunk: int = 50,
-    results_field: str = "results",
     logger: Optional[CogniteFunctionLogger] = None,
-) -> Dict[int, Dict[str, Any]]:
+) -> int:
     """
-    Process a batch of files through diagram detect.
-
-    Args:
-        file_batch: List of file info dictionaries
-        patterns: List of pattern dictionaries for diagram detection
-        partial_match: Whether to enable partial matching
-        min_tokens: Minimum number of tokens required for pattern matching
-        state_store: Optional state store dictionary to update with results
-        file_refs: Optional list of FileReference objects. If provided, these will be used
-                   instead of creating default references. Must match file_batch in order.
-        logger: Optional logger instance
-
-    Returns a dictionary mapping file_id to result status:
-    {
-        file_id: {
-            'status': 'success' | 'failed',
-            'error': str (if failed)
-        }
-    }
+    Submit a batch of files to diagram detect without waiting for the job.
 
-    Results are stored directly in state_store under each file_id's entry.
+    Returns the diagram detect job ID, to be passed to collect_batch_results.
     """
-    log = logger or CogniteFunctionLogger()
-    file_results = {}
+    log = ensure_args_logger(logger or CogniteFunctionLogger())
 
     # Create file references for the batch
     # If file_refs not provided, chunk files that have >max_pages_per_chunk pages
@@ -544,7 +659,10 @@ def process_batch(
                 )
                 file_refs.extend(chunked_refs)
                 log.debug(
-                    f"File {file_id} has {page_count} pages, chunked into {len(chunked_refs)} chunks"
+                    "File %s has %s pages, chunked into %s chunks",
+                    file_id,
+                    page_count,
+                    len(chunked_refs),
                 )
             else:
                 # File has <= max_pages_per_chunk pages - single reference
@@ -553,153 +671,184 @@ def process_batch(
                 )
                 file_refs.append(file_ref)
 
-    file_info_map = {}  # Map file_id to file_info for later use
-
-    for file_info in file_batch:
-        file_id = file_info["id"]
-        file_info_map[file_id] = file_info
-        # Initialize result as failed (will be updated on success)
-        file_results[file_id] = {
-            "status": "failed",
-            "error": "Unknown error",
-            "result_file": None,
-        }
-
     # Display batch info
-    file_names = [
-        f.get("name") or f.get("external_id") or f"file_{f['id']}" for f in file_batch
-    ]
     log.info(f"Processing batch of {len(file_batch)} file(s):")
-    for name in file_names[:5]:  # Show first 5
-        log.debug(f"   - {name}")
-    if len(file_names) > 5:
-        log.debug(f"   ... and {len(file_names) - 5} more")
-
-    try:
-        # Run diagram detect for the batch
-        job_id = run_pattern_diagram_detect(
-            client=client,
-            file_refs=file_refs,
-            patterns=patterns,
-            partial_match=partial_match,
-            min_tokens=min_tokens,
-            diagram_detect_config=diagram_detect_config,
-            logger=log,
-        )
-
-        log.info(f"Job ID: {job_id}")
-
-        # Wait for completion
-        job_results = wait_for_job_completion(client, job_id, logger=log)
-
-        # Extract results for each file from the batch results
-        # The results.items should contain results for each file
-        if "items" in job_results:
-            # Create a mapping of file_id to results (aggregate results from multiple page chunks)
-            file_results_map = {}
-            for item in job_results.get("items", []):
-                file_id = item.get("fileId")
-                if file_id:
-                    if file_id not in file_results_map:
-                        file_results_map[file_id] = []
-                    file_results_map[file_id].append(item)
-
-            # Save results for each file
-            for file_id, file_info in file_info_map.items():
-                file_name = (
-                    file_info["name"]
-                    or file_info.get("external_id")
-                    or f"file_{file_id}"
-                )
+    for file_info in file_batch[:5]:  # Show first 5
+        log.debug("   - %s", _display_name(file_info))
+    if len(file_batch) > 5:
+        log.debug("   ... and %s more", len(file_batch) - 5)
+
+    # Run diagram detect for the batch
+    job_id = run_pattern_diagram_detect(
+        client=client,
+        file_refs=file_refs,
+        patterns=patterns,
+        partial_match=partial_match,
+        min_tokens=min_tokens,
+        diagram_detect_config=diagram_detect_config,
+        logger=log,
+    )
+
+    log.info(f"Job ID: {job_id}")
+    return job_id
+
+
+def collect_batch_results(
+    client: CogniteClient,
+    job_id: int,
+    file_batch: List[Dict[str, Any]],
+    state_store: Optional[Dict[int, Dict[str, Any]]] = None,
+    results_field: str = "results",
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Wait for a submitted diagram detect job and store its results per file.
 
-                # Get results for this specific file (aggregated from all page chunks)
-                file_specific_results = {
+    Returns the same file_id to result status mapping as process_batch.
+    """
+    log = logger or CogniteFunctionLogger()
+    file_results = {}
+    file_info_map = {file_info["id"]: file_info for file_info in file_batch}
+
+    # Wait for completion
+    job_results = wait_for_job_completion(client, job_id, logger=log)
+    processed_at = datetime.now(timezone.utc).isoformat()
+
+    # Extract results for each file from the batch results
+    # The results.items should contain results for each file
+    if "items" in job_results:
+        # Create a mapping of file_id to results (aggregate results from multiple page chunks)
+        file_results_map = defaultdict(list)
+        for item in job_results.get("items", ()):
+            file_id = item.get("fileId")
+            if file_id:
+                file_results_map[file_id].append(item)
+
+        # Save results for each file
+        for file_id, file_info in file_info_map.items():
+            # Store results in state_store instead of writing to file
+            # If file already has results in state, merge them with the new
+            # items for this file (aggregated from all page chunks)
+            if state_store and file_id in state_store:
+                items = file_results_map.get(file_id, [])
+                existing_results = state_store[file_id].get(results_field)
+                if existing_results and "items" in existing_results:
+                    # Extend the stored list in place rather than copying it
+                    existing_items = existing_results["items"]
+                    existing_items.extend(items)
+                    items = existing_items
+
+                state_store[file_id][results_field] = {
                     "createdTime": job_results.get("createdTime"),
-                    "items": file_results_map.get(file_id, []),
+                    "items": items,
                     "status": job_results.get("status"),
                 }
+                state_store[file_id]["job_id"] = job_id
+                state_store[file_id]["processed_at"] = processed_at
+                state_store[file_id]["status"] = "success"
+                state_store[file_id]["last_error"] = None
+                # On success, ensure attempts is set (but don't increment - attempts only count failures)
+                if "attempts" not in state_store[file_id]:
+                    state_store[file_id]["attempts"] = 0
+
+            log.info(f"Results saved for {_display_name(file_info)} (stored in state)")
+            file_results[file_id] = {
+                "status": "success",
+                "error": None,
+                "result_file": None,  # No longer using file-based storage
+            }
+    else:
+        # Fallback: save combined results if structure is different
+        log.warning("Unexpected results structure, saving combined results")
+        for file_info in file_batch:
+            file_id = file_info["id"]
 
-                # Store results in state_store instead of writing to file
-                # If file already has results in state, merge them
-                existing_items = []
-                if state_store and file_id in state_store:
-                    existing_results = state_store[file_id].get(results_field)
-                    if existing_results and "items" in existing_results:
-                        existing_items = existing_results["items"]
-
-                # Merge existing items with new items
-                all_items = existing_items + file_specific_results["items"]
-
-                # Store results in state_store
-                result_data = {
-                    "file_info": file_info,
-                    "job_id": job_id,
-                    results_field: {
-                        "createdTime": job_results.get("createdTime"),
-                        "items": all_items,
-                        "status": job_results.get("status"),
-                    },
-                    "processed_at": datetime.now(timezone.utc).isoformat(),
-                }
+            # Store results in state_store
+            if state_store and file_id in state_store:
+                state_store[file_id][results_field] = job_results
+                state_store[file_id]["job_id"] = job_id
+                state_store[file_id]["processed_at"] = processed_at
+                state_store[file_id]["status"] = "success"
+                state_store[file_id]["last_error"] = None
+                # On success, ensure attempts is set (but don't increment - attempts only count failures)
+                if "attempts" not in state_store[file_id]:
+                    state_store[file_id]["attempts"] = 0
 
-                if state_store and file_id in state_store:
-                    state_store[file_id][results_field] = result_data[results_field]
-                    state_store[file_id]["job_id"] = job_id
-                    state_store[file_id]["processed_at"] = result_data["processed_at"]
-                    state_store[file_id]["status"] = "success"
-                    state_store[file_id]["last_error"] = None
-                    # On success, ensure attempts is set (but don't increment - attempts only count failures)
-                    if "attempts" not in state_store[file_id]:
-                        state_store[file_id]["attempts"] = 0
-
-                log.info(f"Results saved for {file_name} (stored in state)")
-                file_results[file_id] = {
-                    "status": "success",
-                    "error": None,
-                    "result_file": None,  # No longer using file-based storage
-                }
-        else:
-            # Fallback: save combined results if structure is different
-            log.warning("Unexpected results structure, saving combined results")
-            for file_info in file_batch:
-                file_id = file_info["id"]
-                file_name = (
-                    file_info["name"]
-                    or file_info.get("external_id")
-                    or f"file_{file_id}"
-                )
+            file_results[file_id] = {
+                "status": "success",
+                "error": None,
+                "result_file": None,  # No longer using file-based storage
+            }
 
-                # Store results in state_store
-                result_data = {
-                    "file_info": file_info,
-                    "job_id": job_id,
-                    results_field: job_results,
-                    "processed_at": datetime.now(timezone.utc).isoformat(),
-                }
+    return file_results
 
-                if state_store and file_id in state_store:
-                    state_store[file_id][results_field] = result_data[results_field]
-                    state_store[file_id]["job_id"] = job_id
-                    state_store[file_id]["processed_at"] = result_data["processed_at"]
-                    state_store[file_id]["status"] = "success"
-                    state_store[file_id]["last_error"] = None
-                    # On success, ensure attempts is set (but don't increment - attempts only count failures)
-                    if "attempts" not in state_store[file_id]:
-                        state_store[file_id]["attempts"] = 0
-
-                file_results[file_id] = {
-                    "status": "success",
-                    "error": None,
-                    "result_file": None,  # No longer using file-based storage
-                }
 
-        return file_results
+def process_batch(
+    client: CogniteClient,
+    file_batch: List[Dict[str, Any]],
+    patterns: List[Dict[str, Any]],
+    partial_match: bool = True,
+    min_tokens: int = 1,
+    diagram_detect_config: Union[Dict[str, Any], DiagramDetectConfig, None] = None,
+    state_store: Optional[Dict[int, Dict[str, Any]]] = None,
+    file_refs: Optional[List[FileReference]] = None,
+    max_pages_per_chunk: int = 50,
+    results_field: str = "results",
+    logger: Optional[CogniteFunctionLogger] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Process a batch of files through diagram detect.
+
+    Args:
+        file_batch: List of file info dictionaries
+        patterns: List of pattern dictionaries for diagram detection
+        partial_match: Whether to enable partial matching
+        min_tokens: Minimum number of tokens required for pattern matching
+        state_store: Optional state store dictionary to update with results
+        file_refs: Optional list of FileReference objects. If provided, these will be used
+                   instead of creating default references. Must match file_batch in order.
+        logger: Optional logger instance
+
+    Returns a dictionary mapping file_id to result status:
+    {
+        file_id: {
+            'status': 'success' | 'failed',
+            'error': str (if failed)
+        }
+    }
+
+    Results are stored directly in state_store under each file_id's entry.
+    """
+    log = logger or CogniteFunctionLogger()
+
+    try:
+        job_id = submit_batch(
+            client,
+            file_batch,
+            patterns,
+            partial_match=partial_match,
+            min_tokens=min_tokens,
+            diagram_detect_config=diagram_detect_config,
+            file_refs=file_refs,
+            max_pages_per_chunk=max_pages_per_chunk,
+            logger=log,
+        )
+        return collect_batch_results(
+            client,
+            job_id,
+            file_batch,
+            state_store=state_store,
+            results_field=results_field,
+            logger=log,
+        )
 
     except Exception as e:
         error_msg = str(e)
         log.error(f"Error processing batch: {error_msg}")
+        file_results = {}
         # Mark all files in batch as failed with the error
-        for file_id in file_info_map.keys():
+        for file_info in file_batch:
+            file_id = file_info["id"]
             file_results[file_id] = {
                 "status": "failed",
                 "error": error_msg,
@@ -729,9 +878,12 @@ def extract_assets_by_pattern(
 
     Args:
         client: CogniteClient instance (optional if not using CDF)
-        logger: Logger instance (CogniteFunctionLogger or standard logger)
+        logger: Logger instance (CogniteFunctionLogger, standard logger, or any
+            logger whose debug/info/warning/error take a message)
         data: Dictionary containing pipeline parameters and results
     """
+    # Log calls pass logging-style "%s" args
+    logger = ensure_args_logger(logger)
     pipeline_ext_id = data.get("ExtractionPipelineExtId", "unknown")
     status = "failure"
     pipeline_run_id = None
@@ -758,7 +910,11 @@ def extract_assets_by_pattern(
             initialize_state = cdf_config.parameters.initialize_state
 
             logger.debug(
-                f"Using CDF format: raw_db={raw_db}, raw_table_state={raw_table_state}, raw_table_results={raw_table_results}, results_field={results_field}"
+                "Using CDF format: raw_db=%s, raw_table_state=%s, raw_table_results=%s, results_field=%s",
+                raw_db,
+                raw_table_state,
+                raw_table_results,
+                results_field,
             )
 
             # Check for initialize_state mode
@@ -779,12 +935,19 @@ def extract_assets_by_pattern(
                 )
 
             # Ensure state table exists
-            _create_table_if_not_exists(client, raw_db, raw_table_state, logger)
+            table_exists = _create_table_if_not_exists(
+                client, raw_db, raw_table_state, logger
+            )
 
             # Load state from RAW if not overwriting (results are included in state)
             if not overwrite:
                 state_store = _load_state_from_raw(
-                    client, raw_db, raw_table_state, results_field, logger
+                    client,
+                    raw_db,
+                    raw_table_state,
+                    results_field,
+                    logger,
+                    check_table=not table_exists,
                 )
                 logger.info(f"Loaded state for {len(state_store)} file(s) from RAW")
             else:
@@ -808,6 +971,9 @@ def extract_assets_by_pattern(
             "max_pages_per_chunk", 50
         )  # Default to 50 if not specified
         diagram_detect_config = data.get("diagram_detect_config", {})
+        max_parallel_batches = data.get(
+            "max_parallel_batches", 1
+        )  # Default to one batch at a time if not specified
 
         # Patterns must be provided directly in data
         if patterns is None:
@@ -829,12 +995,14 @@ def extract_assets_by_pattern(
                 f"Querying CDF for files (limit={limit}, mime_type={mime_type}, instance_space={instance_space})"
             )
             try:
+                # Page counts are only needed to chunk files for diagram detect,
+                # which initialize_state mode skips
                 files = get_cognite_files(
                     client,
                     limit=limit,
                     mime_type=mime_type,
                     instance_space=instance_space,
-                    skip_page_count=False,
+                    skip_page_count=use_cdf_format and initialize_state,
                 )
                 logger.info(f"Retrieved {len(files)} file(s) from CDF")
             except Exception as e:
@@ -859,60 +1027,22 @@ def extract_assets_by_pattern(
             for file_info in files:
                 file_id = file_info["id"]
                 file_uploaded_time = file_info.get("uploadedTime")
+                stored_state = state_store.get(file_id)
 
-                if file_id not in state_store:
+                if stored_state is None:
                     # New file - add to process list (or state update list in initialize_state mode)
                     files_to_process.append(file_info)
                 elif file_uploaded_time:
                     # Check if file has been re-uploaded (newer uploadedTime)
-                    stored_state = state_store[file_id]
                     stored_file_info = stored_state.get("file_info", {})
                     stored_uploaded_time = stored_file_info.get("uploadedTime")
 
                     # Compare uploadedTime to detect re-uploads
                     if stored_uploaded_time and file_uploaded_time:
-                        # Parse timestamps for comparison
                         try:
-                            # Try ISO format parsing first (most common)
-                            if isinstance(file_uploaded_time, str) and isinstance(
-                                stored_uploaded_time, str
-                            ):
-                                # Simple string comparison for ISO format timestamps
-                                if file_uploaded_time > stored_uploaded_time:
-                                    # File has been re-uploaded - reset state and reprocess
-                                    logger.info(
-                                        f"File {file_id} has been re-uploaded (new uploadedTime: {file_uploaded_time} > {stored_uploaded_time}), resetting state"
-                                    )
-                                    state_store[file_id] = {
-                                        "file_info": file_info,
-                                        results_field: None,
-                                        "job_id": None,
-                                        "processed_at": None,
-                                        "status": "pending",  # Reset status for fresh start
-                                        "attempts": 0,  # Reset attempts counter for re-uploaded file
-                                        "last_error": None,  # Clear previous error
-                                    }
-                                    files_to_process.append(file_info)
-                                    files_reset.append(file_id)
-                                    continue
-                            else:
-                                # Non-string comparison (datetime objects)
-                                if file_uploaded_time > stored_uploaded_time:
-                                    logger.info(
-                                        f"File {file_id} has been re-uploaded, resetting state"
-                                    )
-                                    state_store[file_id] = {
-                                        "file_info": file_info,
-                                        results_field: None,
-                                        "job_id": None,
-                                        "processed_at": None,
-                                        "status": "pending",  # Reset status for fresh start
-                                        "attempts": 0,  # Reset attempts counter for re-uploaded file
-                                        "last_error": None,  # Clear previous error
-                                    }
-                                    files_to_process.append(file_info)
-                                    files_reset.append(file_id)
-                                    continue
+                            reuploaded = _uploaded_after(
+                                file_uploaded_time, stored_uploaded_time
+                            )
                         except Exception as e:
                             logger.warning(
                                 f"Error comparing uploadedTime for file {file_id}: {e}"
@@ -920,20 +1050,25 @@ def extract_assets_by_pattern(
                             # If comparison fails, assume file needs processing
                             files_to_process.append(file_info)
                             continue
+                        if reuploaded:
+                            # File has been re-uploaded - reset state and reprocess
+                            logger.info(
+                                f"File {file_id} has been re-uploaded (new uploadedTime: {file_uploaded_time} > {stored_uploaded_time}), resetting state"
+                            )
+                            state_store[file_id] = _new_state_entry(
+                                file_info, results_field
+                            )
+                            files_to_process.append(file_info)
+                            files_reset.append(file_id)
+                            continue
                     elif not stored_uploaded_time and file_uploaded_time:
                         # Stored state doesn't have uploadedTime but current file does - reset
                         logger.info(
                             f"File {file_id} now has uploadedTime, resetting state"
                         )
-                        state_store[file_id] = {
-                            "file_info": file_info,
-                            results_field: None,
-                            "job_id": None,
-                            "processed_at": None,
-                            "status": "pending",  # Reset status for fresh start
-                            "attempts": 0,  # Reset attempts counter for re-uploaded file
-                            "last_error": None,  # Clear previous error
-                        }
+                        state_store[file_id] = _new_state_entry(
+                            file_info, results_field
+                        )
                         files_to_process.append(file_info)
                         files_reset.append(file_id)
                         continue
@@ -944,7 +1079,6 @@ def extract_assets_by_pattern(
                         continue
 
                     # Check if file failed and exceeded max_attempts
-                    stored_state = state_store[file_id]
                     stored_status = stored_state.get("status")
                     stored_attempts = stored_state.get("attempts", 0)
 
@@ -952,7 +1086,10 @@ def extract_assets_by_pattern(
                         # File has failed and exceeded max attempts - skip
                         files_skipped_max_attempts.append(file_id)
                         logger.debug(
-                            f"Skipping file {file_id}: failed {stored_attempts} times (max_attempts={max_attempts})"
+                            "Skipping file %s: failed %s times (max_attempts=%s)",
+                            file_id,
+                            stored_attempts,
+                            max_attempts,
                         )
                         continue
                     elif stored_status == "success":
@@ -975,7 +1112,6 @@ def extract_assets_by_pattern(
                         continue
 
                     # Check retry logic
-                    stored_state = state_store.get(file_id, {})
                     stored_status = stored_state.get("status")
                     stored_attempts = stored_state.get("attempts", 0)
 
@@ -983,7 +1119,10 @@ def extract_assets_by_pattern(
                         # File has failed and exceeded max attempts - skip
                         files_skipped_max_attempts.append(file_id)
                         logger.debug(
-                            f"Skipping file {file_id}: failed {stored_attempts} times (max_attempts={max_attempts})"
+                            "Skipping file %s: failed %s times (max_attempts=%s)",
+                            file_id,
+                            stored_attempts,
+                            max_attempts,
                         )
                         continue
                     elif stored_status == "success":
@@ -1022,15 +1161,7 @@ def extract_assets_by_pattern(
         for file_info in files:
             file_id = file_info["id"]
             if file_id not in state_store:
-                state_store[file_id] = {
-                    "file_info": file_info,
-                    results_field: None,
-                    "job_id": None,
-                    "processed_at": None,
-                    "status": "pending",  # Will be set to 'success' or 'failed' after processing
-                    "attempts": 0,  # Track number of processing attempts
-                    "last_error": None,  # Track last error if processing failed
-                }
+                state_store[file_id] = _new_state_entry(file_info, results_field)
                 new_files_added.append(file_id)
 
         # Save initial state to RAW for newly added files
@@ -1039,20 +1170,16 @@ def extract_assets_by_pattern(
                 f"Saving initial state for {len(new_files_added)} newly added file(s) to RAW"
             )
             if raw_uploader:
+                updated_at = datetime.now(timezone.utc).isoformat()
                 for file_id in new_files_added:
-                    file_info = state_store[file_id]["file_info"]
-                    file_name = (
-                        file_info.get("name")
-                        or file_info.get("external_id")
-                        or f"file_{file_id}"
-                    )
                     _save_state_to_raw(
                         raw_uploader,
-                        cdf_config.parameters.raw_db,
-                        cdf_config.parameters.raw_table_state,
+                        raw_db,
+                        raw_table_state,
                         file_id,
                         state_store[file_id],
                         results_field=results_field,
+                        updated_at=updated_at,
                     )
                 try:
                     raw_uploader.upload()
@@ -1063,20 +1190,15 @@ def extract_assets_by_pattern(
                     logger.warning(f"Error uploading initial state to RAW: {e}")
             else:
                 # Use direct client calls
-                for file_id in new_files_added:
-                    try:
-                        _save_state_to_raw_direct(
-                            client,
-                            cdf_config.parameters.raw_db,
-                            cdf_config.parameters.raw_table_state,
-                            file_id,
-                            state_store[file_id],
-                            results_field=results_field,
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Error saving state for file {file_id} to RAW: {e}"
-                        )
+                _save_states_to_raw_direct(
+                    client,
+                    raw_db,
+                    raw_table_state,
+                    new_files_added,
+                    state_store,
+                    results_field=results_field,
+                    logger=logger,
+                )
                 logger.info(
                     f"Successfully saved initial state for {len(new_files_added)} file(s) to RAW (direct)"
                 )
@@ -1087,20 +1209,16 @@ def extract_assets_by_pattern(
                 f"Saving reset state for {len(files_reset)} re-uploaded file(s) to RAW"
             )
             if raw_uploader:
+                updated_at = datetime.now(timezone.utc).isoformat()
                 for file_id in files_reset:
-                    file_info = state_store[file_id]["file_info"]
-                    file_name = (
-                        file_info.get("name")
-                        or file_info.get("external_id")
-                        or f"file_{file_id}"
-                    )
                     _save_state_to_raw(
                         raw_uploader,
-                        cdf_config.parameters.raw_db,
-                        cdf_config.parameters.raw_table_state,
+                        raw_db,
+                        raw_table_state,
                         file_id,
                         state_store[file_id],
                         results_field=results_field,
+                        updated_at=updated_at,
                     )
                 try:
                     raw_uploader.upload()
@@ -1111,20 +1229,15 @@ def extract_assets_by_pattern(
                     logger.warning(f"Error uploading reset state to RAW: {e}")
             else:
                 # Use direct client calls
-                for file_id in files_reset:
-                    try:
-                        _save_state_to_raw_direct(
-                            client,
-                            cdf_config.parameters.raw_db,
-                            cdf_config.parameters.raw_table_state,
-                            file_id,
-                            state_store[file_id],
-                            results_field=results_field,
-                        )
-                    except Exception as e:
-                        logger.warning(
-                            f"Error saving reset state for file {file_id} to RAW: {e}"
-                        )
+                _save_states_to_raw_direct(
+                    client,
+                    raw_db,
+                    raw_table_state,
+                    files_reset,
+                    state_store,
+                    results_field=results_field,
+                    logger=logger,
+                )
                 logger.info(
                     f"Successfully saved reset state for {len(files_reset)} file(s) to RAW (direct)"
                 )
@@ -1137,10 +1250,18 @@ def extract_assets_by_pattern(
             status = "success"
             return
 
+        # Build the diagram detect configuration once for all batches. An invalid
+        # config is left as a dict so each batch still reports the error itself
+        if diagram_detect_config:
+            try:
+                diagram_detect_config = DiagramDetectConfig(**diagram_detect_config)
+            except TypeError:
+                pass
+
         # Process files in batches
         total_batches = (len(files) + batch_size - 1) // batch_size
 
-        for batch_num in range(total_batches):
+        def run_batch(batch_num: int) -> Dict[int, Dict[str, Any]]:
             start_idx = batch_num * batch_size
             end_idx = min(start_idx + batch_size, len(files))
             file_batch = files[start_idx:end_idx]
@@ -1150,7 +1271,7 @@ def extract_assets_by_pattern(
             )
 
             # Process batch
-            batch_results = process_batch(
+            return process_batch(
                 client=client,
                 file_batch=file_batch,
                 patterns=patterns,
@@ -1163,79 +1284,115 @@ def extract_assets_by_pattern(
                 logger=logger,
             )
 
-            # Update state_store with status from batch_results
-            for file_id, result in batch_results.items():
-                if file_id in state_store:
-                    # Update status, attempts, and last_error from batch results
-                    if result.get("status") == "failed":
-                        state_store[file_id]["status"] = "failed"
-                        state_store[file_id]["last_error"] = result.get("error")
-                        # Increment attempts
-                        state_store[file_id]["attempts"] = (
-                            state_store[file_id].get("attempts", 0) + 1
-                        )
-                    elif (
-                        result.get("status") == "success"
-                        and state_store[file_id].get("status") != "success"
-                    ):
-                        # Status already set in process_batch for success, but ensure it's there
-                        if (
-                            "status" not in state_store[file_id]
-                            or state_store[file_id]["status"] != "success"
-                        ):
-                            state_store[file_id]["status"] = "success"
-                            state_store[file_id]["last_error"] = None
+        # Most of a batch is spent waiting on its diagram detect job, so several
+        # batches can run at once. Batches touch disjoint files; their results
+        # are still handled (and saved to RAW) one by one, in batch order.
+        batch_executor = None
+        if max_parallel_batches > 1 and total_batches > 1:
+            batch_executor = ThreadPoolExecutor(
+                max_workers=min(max_parallel_batches, total_batches)
+            )
+            all_batch_results = batch_executor.map(run_batch, range(total_batches))
+        else:
+            all_batch_results = map(run_batch, range(total_batches))
 
-            # Save state (including results) to RAW after each batch
-            if use_cdf_format:
-                logger.info(
-                    f"Saving state for batch {batch_num + 1}/{total_batches} to RAW"
-                )
-                for file_info in file_batch:
-                    file_id = file_info["id"]
+        try:
+            last_state_upload = time.monotonic()
+            for batch_num, batch_results in enumerate(all_batch_results):
+                start_idx = batch_num * batch_size
+                file_batch = files[start_idx : start_idx + batch_size]
 
+                # Update state_store with status from batch_results
+                for file_id, result in batch_results.items():
                     if file_id in state_store:
-                        state_data = state_store[file_id]
-                        # Save state (results are included in state_data)
-                        if raw_uploader:
-                            _save_state_to_raw(
-                                raw_uploader,
-                                cdf_config.parameters.raw_db,
-                                cdf_config.parameters.raw_table_state,
-                                file_id,
-                                state_data,
-                                results_field=results_field,
+                        # Update status, attempts, and last_error from batch results
+                        if result.get("status") == "failed":
+                            state_store[file_id]["status"] = "failed"
+                            state_store[file_id]["last_error"] = result.get("error")
+                            # Increment attempts
+                            state_store[file_id]["attempts"] = (
+                                state_store[file_id].get("attempts", 0) + 1
                             )
+                        elif (
+                            result.get("status") == "success"
+                            and state_store[file_id].get("status") != "success"
+                        ):
+                            # Status already set in process_batch for success, but ensure it's there
+                            if (
+                                "status" not in state_store[file_id]
+                                or state_store[file_id]["status"] != "success"
+                            ):
+                                state_store[file_id]["status"] = "success"
+                                state_store[file_id]["last_error"] = None
+
+                # Save state (including results) to RAW after each batch
+                if use_cdf_format:
+                    logger.info(
+                        f"Saving state for batch {batch_num + 1}/{total_batches} to RAW"
+                    )
+                    # Save state (results are included in state_data)
+                    if raw_uploader:
+                        updated_at = datetime.now(timezone.utc).isoformat()
+                        for file_info in file_batch:
+                            file_id = file_info["id"]
+
+                            if file_id in state_store:
+                                _save_state_to_raw(
+                                    raw_uploader,
+                                    raw_db,
+                                    raw_table_state,
+                                    file_id,
+                                    state_store[file_id],
+                                    results_field=results_field,
+                                    updated_at=updated_at,
+                                )
+                    else:
+                        _save_states_to_raw_direct(
+                            client,
+                            raw_db,
+                            raw_table_state,
+                            [file_info["id"] for file_info in file_batch],
+                            state_store,
+                            results_field=results_field,
+                            logger=logger,
+                        )
+
+                    # Upload batch to RAW (only if using RawUploadQueue)
+                    if raw_uploader:
+                        if (
+                            time.monotonic() - last_state_upload
+                            >= _STATE_UPLOAD_INTERVAL_SEC
+                        ):
+                            try:
+                                raw_uploader.upload()
+                                last_state_upload = time.monotonic()
+                                logger.info(
+                                    f"Successfully uploaded batch {batch_num + 1}/{total_batches} state to RAW ({len(file_batch)} file(s))"
+                                )
+                            except Exception as e:
+                                logger.warning(
+                                    f"Error uploading batch {batch_num + 1} to RAW: {e}"
+                                )
                         else:
-                            _save_state_to_raw_direct(
-                                client,
-                                cdf_config.parameters.raw_db,
-                                cdf_config.parameters.raw_table_state,
-                                file_id,
-                                state_data,
-                                results_field=results_field,
+                            logger.debug(
+                                "Queued batch %s/%s state for the next RAW upload",
+                                batch_num + 1,
+                                total_batches,
                             )
-
-                # Upload batch to RAW (only if using RawUploadQueue)
-                if raw_uploader:
-                    try:
-                        raw_uploader.upload()
+                    else:
                         logger.info(
-                            f"Successfully uploaded batch {batch_num + 1}/{total_batches} state to RAW ({len(file_batch)} file(s))"
+                            f"Successfully saved batch {batch_num + 1}/{total_batches} state to RAW (direct) ({len(file_batch)} file(s))"
                         )
-                    except Exception as e:
-                        logger.warning(
-                            f"Error uploading batch {batch_num + 1} to RAW: {e}"
-                        )
-                else:
-                    logger.info(
-                        f"Successfully saved batch {batch_num + 1}/{total_batches} state to RAW (direct) ({len(file_batch)} file(s))"
-                    )
 
-            # Update data with results
-            if "results" not in data:
-                data["results"] = {}
-            data["results"].update(batch_results)
+                # Update data with results
+                if "results" not in data:
+                    data["results"] = {}
+                data["results"].update(batch_results)
+        finally:
+            # Stop batches that have not started if the loop fails (a no-op once
+            # all batches are done), and wait for running ones to finish
+            if batch_executor is not None:
+                batch_executor.shutdown(cancel_futures=True)
 
         # Final upload to RAW
         if use_cdf_format and raw_uploader:
@@ -16,7 +16,7 @@ from modules.file_asset_hierarchy_extractor.functions.fn_dm_create_asset_hierarc
     run_locally,
 )
 from modules.file_asset_hierarchy_extractor.functions.fn_dm_create_asset_hierarchy.utils.location_utils import (
-    match_file_to_system,
+    match_files_to_systems,
 )
 
 # Load config to get locations
@@ -67,7 +67,6 @@ tags = get_asset_list(
 
 # Find file names that don't match
 file_names_in_tags = set()
-file_names_with_location = set()
 file_name_counts = {}
 
 for tag in tags:
@@ -78,9 +77,8 @@ for tag in tags:
             file_name_counts[file_name] = 0
         file_name_counts[file_name] += 1
 
-        location = match_file_to_system(file_name, locations)
-        if location:
-            file_names_with_location.add(file_name)
+# Match each distinct file name once
+file_names_with_location = set(match_files_to_systems(file_names_in_tags, locations))
 
 missing_files = file_names_in_tags - file_names_with_location
 
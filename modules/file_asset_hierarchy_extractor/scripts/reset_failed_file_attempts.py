@@ -104,6 +104,14 @@ def reset_failed_file_attempts(
                     else:
                         state_data = state_json if isinstance(state_json, dict) else {}
 
+                    # Results are stored in their own column, not in the state JSON
+                    results_json = row.get("results")
+                    if results_json and results_field not in state_data:
+                        try:
+                            state_data[results_field] = json.loads(results_json)
+                        except (TypeError, ValueError):
+                            pass
+
                     attempts = state_data.get("attempts", 0)
                     # Filter by attempts if reset_all_failed is False
                     if reset_all_failed or attempts >= max_attempts:
@@ -120,6 +120,71 @@ def mock_cognite_client() -> MagicMock:
     return client
 
 
+class FakeRaw:
+    """In-memory stand-in for client.raw (databases, tables and rows)."""
+
+    def __init__(self) -> None:
+        self.tables: Dict[tuple, Dict[str, Dict[str, Any]]] = {}
+        self.insert_calls = 0
+        self.databases = MagicMock()
+        self.databases.list.return_value.as_names.return_value = []
+        self.tables_api = MagicMock()
+        self.tables_api.list.side_effect = self._list_tables
+        self.tables_api.create.side_effect = self._create_table
+        self.rows = MagicMock()
+        self.rows.list.side_effect = self._list_rows
+        self.rows.retrieve.side_effect = self._retrieve_row
+        self.rows.insert.side_effect = self._insert_rows
+        self.rows.delete.side_effect = self._delete_rows
+
+    def _list_tables(self, db_name: str, limit: int = 25) -> Any:
+        from cognite.client.data_classes.raw import Table, TableList
+
+        return TableList(
+            [Table(name=name) for (db, name) in self.tables if db == db_name]
+        )
+
+    def _create_table(self, db_name: str, name: str) -> None:
+        self.tables.setdefault((db_name, name), {})
+
+    def _list_rows(self, db_name: str, table_name: str, limit: int = 25) -> Any:
+        from cognite.client.data_classes import Row, RowList
+
+        table = self.tables.get((db_name, table_name), {})
+        return RowList([Row(key=k, columns=dict(c)) for k, c in table.items()])
+
+    def _retrieve_row(self, db_name: str, table_name: str, key: str) -> Any:
+        from cognite.client.data_classes import Row
+
+        columns = self.tables.get((db_name, table_name), {}).get(key)
+        return None if columns is None else Row(key=key, columns=dict(columns))
+
+    def _insert_rows(
+        self, db_name: str, table_name: str, row: Any, ensure_parent: bool = False
+    ) -> None:
+        self.insert_calls += 1
+        table = self.tables.setdefault((db_name, table_name), {})
+        for r in row if isinstance(row, list) else [row]:
+            table[r.key] = dict(r.columns)
+
+    def _delete_rows(self, db_name: str, table_name: str, key: Any) -> None:
+        table = self.tables.get((db_name, table_name), {})
+        for k in key if isinstance(key, list) else [key]:
+            table.pop(k, None)
+
+
+@pytest.fixture
+def fake_raw_client() -> MagicMock:
+    """Create a mock CogniteClient whose RAW API is backed by an in-memory FakeRaw."""
+    client = MagicMock()
+    raw = FakeRaw()
+    client.raw.databases = raw.databases
+    client.raw.tables = raw.tables_api
+    client.raw.rows = raw.rows
+    client.fake_raw = raw
+    return client
+
+
 @pytest.fixture
 def sample_hierarchy_config() -> Dict[str, Any]:
     """Create a sample hierarchy configuration for testing."""
@@ -0,0 +1,313 @@
+"""
+Tests for the create asset hierarchy pipeline.
+
+Tests cover loading results from the extraction state table, the input hash used
+to detect unchanged inputs, and reusing the stored assets for unchanged inputs.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add module root to path
+module_root = Path(__file__).parent.parent
+if str(module_root) not in sys.path:
+    sys.path.insert(0, str(module_root))
+
+from functions.fn_dm_create_asset_hierarchy import pipeline as hierarchy_pipeline
+from functions.fn_dm_create_asset_hierarchy.utils import hierarchy_utils
+from functions.fn_dm_extract_assets_by_pattern import pipeline as extract_pipeline
+
+RAW_DB = "db"
+STATE_TABLE = "state"
+ASSETS_TABLE = "assets"
+METADATA_TABLE = "metadata"
+
+
+def _processed_state(file_id: int, processed_at: str, items: List[Any]) -> Dict:
+    """State of a file after the extraction pipeline stored results for it."""
+    state = extract_pipeline._new_state_entry({"id": file_id, "name": f"f{file_id}"})
+    state["results"] = {"items": items}
+    state["processed_at"] = processed_at
+    state["status"] = "success"
+    return state
+
+
+def _write_state(client: MagicMock, states: Dict[int, Dict]) -> None:
+    """Write file states to the fake state table the way the extractor does."""
+    table = client.fake_raw.tables.setdefault((RAW_DB, STATE_TABLE), {})
+    for file_id, state in states.items():
+        row = extract_pipeline._state_row(file_id, state)
+        table[row.key] = row.columns
+
+
+def _input_hash(client: MagicMock) -> str:
+    results_store = hierarchy_pipeline._load_results_from_state_table(
+        client, RAW_DB, STATE_TABLE
+    )
+    return hierarchy_pipeline._compute_input_hash(results_store, {"space": "sp"})
+
+
+class TestInputHash:
+    """Test the input hash over the state table results."""
+
+    def test_hash_changes_when_reuploaded_file_gets_new_results(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test a re-uploaded file that is processed again changes the hash."""
+        # Arrange
+        _write_state(
+            fake_raw_client, {1: _processed_state(1, "2025-01-01T00:00:00+00:00", [1])}
+        )
+        first_hash = _input_hash(fake_raw_client)
+
+        # Act: re-upload resets the state, then the file is processed again
+        state = extract_pipeline._new_state_entry({"id": 1, "name": "f1"})
+        state["results"] = {"items": [2]}
+        state["processed_at"] = "2025-02-01T00:00:00+00:00"
+        _write_state(fake_raw_client, {1: state})
+        second_hash = _input_hash(fake_raw_client)
+
+        # Assert
+        assert "updated_at" not in state
+        assert second_hash != first_hash
+
+    def test_hash_stable_for_unchanged_state(self, fake_raw_client: MagicMock) -> None:
+        """Test loading the same state twice gives the same hash."""
+        # Arrange
+        _write_state(
+            fake_raw_client, {1: _processed_state(1, "2025-01-01T00:00:00+00:00", [1])}
+        )
+
+        # Act & Assert
+        assert _input_hash(fake_raw_client) == _input_hash(fake_raw_client)
+
+    def test_hash_changes_with_settings(self) -> None:
+        """Test changing a hierarchy setting changes the hash."""
+        # Arrange
+        results_store = {1: {"processed_at": "2025-01-01T00:00:00+00:00"}}
+
+        # Act & Assert
+        assert hierarchy_pipeline._compute_input_hash(
+            results_store, {"space": "a"}
+        ) != hierarchy_pipeline._compute_input_hash(results_store, {"space": "b"})
+
+    def test_pattern_file_digest_changes_when_patterns_are_edited(
+        self, temp_dir: Path
+    ) -> None:
+        """Test editing the pattern files in place changes their digest."""
+        # Arrange
+        pattern_file = temp_dir / "patterns.yaml"
+        pattern_file.write_text("patterns: [a]")
+        before = hierarchy_pipeline._pattern_files_digest(str(pattern_file))
+
+        # Act
+        pattern_file.write_text("patterns: [b]")
+        after_pattern_edit = hierarchy_pipeline._pattern_files_digest(str(pattern_file))
+        (temp_dir / "document_patterns.yaml").write_text("documents: []")
+        after_document_edit = hierarchy_pipeline._pattern_files_digest(
+            str(pattern_file)
+        )
+
+        # Assert
+        assert len({before, after_pattern_edit, after_document_edit}) == 3
+
+    @pytest.mark.parametrize(
+        "data, expected",
+        [
+            ({"tag_blacklist": []}, []),
+            ({"tag_blacklist": None}, ["X"]),
+            ({}, ["X"]),
+            ({"tag_blacklist": ["Y"]}, ["Y"]),
+        ],
+    )
+    def test_config_parameter_only_falls_back_for_none(
+        self, data: Dict[str, Any], expected: List[str]
+    ) -> None:
+        """Test an explicit empty list in data is kept rather than replaced by the config."""
+        # Arrange
+        data["_cdf_config"] = SimpleNamespace(
+            parameters=SimpleNamespace(tag_blacklist=["X"])
+        )
+
+        # Act & Assert
+        assert hierarchy_pipeline._config_parameter(data, "tag_blacklist") == expected
+
+    def test_processed_at_falls_back_to_updated_at_column(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test rows without processed_at in their state use the updated_at column."""
+        # Arrange
+        state = _processed_state(1, "", [1])
+        _write_state(fake_raw_client, {1: state})
+        row = fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)]["1"]
+
+        # Act
+        results_store = hierarchy_pipeline._load_results_from_state_table(
+            fake_raw_client, RAW_DB, STATE_TABLE
+        )
+
+        # Assert
+        assert results_store[1]["processed_at"] == row["updated_at"]
+
+
+class TestUnchangedInputSkip:
+    """Test reusing the stored assets instead of regenerating them for unchanged inputs."""
+
+    @pytest.fixture(autouse=True)
+    def _patch_hierarchy(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Generate one asset per file so runs are cheap and comparable."""
+        hierarchy_pipeline._assets_cache.clear()
+        self.generate_calls = 0
+
+        def fake_build(results_store: Dict, logger: Any = None) -> List[Dict]:
+            return [{"text": str(file_id)} for file_id in sorted(results_store)]
+
+        def fake_generate(locations: Any, tags: List[Dict], **kwargs: Any) -> List:
+            self.generate_calls += 1
+            return [{"externalId": f"asset_{t['text']}", "space": "sp"} for t in tags]
+
+        monkeypatch.setattr(
+            hierarchy_pipeline, "_build_asset_list_from_results", fake_build
+        )
+        monkeypatch.setattr(hierarchy_utils, "generate_hierarchy", fake_generate)
+        yield
+        hierarchy_pipeline._assets_cache.clear()
+
+    def _run(
+        self, client: MagicMock, file_ids: List[int], **extra: Any
+    ) -> Dict[str, Any]:
+        """Write state for file_ids and run the pipeline on it."""
+        client.fake_raw.tables[(RAW_DB, STATE_TABLE)] = {}
+        _write_state(
+            client,
+            {
+                file_id: _processed_state(file_id, "2025-01-01T00:00:00+00:00", [1])
+                for file_id in file_ids
+            },
+        )
+        client.fake_raw.tables.setdefault((RAW_DB, ASSETS_TABLE), {})
+        client.fake_raw.tables.setdefault((RAW_DB, METADATA_TABLE), {})
+        data = {
+            "locations": [],
+            "_cdf_config": SimpleNamespace(
+                parameters=SimpleNamespace(
+                    raw_db=RAW_DB,
+                    raw_table_state=STATE_TABLE,
+                    raw_table_assets=ASSETS_TABLE,
+                    raw_table_metadata=METADATA_TABLE,
+                    results_field="results",
+                    limit=-1,
+                    batch_size=None,
+                    overwrite=False,
+                )
+            ),
+            **extra,
+        }
+        hierarchy_pipeline.create_asset_hierarchy(client, MagicMock(), data)
+        return data
+
+    def _asset_writes(self, client: MagicMock) -> int:
+        """Number of inserts into the assets table."""
+        return sum(
+            call.kwargs.get("table_name") == ASSETS_TABLE
+            for call in client.fake_raw.rows.insert.call_args_list
+        )
+
+    def test_cold_unchanged_run_reloads_assets_from_raw(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test an unchanged run without cached assets reloads them from RAW."""
+        # Arrange
+        first = self._run(fake_raw_client, [1, 2, 3])
+        hierarchy_pipeline._assets_cache.clear()
+        # RAW does not list rows in the order they were written
+        assets_table = fake_raw_client.fake_raw.tables[(RAW_DB, ASSETS_TABLE)]
+        fake_raw_client.fake_raw.tables[(RAW_DB, ASSETS_TABLE)] = dict(
+            reversed(assets_table.items())
+        )
+
+        # Act
+        second = self._run(fake_raw_client, [1, 2, 3])
+
+        # Assert
+        assert not first.get("skipped_unchanged")
+        assert second["skipped_unchanged"] is True
+        assert second["assets"] == first["assets"]
+        assert self.generate_calls == 1
+        assert self._asset_writes(fake_raw_client) == 1
+
+    def test_warm_unchanged_run_reuses_cached_assets(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test a warm unchanged run reuses cached assets without regenerating."""
+        # Arrange
+        first = self._run(fake_raw_client, [1])
+
+        # Act
+        second = self._run(fake_raw_client, [1])
+
+        # Assert
+        assert second["skipped_unchanged"] is True
+        assert second["assets"] == first["assets"]
+        assert self.generate_calls == 1
+        assert self._asset_writes(fake_raw_client) == 1
+
+    def test_incomplete_raw_assets_are_generated_again(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test a cold unchanged run regenerates when stored assets are missing."""
+        # Arrange
+        first = self._run(fake_raw_client, [1, 2])
+        hierarchy_pipeline._assets_cache.clear()
+        fake_raw_client.fake_raw.tables[(RAW_DB, ASSETS_TABLE)].pop("asset_2")
+
+        # Act
+        second = self._run(fake_raw_client, [1, 2])
+
+        # Assert
+        assert not second.get("skipped_unchanged")
+        assert second["assets"] == first["assets"]
+        assert self._asset_writes(fake_raw_client) == 2
+
+    def test_cached_inputs_do_not_skip_when_raw_holds_other_inputs(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test inputs A, B, A rewrite RAW on the third run despite the warm cache."""
+        # Arrange
+        self._run(fake_raw_client, [1])
+        self._run(fake_raw_client, [2])
+
+        # Act
+        third = self._run(fake_raw_client, [1])
+
+        # Assert
+        assert not third.get("skipped_unchanged")
+        assert self._asset_writes(fake_raw_client) == 3
+
+    def test_edited_pattern_file_rewrites_raw(
+        self,
+        fake_raw_client: MagicMock,
+        temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test editing the pattern config in place is not treated as unchanged."""
+        # Arrange
+        monkeypatch.setattr(
+            hierarchy_pipeline, "_load_classifier_cls", lambda: (None, "disabled")
+        )
+        pattern_file = temp_dir / "patterns.yaml"
+        pattern_file.write_text("patterns: [a]")
+        self._run(fake_raw_client, [1], pattern_config_path=str(pattern_file))
+
+        # Act
+        pattern_file.write_text("patterns: [b]")
+        second = self._run(fake_raw_client, [1], pattern_config_path=str(pattern_file))
+
+        # Assert
+        assert not second.get("skipped_unchanged")
+        assert self._asset_writes(fake_raw_client) == 2
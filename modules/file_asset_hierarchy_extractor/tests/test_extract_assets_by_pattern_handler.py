@@ -0,0 +1,290 @@
+"""
+Tests for the extract assets by pattern handler.
+
+Tests cover loading YAML configs through their JSON copy, reusing extraction
+pipeline configs across warm calls, and running several payloads with
+handle_batch.
+"""
+
+import gc
+import json
+import sys
+import weakref
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+import yaml
+
+# Add module root to path
+module_root = Path(__file__).parent.parent
+if str(module_root) not in sys.path:
+    sys.path.insert(0, str(module_root))
+
+from functions.fn_dm_extract_assets_by_pattern import handler
+
+# Parse without the lru_cache so every call reads the files again
+_load_yaml = handler._load_yaml_cached.__wrapped__
+
+
+class TestLoadYamlCached:
+    """Test loading a YAML config through its JSON copy."""
+
+    def _write_config(self, temp_dir: Path, config: dict) -> Path:
+        path = temp_dir / "pipeline.config.yaml"
+        path.write_text(yaml.safe_dump(config))
+        return path
+
+    def test_json_copy_is_written_next_to_yaml(self, temp_dir: Path) -> None:
+        """Test the JSON copy is written beside the YAML with its mtime."""
+        # Arrange
+        path = self._write_config(temp_dir, {"config": {"data": {"limit": 5}}})
+        mtime = path.stat().st_mtime
+
+        # Act
+        config = _load_yaml(str(path), mtime)
+
+        # Assert
+        cached = json.loads((temp_dir / "pipeline.config.yaml.cache.json").read_text())
+        assert cached == {"yaml_mtime": mtime, "config": config}
+        assert config == {"config": {"data": {"limit": 5}}}
+
+    def test_json_copy_is_read_while_mtime_matches(self, temp_dir: Path) -> None:
+        """Test the JSON copy is used instead of the YAML for the same mtime."""
+        # Arrange
+        path = self._write_config(temp_dir, {"limit": 5})
+        mtime = path.stat().st_mtime
+        _load_yaml(str(path), mtime)
+        json_path = temp_dir / "pipeline.config.yaml.cache.json"
+        json_path.write_text(json.dumps({"yaml_mtime": mtime, "config": {"limit": 6}}))
+
+        # Act
+        config = _load_yaml(str(path), mtime)
+
+        # Assert
+        assert config == {"limit": 6}
+
+    def test_json_copy_is_ignored_for_other_mtime(self, temp_dir: Path) -> None:
+        """Test a JSON copy made from another version of the YAML is replaced."""
+        # Arrange
+        path = self._write_config(temp_dir, {"limit": 5})
+        json_path = temp_dir / "pipeline.config.yaml.cache.json"
+        json_path.write_text(json.dumps({"yaml_mtime": 0.0, "config": {"limit": 6}}))
+        mtime = path.stat().st_mtime
+
+        # Act
+        config = _load_yaml(str(path), mtime)
+
+        # Assert
+        assert config == {"limit": 5}
+        assert json.loads(json_path.read_text())["yaml_mtime"] == mtime
+
+    def test_invalid_json_copy_falls_back_to_yaml(self, temp_dir: Path) -> None:
+        """Test an unreadable JSON copy falls back to parsing the YAML."""
+        # Arrange
+        path = self._write_config(temp_dir, {"limit": 5})
+        (temp_dir / "pipeline.config.yaml.cache.json").write_text("[1, 2")
+
+        # Act
+        config = _load_yaml(str(path), path.stat().st_mtime)
+
+        # Assert
+        assert config == {"limit": 5}
+
+
+def _pipeline_config(pipeline_ext_id: str) -> SimpleNamespace:
+    """Extraction pipeline config whose patterns name the pipeline it came from."""
+    return SimpleNamespace(
+        data={"patterns": [{"sample": [pipeline_ext_id]}]},
+        parameters=SimpleNamespace(debug=False),
+    )
+
+
+class TestPipelineConfigCache:
+    """Test reusing a loaded extraction pipeline config within its TTL."""
+
+    @pytest.fixture(autouse=True)
+    def _patch_loader(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Count config loads and control the clock."""
+        self.loads = 0
+        self.now = 0.0
+
+        def fake_load_config(client: Any, data: Dict[str, Any]) -> SimpleNamespace:
+            self.loads += 1
+            return _pipeline_config(data["ExtractionPipelineExtId"])
+
+        monkeypatch.setattr(handler, "_CDF_CONFIG_TTL_SEC", 300)
+        monkeypatch.setattr(
+            handler, "_get_load_config_parameters", lambda: fake_load_config
+        )
+        monkeypatch.setattr(
+            handler, "time", SimpleNamespace(monotonic=lambda: self.now)
+        )
+        handler._pipeline_config_cache.clear()
+        yield
+        handler._pipeline_config_cache.clear()
+
+    def _client(self, project: str = "proj") -> MagicMock:
+        """A new client, as each function call gets one."""
+        client = MagicMock()
+        client.config.project = project
+        client.config.base_url = "https://api.cognitedata.com"
+        return client
+
+    def _load(self, client: Any, pipeline_ext_id: str = "a") -> Any:
+        return handler._load_cdf_config(
+            {"ExtractionPipelineExtId": pipeline_ext_id}, client, MagicMock()
+        )
+
+    def test_config_is_reused_within_ttl(self) -> None:
+        """Test warm calls within the TTL reuse the config, each with a new client."""
+        # Arrange
+        first = self._load(self._client())
+
+        # Act
+        self.now = 299
+        second = self._load(self._client())
+
+        # Assert
+        assert second is first
+        assert self.loads == 1
+
+    def test_config_is_loaded_again_after_ttl(self) -> None:
+        """Test a call after the TTL window loads the config again."""
+        # Arrange
+        self._load(self._client())
+
+        # Act
+        self.now = 300
+        self._load(self._client())
+
+        # Assert
+        assert self.loads == 2
+
+    def test_cache_is_keyed_by_project_and_pipeline(self) -> None:
+        """Test other projects and pipelines get their own config."""
+        # Arrange
+        self._load(self._client())
+
+        # Act
+        self._load(self._client("other"))
+        self._load(self._client(), "b")
+
+        # Assert
+        assert self.loads == 3
+
+    def test_zero_ttl_disables_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a TTL of 0 loads the config on every call."""
+        # Arrange
+        monkeypatch.setattr(handler, "_CDF_CONFIG_TTL_SEC", 0)
+        client = self._client()
+
+        # Act
+        self._load(client)
+        self._load(client)
+
+        # Assert
+        assert self.loads == 2
+
+    def test_cache_does_not_keep_clients_alive(self) -> None:
+        """Test a cached config holds no reference to the client that loaded it."""
+        # Arrange
+        client = self._client()
+        client_ref = weakref.ref(client)
+        self._load(client)
+
+        # Act
+        del client
+        gc.collect()
+
+        # Assert
+        assert client_ref() is None
+
+
+class TestHandleBatch:
+    """Test running several payloads with handle_batch."""
+
+    @pytest.fixture(autouse=True)
+    def _patch_handler(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Record config loads and pipeline runs instead of calling CDF."""
+        self.loaded: List[str] = []
+        self.runs: List[Dict[str, Any]] = []
+
+        def fake_load_config(client: Any, data: Dict[str, Any]) -> SimpleNamespace:
+            self.loaded.append(data["ExtractionPipelineExtId"])
+            return _pipeline_config(data["ExtractionPipelineExtId"])
+
+        def fake_pipeline(client: Any, logger: Any, data: Dict[str, Any]) -> None:
+            if data.get("fail"):
+                raise RuntimeError("boom")
+            self.runs.append(data)
+
+        monkeypatch.setattr(handler, "_CDF_CONFIG_TTL_SEC", 0)
+        monkeypatch.setattr(
+            handler, "_get_load_config_parameters", lambda: fake_load_config
+        )
+        monkeypatch.setattr(
+            handler, "_get_extract_assets_by_pattern", lambda: fake_pipeline
+        )
+        monkeypatch.setattr(
+            handler, "_get_create_logger_service", lambda: lambda level: MagicMock()
+        )
+
+    def test_items_use_their_own_pipeline_config(self) -> None:
+        """Test each item runs with the config of its own extraction pipeline."""
+        # Arrange
+        items = [
+            {"ExtractionPipelineExtId": "a"},
+            {"ExtractionPipelineExtId": "b"},
+            {"ExtractionPipelineExtId": "a"},
+        ]
+
+        # Act
+        results = handler.handle_batch(items, MagicMock())
+
+        # Assert
+        assert [r["status"] for r in results] == ["succeeded"] * 3
+        assert [run["patterns"][0]["sample"] for run in self.runs] == [
+            ["a"],
+            ["b"],
+            ["a"],
+        ]
+        assert self.loaded == ["a", "b"]
+
+    def test_provided_config_is_used_per_item(self) -> None:
+        """Test an item's own _cdf_config is used instead of the first item's."""
+        # Arrange
+        items = [
+            {"ExtractionPipelineExtId": "a"},
+            {"ExtractionPipelineExtId": "a", "_cdf_config": _pipeline_config("local")},
+        ]
+
+        # Act
+        handler.handle_batch(items, MagicMock())
+
+        # Assert
+        assert [run["patterns"][0]["sample"] for run in self.runs] == [["a"], ["local"]]
+        assert self.loaded == ["a"]
+
+    def test_failing_item_does_not_stop_the_batch(self) -> None:
+        """Test a failing item is reported and later items still run."""
+        # Arrange
+        items = [
+            {"ExtractionPipelineExtId": "a", "fail": True},
+            {"ExtractionPipelineExtId": "a"},
+        ]
+
+        # Act
+        results = handler.handle_batch(items, MagicMock())
+
+        # Assert
+        assert [r["status"] for r in results] == ["failure", "succeeded"]
+        assert "boom" in results[0]["message"]
+        assert "_cdf_config" not in results[1]["data"]
+
+    def test_empty_batch_returns_no_results(self) -> None:
+        """Test an empty batch returns an empty list."""
+        # Act & Assert
+        assert handler.handle_batch([], MagicMock()) == []
@@ -0,0 +1,358 @@
+"""
+Tests for the extract assets by pattern pipeline.
+
+Tests cover RAW state serialization and loading, running batches in parallel, and
+how often queued state is uploaded to RAW.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add module root to path
+module_root = Path(__file__).parent.parent
+if str(module_root) not in sys.path:
+    sys.path.insert(0, str(module_root))
+
+from functions.fn_dm_extract_assets_by_pattern import pipeline as extract_pipeline
+
+RAW_DB = "db"
+STATE_TABLE = "state"
+PATTERNS = [{"sample": ["P-101"], "resourceType": "Equipment"}]
+
+
+def _processed_state(results_field: str = "results") -> Dict[str, Any]:
+    """State of a file after the extraction pipeline stored results for it."""
+    state = extract_pipeline._new_state_entry(
+        {"id": 1, "name": "drawing.pdf", "uploadedTime": "2025-01-01T00:00:00+00:00"},
+        results_field,
+    )
+    state[results_field] = {
+        "createdTime": 1,
+        "items": [{"fileId": 1, "annotations": [{"text": 'P-101, "A"}'}]}],
+        "status": "Completed",
+    }
+    state["job_id"] = 7
+    state["processed_at"] = "2025-01-02T00:00:00+00:00"
+    state["status"] = "success"
+    return state
+
+
+class TestStateRow:
+    """Test serializing a file's state to a RAW row."""
+
+    @pytest.mark.parametrize("results_field", ["results", "detections"])
+    def test_results_are_stored_only_in_results_column(
+        self, results_field: str
+    ) -> None:
+        """Test the state column holds the state without its results."""
+        # Arrange
+        state = _processed_state(results_field)
+
+        # Act
+        row = extract_pipeline._state_row(1, state, results_field)
+
+        # Assert
+        assert row.key == "1"
+        assert json.loads(row.columns["state"]) == {
+            k: v for k, v in state.items() if k != results_field
+        }
+        assert json.loads(row.columns["results"]) == state[results_field]
+        assert state[results_field] is not None
+        assert row.columns["status"] == "success"
+        assert row.columns["attempts"] == "0"
+
+    def test_missing_results_leave_results_column_empty(self) -> None:
+        """Test a file without results gets an empty results column."""
+        # Arrange
+        state = extract_pipeline._new_state_entry({"id": 1, "name": "a"})
+
+        # Act
+        row = extract_pipeline._state_row(1, state)
+
+        # Assert
+        assert row.columns["results"] == ""
+        assert "results" not in json.loads(row.columns["state"])
+
+
+class TestStateRoundTrip:
+    """Test saving state to RAW and loading it back."""
+
+    @pytest.mark.parametrize("results_field", ["results", "detections"])
+    def test_saved_state_loads_back_unchanged(
+        self, fake_raw_client: MagicMock, results_field: str
+    ) -> None:
+        """Test a saved state loads back with the same content."""
+        # Arrange
+        state = _processed_state(results_field)
+        fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)] = {}
+
+        # Act
+        extract_pipeline._save_states_to_raw_direct(
+            fake_raw_client, RAW_DB, STATE_TABLE, [1], {1: state}, results_field
+        )
+        loaded = extract_pipeline._load_state_from_raw(
+            fake_raw_client, RAW_DB, STATE_TABLE, results_field
+        )
+
+        # Assert
+        row = fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)]["1"]
+        assert loaded[1] == {**state, "file_id": 1, "updated_at": row["updated_at"]}
+
+    def test_file_without_results_loads_back_with_none(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test a file saved without results loads back with results set to None."""
+        # Arrange
+        state = extract_pipeline._new_state_entry({"id": 1, "name": "a"})
+        fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)] = {}
+
+        # Act
+        extract_pipeline._save_states_to_raw_direct(
+            fake_raw_client, RAW_DB, STATE_TABLE, [1], {1: state}
+        )
+        loaded = extract_pipeline._load_state_from_raw(
+            fake_raw_client, RAW_DB, STATE_TABLE
+        )
+
+        # Assert
+        assert loaded[1]["results"] is None
+
+    def test_results_column_takes_precedence_over_state(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test the results column wins over a copy in the state of older rows."""
+        # Arrange
+        state = _processed_state()
+        row = extract_pipeline._state_row(1, state)
+        row.columns["state"] = json.dumps(state)
+        row.columns["results"] = json.dumps({"items": ["newer"]})
+        fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)] = {"1": row.columns}
+
+        # Act
+        loaded = extract_pipeline._load_state_from_raw(
+            fake_raw_client, RAW_DB, STATE_TABLE
+        )
+
+        # Assert
+        assert loaded[1]["results"] == {"items": ["newer"]}
+        assert loaded[1]["job_id"] == 7
+
+    def test_malformed_rows_are_skipped(self, fake_raw_client: MagicMock) -> None:
+        """Test rows with a bad key or state JSON are skipped, others still load."""
+        # Arrange
+        good = extract_pipeline._state_row(1, _processed_state())
+        fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)] = {
+            "1": good.columns,
+            "not-a-file-id": good.columns,
+            "2": {"state": "{not json"},
+        }
+
+        # Act
+        loaded = extract_pipeline._load_state_from_raw(
+            fake_raw_client, RAW_DB, STATE_TABLE
+        )
+
+        # Assert
+        assert list(loaded) == [1]
+
+
+class TestParseStateRow:
+    """Test building a file's state from its RAW row columns."""
+
+    def test_top_level_columns_override_state(self) -> None:
+        """Test status, attempts and uploaded_time columns are applied."""
+        # Arrange
+        state = {"file_info": {}, "status": "pending", "attempts": 0}
+        row = {
+            "state": json.dumps(state),
+            "status": "failed",
+            "attempts": "2",
+            "uploaded_time": "2025-01-01T00:00:00+00:00",
+        }
+
+        # Act
+        parsed = extract_pipeline._parse_state_row(row, 5)
+
+        # Assert
+        assert parsed["status"] == "failed"
+        assert parsed["attempts"] == 2
+        assert parsed["file_info"]["uploadedTime"] == "2025-01-01T00:00:00+00:00"
+        assert parsed["results"] is None
+        assert parsed["file_id"] == 5
+
+    def test_invalid_state_json_raises(self) -> None:
+        """Test a malformed state column raises ValueError."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            extract_pipeline._parse_state_row({"state": "{not json"}, 5)
+
+
+def _run_extraction(client: MagicMock, file_count: int, **data: Any) -> Dict[str, Any]:
+    """Run the pipeline on file_count new files, one file per batch."""
+    client.fake_raw.tables.setdefault((RAW_DB, STATE_TABLE), {})
+    data = {
+        "files": [
+            {"id": file_id, "name": f"f{file_id}"} for file_id in range(file_count)
+        ],
+        "patterns": PATTERNS,
+        "batch_size": 1,
+        "_cdf_config": SimpleNamespace(
+            parameters=SimpleNamespace(
+                raw_db=RAW_DB,
+                raw_table_state=STATE_TABLE,
+                raw_table_results=None,
+                results_field="results",
+                overwrite=False,
+                run_all=False,
+                initialize_state=False,
+            )
+        ),
+        **data,
+    }
+    extract_pipeline.extract_assets_by_pattern(client, MagicMock(), data)
+    return data
+
+
+class TestParallelBatches:
+    """Test running several diagram detect batches at once."""
+
+    @pytest.fixture(autouse=True)
+    def _patch_process_batch(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Replace diagram detect with a batch that marks its files as done."""
+        monkeypatch.setattr(extract_pipeline, "EXTRACTOR_UTILS_AVAILABLE", False)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.threads: List[threading.Thread] = []
+        self.fail_file_id = None
+
+        def fake_process_batch(
+            file_batch: List[Dict], state_store: Dict, **kwargs: Any
+        ) -> Dict[int, Dict]:
+            with self.lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+                self.threads.append(threading.current_thread())
+            try:
+                if file_batch[0]["id"] == self.fail_file_id:
+                    raise RuntimeError("batch failed")
+                time.sleep(0.05)
+                for file_info in file_batch:
+                    state_store[file_info["id"]]["status"] = "success"
+                return {
+                    file_info["id"]: {"status": "success"} for file_info in file_batch
+                }
+            finally:
+                with self.lock:
+                    self.running -= 1
+
+        monkeypatch.setattr(extract_pipeline, "process_batch", fake_process_batch)
+
+    def test_parallel_batches_save_every_file(self, fake_raw_client: MagicMock) -> None:
+        """Test parallel batches overlap and every file's state is saved."""
+        # Act
+        data = _run_extraction(fake_raw_client, 6, max_parallel_batches=3)
+
+        # Assert
+        rows = fake_raw_client.fake_raw.tables[(RAW_DB, STATE_TABLE)]
+        assert 1 < self.max_running <= 3
+        assert list(data["results"]) == list(range(6))
+        assert {row["status"] for row in rows.values()} == {"success"}
+        assert len(rows) == 6
+
+    def test_sequential_by_default(self, fake_raw_client: MagicMock) -> None:
+        """Test batches run one at a time without max_parallel_batches."""
+        # Act
+        _run_extraction(fake_raw_client, 3)
+
+        # Assert
+        assert self.max_running == 1
+
+    def test_failing_batch_shuts_down_thread_pool(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test a batch error propagates and leaves no pool threads running."""
+        # Arrange
+        self.fail_file_id = 0
+
+        # Act
+        with pytest.raises(RuntimeError):
+            _run_extraction(fake_raw_client, 20, max_parallel_batches=2)
+
+        # Assert
+        assert len(self.threads) < 20
+        assert not any(thread.is_alive() for thread in self.threads)
+
+
+class FakeRawUploadQueue:
+    """RawUploadQueue stand-in that records queued rows and uploads."""
+
+    instances: List["FakeRawUploadQueue"] = []
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.queued: List[str] = []
+        self.uploads = 0
+        FakeRawUploadQueue.instances.append(self)
+
+    def add_to_upload_queue(self, database: str, table: str, raw_row: Any) -> None:
+        self.queued.append(raw_row.key)
+
+    def upload(self) -> None:
+        self.uploads += 1
+
+
+class TestStateUploadInterval:
+    """Test coalescing per-batch state uploads on a time interval."""
+
+    @pytest.fixture(autouse=True)
+    def _patch_upload_queue(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Use a fake upload queue and a clock that advances 10s per batch."""
+        FakeRawUploadQueue.instances.clear()
+        self.now = 0.0
+
+        def fake_process_batch(
+            file_batch: List[Dict], state_store: Dict, **kwargs: Any
+        ) -> Dict[int, Dict]:
+            self.now += 10
+            return {file_info["id"]: {"status": "success"} for file_info in file_batch}
+
+        monkeypatch.setattr(extract_pipeline, "EXTRACTOR_UTILS_AVAILABLE", True)
+        monkeypatch.setattr(
+            extract_pipeline, "RawUploadQueue", FakeRawUploadQueue, raising=False
+        )
+        monkeypatch.setattr(extract_pipeline, "process_batch", fake_process_batch)
+        monkeypatch.setattr(
+            extract_pipeline, "time", SimpleNamespace(monotonic=lambda: self.now)
+        )
+
+    def test_batch_state_uploads_once_per_interval(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test batch state is uploaded every 30s instead of after every batch."""
+        # Act
+        _run_extraction(fake_raw_client, 6)
+
+        # Assert: initial state, batches 3 and 6, then the final upload
+        (queue,) = FakeRawUploadQueue.instances
+        assert queue.uploads == 4
+        assert queue.queued.count("5") == 2
+
+    def test_queued_state_is_uploaded_at_the_end(
+        self, fake_raw_client: MagicMock
+    ) -> None:
+        """Test state queued within the interval is still uploaded after the loop."""
+        # Act
+        _run_extraction(fake_raw_client, 2)
+
+        # Assert: initial state and the final upload only
+        (queue,) = FakeRawUploadQueue.instances
+        assert queue.uploads == 2
+        assert sorted(set(queue.queued)) == ["0", "1"]
@@ -0,0 +1,178 @@
+"""
+Tests for the function logger.
+
+Tests cover logging-style "%s" args, with the common key_extraction_aliasing
+logger, with the fallback logger, and with loggers passed to the pipeline that
+take only a message.
+"""
+
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+# Add module root to path
+module_root = Path(__file__).parent.parent
+if str(module_root) not in sys.path:
+    sys.path.insert(0, str(module_root))
+
+LOGGER_PATH = (
+    module_root / "functions" / "fn_dm_extract_assets_by_pattern" / "logger.py"
+)
+COMMON_LOGGER_MODULE = (
+    "modules.contextualization.key_extraction_aliasing.functions.common.logger"
+)
+
+
+from functions.fn_dm_extract_assets_by_pattern import pipeline as extract_pipeline
+from functions.fn_dm_extract_assets_by_pattern.logger import ensure_args_logger
+
+
+class CommonLogger:
+    """Stand-in for the common logger, which takes only a message."""
+
+    def __init__(self, log_level: str = "INFO", verbose: bool = False) -> None:
+        self.log_level = log_level
+        self.verbose_on = verbose
+
+    def debug(self, message: str) -> None:
+        print(f"[DEBUG] {message}")
+
+    def info(self, message: str) -> None:
+        print(f"[INFO] {message}")
+
+    def warning(self, message: str) -> None:
+        print(f"[WARNING] {message}")
+
+    def error(self, message: str) -> None:
+        print(f"[ERROR] {message}")
+
+
+def _load_logger_module() -> ModuleType:
+    """Import logger.py afresh, so it resolves the common logger again."""
+    spec = importlib.util.spec_from_file_location("fresh_function_logger", LOGGER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=["common", "fallback"])
+def logger_cls(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    """CogniteFunctionLogger with and without the common logger importable."""
+    if request.param == "common":
+        common = ModuleType(COMMON_LOGGER_MODULE)
+        common.CogniteFunctionLogger = CommonLogger
+        monkeypatch.setitem(sys.modules, COMMON_LOGGER_MODULE, common)
+    else:
+        monkeypatch.setitem(sys.modules, COMMON_LOGGER_MODULE, None)
+    return _load_logger_module().CogniteFunctionLogger
+
+
+class TestCogniteFunctionLogger:
+    """Test the logger used by the functions."""
+
+    @pytest.mark.parametrize("level", ["debug", "info", "warning", "error"])
+    def test_args_are_formatted_into_message(
+        self, logger_cls: type, level: str, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test "%s" args are formatted into the message at every level."""
+        # Arrange
+        logger = logger_cls("DEBUG")
+
+        # Act
+        getattr(logger, level)("Loaded %s file(s) from %s", 3, "RAW")
+
+        # Assert
+        assert (
+            capsys.readouterr().out == f"[{level.upper()}] Loaded 3 file(s) from RAW\n"
+        )
+
+    def test_message_without_args_is_unchanged(
+        self, logger_cls: type, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test a message with a literal % and no args is printed as is."""
+        # Act
+        logger_cls("DEBUG").info("100% done")
+
+        # Assert
+        assert capsys.readouterr().out == "[INFO] 100% done\n"
+
+
+class TestEnsureArgsLogger:
+    """Test adapting loggers that take only a message to "%s" args."""
+
+    def test_message_only_logger_is_wrapped(
+        self, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test a logger without args support formats them through the wrapper."""
+        # Arrange
+        logger = ensure_args_logger(CommonLogger())
+
+        # Act
+        logger.warning("Skipped %s file(s)", 2)
+
+        # Assert
+        assert capsys.readouterr().out == "[WARNING] Skipped 2 file(s)\n"
+        assert logger.verbose_on is False
+
+    def test_args_capable_loggers_are_returned_unchanged(self) -> None:
+        """Test standard and function loggers are not wrapped."""
+        # Arrange
+        loggers = [
+            logging.getLogger("test"),
+            extract_pipeline.CogniteFunctionLogger(),
+            MagicMock(),
+        ]
+
+        # Act & Assert
+        for logger in loggers:
+            assert ensure_args_logger(logger) is logger
+
+    def test_pipeline_runs_with_message_only_logger(
+        self,
+        fake_raw_client: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        """Test the pipeline's "%s" log calls work with a message-only logger."""
+
+        # Arrange
+        def fake_process_batch(
+            file_batch: List[Dict], state_store: Dict, **kwargs: Any
+        ) -> Dict[int, Dict]:
+            return {file_info["id"]: {"status": "success"} for file_info in file_batch}
+
+        monkeypatch.setattr(extract_pipeline, "EXTRACTOR_UTILS_AVAILABLE", False)
+        monkeypatch.setattr(extract_pipeline, "process_batch", fake_process_batch)
+        data = {
+            "files": [{"id": 1, "name": "f1"}],
+            "patterns": [{"sample": ["P-101"]}],
+            "_cdf_config": SimpleNamespace(
+                parameters=SimpleNamespace(
+                    raw_db="db",
+                    raw_table_state="state",
+                    raw_table_results=None,
+                    results_field="results",
+                    overwrite=False,
+                    run_all=False,
+                    initialize_state=False,
+                )
+            ),
+        }
+
+        # Act
+        extract_pipeline.extract_assets_by_pattern(
+            fake_raw_client, CommonLogger("DEBUG"), data
+        )
+
+        # Assert
+        out = capsys.readouterr().out
+        assert "[DEBUG] Created RAW table: db.state" in out
+        assert "[DEBUG] Using CDF format: raw_db=db" in out
+        assert "[WARNING]" not in out
+        assert data["status"] == "success"
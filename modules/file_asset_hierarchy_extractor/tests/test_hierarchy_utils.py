@@ -0,0 +1,284 @@
+"""
+Tests for the hierarchy utilities.
+
+Tests cover the assets generate_hierarchy builds for the include_resource_*
+flags, checking external IDs, the parent chain and descriptions, for both
+copies of hierarchy_utils (create asset hierarchy and create annotations).
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+# Add module root to path
+module_root = Path(__file__).parent.parent
+if str(module_root) not in sys.path:
+    sys.path.insert(0, str(module_root))
+
+from functions.fn_dm_create_annotations.utils import (
+    hierarchy_utils as annotations_hierarchy_utils,
+)
+from functions.fn_dm_create_asset_hierarchy.utils import hierarchy_utils
+
+AREA = "area_S1_P1_A1"
+AREA_PATH = "Main Site > Plant One > Area A"
+
+# Intermediate levels for each flag, outermost first: (flag, tag, values per system)
+LEVELS = [
+    (
+        "include_resource_type",
+        "resource_type",
+        {"SYS1": "Equipment", "SYS2": "Instrument"},
+    ),
+    (
+        "include_resource_subtype",
+        "resource_subtype",
+        {"SYS1": "Centrifugal_Pump", "SYS2": "Unclassified"},
+    ),
+    (
+        "include_resource_subsubtype",
+        "resource_subsubtype",
+        {"SYS1": "End_Suction", "SYS2": "Unclassified"},
+    ),
+    (
+        "include_resource_variant",
+        "resource_variant",
+        {"SYS1": "Horizontal", "SYS2": "Unclassified"},
+    ),
+]
+
+
+@pytest.fixture
+def locations() -> List[Dict[str, str]]:
+    """One site, plant and area with two systems."""
+    location = {
+        "site": "Main Site",
+        "site_code": "S1",
+        "plant": "Plant One",
+        "plant_code": "P1",
+        "area": "Area A",
+        "area_code": "A1",
+    }
+    return [
+        {
+            **location,
+            "system": "Cooling",
+            "system_code": "SYS1",
+            "file_name": "PID-001",
+        },
+        {
+            **location,
+            "system": "Heating",
+            "system_code": "SYS2",
+            "file_name": "PID-002",
+        },
+    ]
+
+
+@pytest.fixture
+def tags() -> List[Dict[str, Any]]:
+    """A classified tag in two files, a partly classified, a document and a blank tag."""
+    pump = {
+        "text": "P-101",
+        "resourceType": "Equipment",
+        "resourceSubType": "Centrifugal_Pump",
+        "resourceSubSubType": "End_Suction",
+        "resourceVariant": "Horizontal",
+    }
+    return [
+        {**pump, "file_name": "PID-001.pdf"},
+        {**pump, "file_name": "PID-001-rev2.pdf"},
+        {"text": "TI-1", "file_name": "PID-002.pdf", "resourceType": "Instrument"},
+        {"text": "DOC-1", "file_name": "PID-002.pdf", "category": "Document"},
+        {"text": "  ", "file_name": "PID-002.pdf"},
+    ]
+
+
+def _summary(assets: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """External ID -> parent external ID, description and tags of each asset."""
+    summary = {}
+    for asset in assets:
+        properties = asset["properties"]
+        parent = properties.get("parent") or {}
+        summary[asset["externalId"]] = {
+            "parent": parent.get("externalId"),
+            "description": properties.get("description"),
+            "tags": properties.get("tags"),
+        }
+    return summary
+
+
+def _expected_system(
+    system_code: str, system_name: str, tag: str, tag_description: str, flags: set
+) -> List[tuple]:
+    """Expected (external ID, parent, description, tags) for one system's branch."""
+    system = f"system_S1_P1_A1_{system_code}"
+    path = f"{AREA_PATH} > {system_name}"
+    expected = [(system, AREA, path, ["system"])]
+    parent: Optional[str] = system
+    suffix = f"S1_P1_A1_{system_code}"
+    for flag, level_tag, values in LEVELS:
+        if flag not in flags:
+            continue
+        value = values[system_code]
+        suffix = f"{suffix}_{value}"
+        path = f"{path} > {value.replace('_', ' ')}"
+        external_id = f"{level_tag}_{suffix}"
+        expected.append((external_id, parent, path, [level_tag]))
+        parent = external_id
+    expected.append(
+        (
+            f"asset_tag_{suffix}_{tag.replace('-', '_')}",
+            parent,
+            tag_description,
+            ["asset_tag"],
+        )
+    )
+    return expected
+
+
+def _expected(flags: set, system_names: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Expected summary of the whole hierarchy for the given flags."""
+    rows = [
+        ("site_S1", None, "Main Site", ["site"]),
+        ("plant_S1_P1", "site_S1", "Main Site > Plant One", ["plant"]),
+        (AREA, "plant_S1_P1", AREA_PATH, ["area"]),
+    ]
+    sys1, sys2 = system_names["SYS1"], system_names["SYS2"]
+    rows += _expected_system(
+        "SYS1",
+        sys1,
+        "P-101",
+        f"Centrifugal Pump P-101 for {sys1} in Area A of Plant One at Main Site",
+        flags,
+    )
+    rows += _expected_system(
+        "SYS2",
+        sys2,
+        "TI-1",
+        f"TI-1 for {sys2} in Area A of Plant One at Main Site",
+        flags,
+    )
+    return {
+        external_id: {"parent": parent, "description": description, "tags": tags}
+        for external_id, parent, description, tags in rows
+    }
+
+
+FLAG_COMBINATIONS = [
+    (),
+    ("include_resource_type",),
+    ("include_resource_subtype",),
+    ("include_resource_type", "include_resource_subtype"),
+    ("include_resource_subsubtype",),
+    ("include_resource_variant",),
+    ("include_resource_subsubtype", "include_resource_variant"),
+    (
+        "include_resource_type",
+        "include_resource_subtype",
+        "include_resource_subsubtype",
+        "include_resource_variant",
+    ),
+]
+
+
+def _flag_ids(flags: tuple) -> str:
+    return "+".join(flag.replace("include_resource_", "") for flag in flags) or "none"
+
+
+class TestGenerateHierarchy:
+    """Test the create asset hierarchy generate_hierarchy output."""
+
+    @pytest.mark.parametrize("flags", FLAG_COMBINATIONS, ids=_flag_ids)
+    def test_levels_follow_include_flags(
+        self,
+        locations: List[Dict[str, str]],
+        tags: List[Dict[str, Any]],
+        flags: tuple,
+    ) -> None:
+        """Test each include flag adds its level between the system and the tags."""
+        # Act
+        assets = hierarchy_utils.generate_hierarchy(
+            locations, tags, space="sp", **{flag: True for flag in flags}
+        )
+
+        # Assert
+        expected = _expected(set(flags), {"SYS1": "Cooling", "SYS2": "Heating"})
+        summary = _summary(assets)
+        assert summary == expected
+        assert list(summary) == list(expected)
+
+    def test_all_levels_chain_to_the_site(
+        self, locations: List[Dict[str, str]], tags: List[Dict[str, Any]]
+    ) -> None:
+        """Test an asset tag under every level reaches the site through its parents."""
+        # Act
+        assets = hierarchy_utils.generate_hierarchy(
+            locations,
+            tags,
+            space="sp",
+            include_resource_type=True,
+            include_resource_subtype=True,
+            include_resource_subsubtype=True,
+            include_resource_variant=True,
+        )
+
+        # Assert
+        summary = _summary(assets)
+        chain = []
+        external_id: Optional[str] = (
+            "asset_tag_S1_P1_A1_SYS1_Equipment_Centrifugal_Pump_End_Suction"
+            "_Horizontal_P_101"
+        )
+        while external_id:
+            chain.append(summary[external_id]["tags"][0])
+            external_id = summary[external_id]["parent"]
+        assert chain == [
+            "asset_tag",
+            "resource_variant",
+            "resource_subsubtype",
+            "resource_subtype",
+            "resource_type",
+            "system",
+            "area",
+            "plant",
+            "site",
+        ]
+
+    def test_tag_found_in_several_files_is_created_once(
+        self, locations: List[Dict[str, str]], tags: List[Dict[str, Any]]
+    ) -> None:
+        """Test a tag in two files is one asset listing both source files."""
+        # Act
+        assets = hierarchy_utils.generate_hierarchy(locations, tags, space="sp")
+
+        # Assert
+        pumps = [a for a in assets if a["externalId"].endswith("_P_101")]
+        assert len(pumps) == 1
+        assert pumps[0]["properties"]["sourceFile"] == "PID-001-rev2.pdf, PID-001.pdf"
+        assert pumps[0]["space"] == "sp"
+
+
+class TestAnnotationsGenerateHierarchy:
+    """Test the create annotations generate_hierarchy output."""
+
+    @pytest.mark.parametrize("flags", FLAG_COMBINATIONS[:4], ids=_flag_ids)
+    def test_levels_follow_include_flags(
+        self,
+        locations: List[Dict[str, str]],
+        tags: List[Dict[str, Any]],
+        flags: tuple,
+    ) -> None:
+        """Test the type and subtype flags add their levels, named by system code."""
+        # Act
+        assets = annotations_hierarchy_utils.generate_hierarchy(
+            locations, tags, space="sp", **{flag: True for flag in flags}
+        )
+
+        # Assert
+        expected = _expected(set(flags), {"SYS1": "SYS1", "SYS2": "SYS2"})
+        summary = _summary(assets)
+        assert summary == expected
+        assert list(summary) == list(expected)
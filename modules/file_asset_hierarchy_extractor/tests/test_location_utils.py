@@ -0,0 +1,144 @@
+"""
+Tests for the location utilities.
+
+Tests cover matching file names to locations through the prefix index, for both
+copies of location_utils (create asset hierarchy and create annotations).
+"""
+
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List
+
+import pytest
+
+# Add module root to path
+module_root = Path(__file__).parent.parent
+if str(module_root) not in sys.path:
+    sys.path.insert(0, str(module_root))
+
+from functions.fn_dm_create_annotations.utils import (
+    location_utils as annotations_location_utils,
+)
+from functions.fn_dm_create_asset_hierarchy.utils import (
+    location_utils as hierarchy_location_utils,
+)
+
+
+@pytest.fixture(
+    params=[hierarchy_location_utils, annotations_location_utils],
+    ids=["create_asset_hierarchy", "create_annotations"],
+)
+def location_utils(request: pytest.FixtureRequest) -> ModuleType:
+    """Each copy of the location utilities module."""
+    return request.param
+
+
+@pytest.fixture
+def locations() -> List[Dict[str, str]]:
+    """Locations with overlapping file name prefixes."""
+    return [
+        {"system_code": "S1", "file_name": "E-208-M-001, E-208-M-002"},
+        {"system_code": "S2", "file_name": "E-208"},
+        {"system_code": "S3", "file_name": "E-208-M"},
+        {"system_code": "S4", "P&ID": "P-100"},
+        {"system_code": "S5", "file_name": ""},
+    ]
+
+
+class TestMatchFileToSystem:
+    """Test matching a single file name to a location."""
+
+    @pytest.mark.parametrize(
+        "file_name, system_code",
+        [
+            ("E-208-M-001.dwg.pdf", "S1"),
+            ("E-208-M-002", "S1"),
+            ("E-208-M-003.pdf", "S2"),
+            ("E-208-X.pdf", "S2"),
+            ("P-100-A.pdf", "S4"),
+        ],
+    )
+    def test_first_location_with_matching_prefix_wins(
+        self,
+        location_utils: ModuleType,
+        locations: List[Dict[str, str]],
+        file_name: str,
+        system_code: str,
+    ) -> None:
+        """Test the earliest location whose file name prefixes the file wins."""
+        # Act
+        location = location_utils.match_file_to_system(file_name, locations)
+
+        # Assert
+        assert location["system_code"] == system_code
+
+    @pytest.mark.parametrize(
+        "file_name",
+        [
+            "cognitefile_E-208-M-001.dwg_20251110_234713",
+            "cognitefile_E-208-M-001.dwg_1762840033548",
+            "e 208 m 001.pdf",
+            "E~208~M~001.pdf",
+            "drawings/E-208-M-001.pdf",
+        ],
+    )
+    def test_cleaned_and_normalized_names_match(
+        self,
+        location_utils: ModuleType,
+        locations: List[Dict[str, str]],
+        file_name: str,
+    ) -> None:
+        """Test CDF prefixes, timestamps, case, separators and folders are handled."""
+        # Act
+        location = location_utils.match_file_to_system(file_name, locations)
+
+        # Assert
+        assert location["system_code"] == "S1"
+
+    def test_unmatched_file_returns_none(
+        self, location_utils: ModuleType, locations: List[Dict[str, str]]
+    ) -> None:
+        """Test a file no location prefixes returns None."""
+        # Act & Assert
+        assert location_utils.match_file_to_system("X-1.pdf", locations) is None
+
+    def test_prebuilt_index_gives_same_match(
+        self, location_utils: ModuleType, locations: List[Dict[str, str]]
+    ) -> None:
+        """Test passing a prebuilt index matches the same as building it per call."""
+        # Arrange
+        index = location_utils.build_location_index(locations)
+        file_names = ["E-208-M-001.pdf", "E-208-Q.pdf", "p-100.pdf", "X-1.pdf"]
+
+        # Act
+        with_index = [
+            location_utils.match_file_to_system(name, locations, index)
+            for name in file_names
+        ]
+        without_index = [
+            location_utils.match_file_to_system(name, locations) for name in file_names
+        ]
+
+        # Assert
+        assert with_index == without_index
+
+
+class TestMatchFilesToSystems:
+    """Test matching many file names at once."""
+
+    def test_matches_distinct_non_empty_names(
+        self, location_utils: ModuleType, locations: List[Dict[str, str]]
+    ) -> None:
+        """Test empty and unmatched names are left out, duplicates matched once."""
+        # Arrange
+        file_names = ["E-208-M-001.pdf", "", "X-1.pdf", "E-208-M-001.pdf", "P-100"]
+
+        # Act
+        matches = location_utils.match_files_to_systems(file_names, locations)
+
+        # Assert
+        assert {name: loc["system_code"] for name, loc in matches.items()} == {
+            "E-208-M-001.pdf": "S1",
+            "P-100": "S4",
+        }